@@ -0,0 +1,23 @@
+import threading
+
+from dotenv import load_dotenv
+
+# Streamlit runs the page script again on every interaction (each key typed into the input box
+# too), while imported modules stay loaded. Setup that only has to happen once per process is
+# run from here, so a rerun only pays for drawing the page.
+
+_results = {}
+_lock = threading.Lock()
+
+
+## Function To run setup once per process and key; later calls return the first result
+def run_once(key, setup, *args):
+    with _lock:
+        if key not in _results:
+            _results[key] = setup(*args)
+        return _results[key]
+
+
+## Function To load .env once (the pipelines read their settings from the environment when imported)
+def load_environment():
+    return run_once("environment", load_dotenv)
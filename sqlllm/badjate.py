@@ -1,360 +1,47 @@
-from dotenv import load_dotenv
-load_dotenv()  ## load all the environment variables
+from app_setup import load_environment, run_once
+load_environment()  ## load all the environment variables, once per process
 
 import streamlit as st
 import os
-import sqlite3
-import google.generativeai as genai
-import pandas as pd
-
-# Database setup
-db_path = os.path.join(os.path.dirname(__file__), "badjate.db")
-print("DB PATH:", db_path)
-print("File exists:", os.path.exists(db_path))
-
-## Configure Genai Key
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-
-# Model configuration for better performance
-generation_config = {
-    "temperature": 0.1,  # Low temperature for more deterministic SQL generation
-    "top_p": 0.8,        # Nucleus sampling for focused responses
-    "top_k": 40,         # Limit vocabulary for more precise SQL
-    "max_output_tokens": 2048,  # Sufficient for complex SQL queries
-    "response_mime_type": "text/plain",
-}
-
-# Safety settings for production use
-safety_settings = [
-    {
-        "category": "HARM_CATEGORY_HARASSMENT",
-        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-    },
-    {
-        "category": "HARM_CATEGORY_HATE_SPEECH",
-        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-    },
-    {
-        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-    },
-    {
-        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-    }
-]
-
-## Function To Load Google Gemini Model and provide queries as response
-def get_gemini_response(question, prompt, chat_history=None):
-    try:
-        model = genai.GenerativeModel(
-            'gemini-2.5-pro',
-            generation_config=generation_config,
-            safety_settings=safety_settings,
-            system_instruction="You are a specialized SQL query generator for stock market data analysis. You can understand context from previous queries and maintain conversation flow. Focus on generating accurate, efficient SQLite queries based on the provided schema, examples, and conversation history."
-        )
-        
-        # Build context from chat history
-        context_info = ""
-        if chat_history and len(chat_history) > 0:
-            context_info = "\n\nCONVERSATION CONTEXT:\n"
-            
-            # Include last 3 interactions for context
-            recent_history = chat_history[-3:] if len(chat_history) > 3 else chat_history
-            
-            for i, chat in enumerate(recent_history):
-                context_info += f"\nPrevious Query {i+1}:\n"
-                context_info += f"User asked: {chat['question']}\n"
-                context_info += f"Generated SQL: {chat['sql']}\n"
-                
-                if chat['success'] and len(chat['data']) > 0:
-                    # Include column names and sample data for context
-                    context_info += f"Results had columns: {', '.join(chat['data'].columns.tolist())}\n"
-                    context_info += f"Number of records: {len(chat['data'])}\n"
-                    
-                    # Include key information from results
-                    if 'StockName' in chat['data'].columns:
-                        stocks = chat['data']['StockName'].unique()[:5]  # First 5 stocks
-                        context_info += f"Stocks in results: {', '.join(stocks)}\n"
-                    
-                    if 'Category' in chat['data'].columns:
-                        categories = chat['data']['Category'].unique()
-                        context_info += f"Categories in results: {', '.join(categories)}\n"
-                else:
-                    context_info += "No results found\n"
-        
-        # Detect follow-up questions and context references
-        follow_up_indicators = [
-            'in this result', 'from these', 'in the above', 'from this data',
-            'these stocks', 'those results', 'from them', 'in these',
-            'from the previous', 'from last query', 'in that result'
-        ]
-        
-        is_follow_up = any(indicator in question.lower() for indicator in follow_up_indicators)
-        
-        # Enhanced prompt for context-aware queries
-        if is_follow_up and chat_history:
-            context_prompt = f"""
-CONTEXT-AWARE QUERY GENERATION:
-The user is asking a follow-up question referring to previous results.
-
-Previous conversation context: {context_info}
-
-FOLLOW-UP QUESTION HANDLING RULES:
-- When user says "in this result" or "from these", they refer to the LAST query's results
-- When user says "these stocks", filter by StockName from the previous results
-- When user says "this data", apply new analysis to the previous result set
-- Use WHERE clauses to filter based on previous results when appropriate
-- If they want analysis "from previous results", create a subquery or use the same filters
-
-Current follow-up question: {question}
-
-Generate a SQL query that considers the context of previous results.
-"""
-            full_prompt = f"{prompt[0]}\n{context_prompt}\n\nGenerate only the SQL query:"
-        else:
-            # Regular query without context
-            full_prompt = f"{prompt[0]}\n\nUser Question: {question}\n\nGenerate only the SQL query without any additional text or formatting:"
-        
-        response = model.generate_content(full_prompt)
-        
-        # Clean and validate the response
-        sql_query = response.text.strip()
-        
-        # Remove common formatting issues
-        sql_query = sql_query.replace("```sql", "").replace("```", "").strip()
-        
-        # Remove any explanatory text before or after SQL
-        lines = sql_query.split('\n')
-        sql_lines = []
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith('#') and not line.startswith('--') and not line.lower().startswith('this') and not line.lower().startswith('the'):
-                sql_lines.append(line)
-        
-        final_query = ' '.join(sql_lines).strip()
-        
-        # Basic SQL validation
-        if not final_query.upper().startswith('SELECT'):
-            raise ValueError("Generated query is not a valid SELECT statement")
-            
-        return final_query
-        
-    except Exception as e:
-        print(f"Error in get_gemini_response: {str(e)}")
-        # Fallback to basic query if generation fails
-        return "SELECT * FROM Recommendations LIMIT 10;"
-
-## Function To retrieve query from the database
-def read_sql_query(sql, db):
-    try:
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-        
-        # Add timeout for long-running queries
-        conn.execute("PRAGMA busy_timeout = 10000")
-        
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-        columns = [description[0] for description in cursor.description]
-        conn.commit()
-        conn.close()
-        
-        return rows, columns
-        
-    except sqlite3.Error as e:
-        print(f"Database error: {str(e)}")
-        if 'conn' in locals():
-            conn.close()
-        raise e
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        if 'conn' in locals():
-            conn.close()
-        raise e
-
-## Define Your Prompt
-prompt=[
-    """
-    You are an expert in converting English questions to SQL query using sqlite3!
-    The SQL database has the name badjate.db and has a table called Recommendations with the following columns:
-    - OrderID INTEGER PRIMARY KEY (unique identifier for each recommendation)
-    - StockName TEXT (company names like TCS, Reliance, HDFC Bank, Infosys, Maruti Suzuki, etc.)
-    - BuyDate TEXT (date when stock was purchased, format: YYYY-MM-DD)
-    - BuyPrice INTEGER (entry price, purchase price, cost price at which stock was bought)
-    - SellDate TEXT (date when stock was sold, exit date, format: YYYY-MM-DD)
-    - SellPrice INTEGER (exit price, selling price at which stock was sold)
-    - Target INTEGER (target price, goal price, upside target for the stock)
-    - StopLoss INTEGER (stop loss price, downside protection, risk management price)
-    - Category TEXT (sector, industry - IT, Banking, Energy, Auto, Telecom, FMCG, Retail)
-
-    IMPORTANT TERMINOLOGY MAPPING:
-    - "profit/loss", "gain/loss", "returns", "performance" → calculate (SellPrice - BuyPrice)
-    - "profitable", "winners", "gainers" → WHERE SellPrice > BuyPrice
-    - "loss-making", "losers", "red" → WHERE SellPrice < BuyPrice
-    - "breakeven" → WHERE SellPrice = BuyPrice
-    - "held", "holding period", "duration" → calculate difference between BuyDate and SellDate
-    - "sector", "industry", "space" → Category column
-    - "IT stocks", "tech stocks", "technology" → WHERE Category = 'IT'
-    - "bank stocks", "financial", "BFSI" → WHERE Category = 'Banking'
-    - "oil stocks", "energy sector" → WHERE Category = 'Energy'
-    - "auto stocks", "automobile" → WHERE Category = 'Auto'
-    - "telecom stocks", "telco" → WHERE Category = 'Telecom'
-    - "FMCG stocks", "consumer goods" → WHERE Category = 'FMCG'
-    - "retail stocks" → WHERE Category = 'Retail'
-    - "entry price", "cost", "purchase price" → BuyPrice
-    - "exit price", "selling price" → SellPrice
-    - "upside", "target", "goal" → Target
-    - "downside protection", "stop", "risk limit" → StopLoss
-    - "recent", "latest", "new" → ORDER BY BuyDate DESC or SellDate DESC
-    - "old", "earlier", "past" → ORDER BY BuyDate ASC or SellDate ASC
-    - "high", "expensive", "top" → ORDER BY [relevant column] DESC
-    - "low", "cheap", "bottom" → ORDER BY [relevant column] ASC
-    - "best performing", "top gainers" → ORDER BY (SellPrice - BuyPrice) DESC
-    - "worst performing", "top losers" → ORDER BY (SellPrice - BuyPrice) ASC
-    - "percentage return", "ROI", "return %" → calculate ((SellPrice - BuyPrice) * 100.0 / BuyPrice)
-    - "risk-reward ratio" → calculate (Target - BuyPrice) / (BuyPrice - StopLoss)
-    - "average", "mean" → use AVG() function
-    - "total", "sum" → use SUM() function
-    - "count", "number of", "how many" → use COUNT() function
-    - "maximum", "highest", "peak" → use MAX() function
-    - "minimum", "lowest", "bottom" → use MIN() function
-
-    EXAMPLE QUERIES:
-    1. "Which stock has the highest target?" → SELECT StockName FROM Recommendations ORDER BY Target DESC LIMIT 1;
-    2. "Show all IT stocks" → SELECT * FROM Recommendations WHERE Category = 'IT';
-    3. "Which stocks made profit?" → SELECT StockName, (SellPrice - BuyPrice) as Profit FROM Recommendations WHERE SellPrice > BuyPrice;
-    4. "What's the average return in banking sector?" → SELECT AVG(SellPrice - BuyPrice) as AvgReturn FROM Recommendations WHERE Category = 'Banking';
-    5. "Show top 3 gainers" → SELECT StockName, (SellPrice - BuyPrice) as Profit FROM Recommendations ORDER BY (SellPrice - BuyPrice) DESC LIMIT 3;
-    6. "Which stocks hit their targets?" → SELECT StockName FROM Recommendations WHERE SellPrice >= Target;
-    7. "Show loss-making energy stocks" → SELECT * FROM Recommendations WHERE Category = 'Energy' AND SellPrice < BuyPrice;
-    8. "What's the percentage return of TCS?" → SELECT ((SellPrice - BuyPrice) * 100.0 / BuyPrice) as ReturnPercent FROM Recommendations WHERE StockName = 'TCS';
-    9. "Show recent purchases" → SELECT * FROM Recommendations ORDER BY BuyDate DESC LIMIT 5;
-    10. "Which stocks have high risk-reward ratio?" → SELECT StockName, ((Target - BuyPrice) * 1.0 / (BuyPrice - StopLoss)) as RiskReward FROM Recommendations ORDER BY RiskReward DESC;
-
-    COMPLEX EXAMPLE QUERIES:
-    11. "Show sector-wise average returns with stock count" → SELECT Category, AVG(SellPrice - BuyPrice) as AvgReturn, COUNT(*) as StockCount FROM Recommendations GROUP BY Category ORDER BY AvgReturn DESC;
-    12. "Which sector has the highest total profit?" → SELECT Category, SUM(SellPrice - BuyPrice) as TotalProfit FROM Recommendations GROUP BY Category ORDER BY TotalProfit DESC LIMIT 1;
-    13. "Show stocks with returns above sector average" → SELECT r1.StockName, r1.Category, (r1.SellPrice - r1.BuyPrice) as Return FROM Recommendations r1 WHERE (r1.SellPrice - r1.BuyPrice) > (SELECT AVG(r2.SellPrice - r2.BuyPrice) FROM Recommendations r2 WHERE r2.Category = r1.Category);
-    14. "Find stocks bought in July 2025 with profit above 100" → SELECT StockName, BuyDate, (SellPrice - BuyPrice) as Profit FROM Recommendations WHERE BuyDate LIKE '2025-07%' AND (SellPrice - BuyPrice) > 100;
-    15. "Show month-wise trading performance" → SELECT substr(BuyDate, 1, 7) as Month, COUNT(*) as Trades, AVG(SellPrice - BuyPrice) as AvgReturn, SUM(SellPrice - BuyPrice) as TotalReturn FROM Recommendations GROUP BY substr(BuyDate, 1, 7) ORDER BY Month;
-    16. "Which stocks exceeded their target by more than 5%?" → SELECT StockName, Target, SellPrice, ((SellPrice - Target) * 100.0 / Target) as ExcessPercent FROM Recommendations WHERE SellPrice > Target AND ((SellPrice - Target) * 100.0 / Target) > 5;
-    17. "Show stocks with holding period longer than 15 days" → SELECT StockName, BuyDate, SellDate, (julianday(SellDate) - julianday(BuyDate)) as HoldingDays FROM Recommendations WHERE (julianday(SellDate) - julianday(BuyDate)) > 15;
-    18. "Find underperforming stocks in each sector" → SELECT Category, StockName, (SellPrice - BuyPrice) as Return FROM Recommendations r1 WHERE (SellPrice - BuyPrice) = (SELECT MIN(r2.SellPrice - r2.BuyPrice) FROM Recommendations r2 WHERE r2.Category = r1.Category) ORDER BY Category;
-    19. "Show risk analysis: stocks that hit stop loss" → SELECT StockName, Category, BuyPrice, StopLoss, SellPrice, 'Hit Stop Loss' as Status FROM Recommendations WHERE SellPrice <= StopLoss;
-    20. "Calculate portfolio performance metrics" → SELECT COUNT(*) as TotalTrades, SUM(CASE WHEN SellPrice > BuyPrice THEN 1 ELSE 0 END) as WinningTrades, (SUM(CASE WHEN SellPrice > BuyPrice THEN 1 ELSE 0 END) * 100.0 / COUNT(*)) as WinRate, AVG(SellPrice - BuyPrice) as AvgReturn, SUM(SellPrice - BuyPrice) as TotalReturn FROM Recommendations;
-    21. "Show best and worst stock in each category" → SELECT Category, MAX(SellPrice - BuyPrice) as BestReturn, MIN(SellPrice - BuyPrice) as WorstReturn FROM Recommendations GROUP BY Category;
-    22. "Find stocks with target-to-buy ratio above 1.2" → SELECT StockName, BuyPrice, Target, (Target * 1.0 / BuyPrice) as TargetRatio FROM Recommendations WHERE (Target * 1.0 / BuyPrice) > 1.2 ORDER BY TargetRatio DESC;
-    23. "Show quarterly performance breakdown" → SELECT CASE WHEN substr(BuyDate, 6, 2) IN ('01','02','03') THEN 'Q1' WHEN substr(BuyDate, 6, 2) IN ('04','05','06') THEN 'Q2' WHEN substr(BuyDate, 6, 2) IN ('07','08','09') THEN 'Q3' ELSE 'Q4' END as Quarter, COUNT(*) as Trades, AVG(SellPrice - BuyPrice) as AvgReturn FROM Recommendations GROUP BY Quarter ORDER BY Quarter;
-    24. "Find stocks with maximum downside protection" → SELECT StockName, BuyPrice, StopLoss, ((BuyPrice - StopLoss) * 100.0 / BuyPrice) as DownsideProtection FROM Recommendations ORDER BY DownsideProtection DESC;
-    25. "Show correlation between buy price and returns" → SELECT CASE WHEN BuyPrice < 1000 THEN 'Low Price' WHEN BuyPrice BETWEEN 1000 AND 3000 THEN 'Mid Price' ELSE 'High Price' END as PriceRange, AVG(SellPrice - BuyPrice) as AvgReturn, COUNT(*) as Count FROM Recommendations GROUP BY PriceRange ORDER BY AvgReturn DESC;
-
-    INSTRUCTIONS:
-    - CRITICAL: Always return ONLY valid SQLite queries without any additional text, explanations, or formatting
-    - Use exact column names from the schema: OrderID, StockName, BuyDate, BuyPrice, SellDate, SellPrice, Target, StopLoss, Category
-    - Handle case-insensitive stock names using UPPER() or LOWER() functions
-    - For date comparisons, use string comparison (dates are in YYYY-MM-DD format)
-    - When calculating percentages, multiply by 100.0 to avoid integer division
-    - Use appropriate aggregate functions (SUM, AVG, COUNT, MAX, MIN) when needed
-    - Include ORDER BY and LIMIT when asking for "top", "best", "worst", etc.
-    - NEVER include ```, 'sql', or any markdown formatting in the output
-    - Handle variations in stock market terminology gracefully
-    - Return only the SQL statement, nothing else
-
-    ADVANCED INSTRUCTIONS FOR CONTEXTUAL UNDERSTANDING:
-
-    1. QUESTION INTERPRETATION RULES:
-    - If user asks about "performance" without specifying, calculate (SellPrice - BuyPrice)
-    - If user mentions "portfolio", aggregate data across all stocks
-    - When user says "my stocks" or "our recommendations", refer to all records in the table
-    - If user asks about "recent" without timeframe, use last 30 days or ORDER BY date DESC
-    - When user asks "which is better", provide comparative analysis with ORDER BY
-    - If user mentions percentages without context, assume they want percentage returns
-    - When user asks about "risk", consider StopLoss and calculate risk metrics
-    - If user mentions "growth" or "appreciation", focus on positive returns
-
-    2. CONTEXT-AWARE FOLLOW-UP HANDLING:
-    - "in this result", "from these", "in the above" → Filter by previous query results
-    - "these stocks", "those stocks" → Use StockName from previous results  
-    - "from this data", "in that result" → Apply new analysis to previous result set
-    - "show me more details" → Expand on previous query with additional columns
-    - "what about the others" → Show complement of previous results (opposite filter)
-    - "filter this by" → Add WHERE clause to previous query
-    - "sort this by" → Add ORDER BY to previous query
-    - "group this by" → Add GROUP BY to previous query
-    - "calculate average for these" → Apply AVG() to previous result set
-
-    3. IMPLICIT QUERY HANDLING:
-    - "How are we doing?" → Portfolio performance summary with win rate, total returns
-    - "Show me the winners" → Stocks with SellPrice > BuyPrice, ordered by profit
-    - "What about the losers?" → Stocks with SellPrice < BuyPrice, ordered by loss
-    - "Any good IT picks?" → IT category stocks with positive returns
-    - "How's the market treating us?" → Overall performance across all categories
-    - "Show me some numbers" → Key portfolio metrics and statistics
-    - "What's working?" → Top performing stocks/sectors
-    - "What's not working?" → Underperforming stocks/sectors
-    - "Give me insights" → Comprehensive analysis with multiple metrics
-
-    4. CONTEXT INFERENCE RULES:
-    - If previous context mentioned a sector, continue with that sector unless specified otherwise
-    - When user asks follow-up questions, maintain the scope of previous query
-    - If user asks about "them" or "these", refer to results from previous context
-    - When user says "compare", provide side-by-side analysis with relevant metrics
-    - If user mentions timeframes (month, quarter, year), filter accordingly
-    - When referencing "previous results", use subqueries or similar filters
-
-    4. SMART DEFAULTS:
-    - When user asks for "best" without metric, use profit/return as default
-    - If user asks for "analysis" without specifics, provide multi-dimensional view
-    - When user asks about "stocks" generally, show top performers unless context suggests otherwise
-    - If no limit specified for listing queries, default to TOP 10 or meaningful subset
-    - When user asks about trends, include time-based analysis
-
-    5. ERROR HANDLING & FALLBACKS:
-    - If stock name is misspelled, use LIKE operator with wildcards
-    - If user mentions non-existent categories, suggest closest match or show all categories
-    - When calculations might result in division by zero, add safety checks
-    - If date formats are unclear, assume standard YYYY-MM-DD format
-
-    6. RESPONSE OPTIMIZATION:
-    - For summary questions, use GROUP BY to provide categorical breakdowns
-    - For comparison questions, include multiple relevant columns
-    - For trend questions, include time-based ordering
-    - For performance questions, include both absolute and percentage metrics
-    - For risk questions, include both upside (Target) and downside (StopLoss) analysis
-
-    7. BUSINESS CONTEXT AWARENESS:
-    - "Diversification" queries → Show category-wise distribution
-    - "Risk management" queries → Focus on StopLoss and risk-reward ratios
-    - "Portfolio optimization" → Show best/worst performers across categories
-    - "Market timing" → Include date-based analysis
-    - "Sector rotation" → Compare performance across different categories
-    - "Value investing" → Focus on stocks with good risk-reward ratios
-    - "Growth investing" → Focus on stocks with high returns and targets
-
-    8. NATURAL LANGUAGE PROCESSING GUIDELINES:
-    - Extract intent from conversational language
-    - Recognize financial jargon and map to appropriate database fields
-    - Handle superlatives (best, worst, highest, lowest) with appropriate sorting
-    - Process temporal references (yesterday, last week, recent, old) into date filters
-    - Understand comparative language (better than, worse than, similar to)
-    - Recognize aggregation requests (total, average, summary, overview)
-
-    9. QUERY COMPLEXITY ADAPTATION:
-    - For simple questions, provide straightforward SELECT statements
-    - For analytical questions, use subqueries and complex calculations
-    - For comparative questions, use JOINs or correlated subqueries
-    - For trend questions, incorporate date functions and time-based grouping
-    - For statistical questions, use appropriate aggregate functions
-
-    10. OUTPUT FORMATTING GUIDELINES:
-    - Include descriptive column aliases for calculated fields
-    - Order results logically (best to worst, recent to old, etc.)
-    - Limit results appropriately to avoid overwhelming output
-    - Include relevant context columns for better interpretation
-    - Use appropriate data types in calculations (use 1.0 for float division)
-    """
-]
+from history_store import StoredResult, get_result_store, new_session_id, trim_history
+from pipeline import (
+    DATASET_NAME, db_path, display_formats, forget_results, generate_sql, local_follow_up_sql, portfolio_stats,
+    remember_result, remember_success, router, run_with_escalation, similar_question_stats, sql_cache, warm_up,
+)
+from query_budget import aborted_query_counts
+from query_templates import get_template_registry
+from sql_repair import repair_stats
+from sql_validator import get_validation_cache
+from warm_up import get_warm_results, warm_up_progress
+
+# The question → SQL → rows pipeline lives in pipeline.py; this page is one of its clients.
+# Streamlit reruns this script on every interaction, so one-time work happens at import or in run_once,
+# and pandas is only imported once there are results to show.
+
+## Function To report the database once per process, not on every rerun
+def report_database():
+    print("DB PATH:", db_path)
+    print("File exists:", os.path.exists(db_path))
+
+run_once("badjate_database", report_database)
+
+## Function To compute the metrics shown under an answer, while all of its rows are at hand
+# History entries only keep a preview of the rows, so the summary is worked out once, up front
+def summarize_answer(df):
+    import pandas as pd
+
+    summary = {}
+    profit_cols = [col for col in df.columns if 'profit' in col.lower() or 'return' in col.lower()]
+    if profit_cols:
+        try:
+            summary['avg_return'] = pd.to_numeric(df[profit_cols[0]], errors='coerce').mean()
+        except Exception:
+            summary['avg_return'] = None
+    if 'Category' in df.columns:
+        summary['sectors'] = df['Category'].nunique()
+    elif 'StockName' in df.columns:
+        summary['stocks'] = df['StockName'].nunique()
+    return summary
 
 ## Streamlit App
 st.set_page_config(
@@ -425,34 +112,28 @@ st.markdown("""
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 
+# Full answers are kept by the shared result store under this id; the history keeps previews
+if 'history_session' not in st.session_state:
+    st.session_state.history_session = new_session_id()
+
 if 'query_counter' not in st.session_state:
     st.session_state.query_counter = 0
 
+# The sample queries below run once in the background, so the first click is answered from memory
+warm_up()
+
 # Sidebar with quick stats and sample queries
 with st.sidebar:
     st.markdown("### 📋 Quick Portfolio Stats")
     
-    # Get some quick stats from the database
+    # Get some quick stats from the database (one aggregate query per database version)
     try:
-        conn = sqlite3.connect(db_path)
-        
-        # Total trades
-        total_trades = pd.read_sql_query("SELECT COUNT(*) as count FROM Recommendations", conn).iloc[0]['count']
-        
-        # Profitable trades
-        profitable_trades = pd.read_sql_query("SELECT COUNT(*) as count FROM Recommendations WHERE SellPrice > BuyPrice", conn).iloc[0]['count']
-        
-        # Total profit/loss
-        total_pnl = pd.read_sql_query("SELECT SUM(SellPrice - BuyPrice) as total FROM Recommendations", conn).iloc[0]['total']
-        
-        # Win rate
-        win_rate = (profitable_trades / total_trades) * 100 if total_trades > 0 else 0
-        
-        # Get available categories dynamically
-        categories_df = pd.read_sql_query("SELECT DISTINCT Category FROM Recommendations ORDER BY Category", conn)
-        available_categories = categories_df['Category'].tolist()
-        
-        conn.close()
+        portfolio = portfolio_stats()
+        total_trades = portfolio['total_trades']
+        profitable_trades = portfolio['profitable_trades']
+        total_pnl = portfolio['total_pnl']
+        win_rate = portfolio['win_rate']
+        available_categories = portfolio['categories']
         
         # Display metrics
         col1, col2 = st.columns(2)
@@ -470,6 +151,11 @@ with st.sidebar:
     st.markdown("---")
     
     st.markdown("### 💡 Sample Queries")
+    warm_up_state = warm_up_progress(DATASET_NAME)
+    if warm_up_state and warm_up_state['status'] in ('pending', 'running'):
+        st.caption(f"⏳ Preparing sample answers ({warm_up_state['done']}/{warm_up_state['total']})...")
+    elif warm_up_state and warm_up_state['status'] == 'done':
+        st.caption(f"⚡ {warm_up_state['done'] - warm_up_state['failed']} sample answers ready ({warm_up_state['elapsed_ms']:.0f} ms)")
     
     # Base sample queries
     sample_queries = [
@@ -509,33 +195,41 @@ with st.sidebar:
     if available_categories:
         st.markdown("### 📊 Available Categories")
         
-        # Get category counts for better display
-        try:
-            conn = sqlite3.connect(db_path)
-            category_counts = pd.read_sql_query("""
-                SELECT Category, COUNT(*) as count 
-                FROM Recommendations 
-                GROUP BY Category 
-                ORDER BY count DESC, Category
-            """, conn)
-            conn.close()
-            
-            for _, row in category_counts.iterrows():
-                category = row['Category']
-                count = row['count']
-                st.markdown(f"• **{category}** - {count} stocks")
-                
-        except Exception as e:
-            # Fallback to simple list if query fails
-            for category in available_categories:
-                st.markdown(f"• **{category}**")
+        # Category counts come from the same cached aggregate as the stats above
+        for category, count in portfolio['category_counts']:
+            st.markdown(f"• **{category}** - {count} stocks")
     else:
         st.markdown("### 📊 Available Categories")
         st.markdown("*No categories found in database*")
 
+    # Cache effectiveness counters
+    with st.expander("⚡ Cache Stats"):
+        exact_stats = sql_cache.stats()
+        similar_stats = similar_question_stats()
+        st.markdown(f"**Exact matches:** {exact_stats['hits']} hits, {exact_stats['hit_rate']*100:.0f}% hit rate")
+        st.markdown(f"**Similar questions:** {similar_stats['hits']} hits, {similar_stats['hit_rate']*100:.0f}% hit rate")
+        templates = get_template_registry(DATASET_NAME, db_path)
+        st.markdown(f"**Query templates:** {templates.hits} hits, {len(templates.templates)} templates")
+        if warm_up_state:
+            st.markdown(f"**Warm-up:** {warm_up_state['done']}/{warm_up_state['total']} queries in {warm_up_state['elapsed_ms']:.0f} ms, {get_warm_results().hits} answers served")
+        router_stats = router.stats()
+        fast_stats, pro_stats = router_stats['tiers']['fast'], router_stats['tiers']['pro']
+        st.markdown(f"**Model tiers:** fast {fast_stats['requests']} ({fast_stats['p50_ms']:.0f} ms p50), pro {pro_stats['requests']} ({pro_stats['p50_ms']:.0f} ms p50), {router_stats['escalation_rate']*100:.0f}% escalated")
+        repairs = repair_stats()
+        st.markdown(f"**Local repairs:** {repairs['repaired']}/{repairs['attempts']} failed queries fixed ({repairs['avg_ms']:.2f} ms avg), {repairs['values']} values corrected")
+        checks = get_validation_cache().stats()
+        st.markdown(f"**SQL checks:** {checks['hits']} cached / {checks['misses']} compiled ({checks['avg_compile_ms']:.2f} ms avg)")
+        st.markdown(f"**Similarity lookup:** {similar_stats['avg_lookup_ms']:.2f} ms avg over {similar_stats['entries']} answered questions")
+        aborted = aborted_query_counts(DATASET_NAME)
+        st.markdown(f"**Stopped queries:** {aborted['time']} over time, {aborted['steps']} over step budget")
+        history_stats = get_result_store().stats()
+        st.markdown(f"**Answer history:** {history_stats['in_memory']} in memory ({history_stats['memory_mb']:.1f} MB), {history_stats['on_disk']} on disk, {history_stats['evicted']} dropped")
+
 # Main content area
 # Display chat history first
 if st.session_state.chat_history:
+    import pandas as pd
+
     st.markdown("### 💬 Chat History")
     
     for i, chat in enumerate(st.session_state.chat_history):
@@ -551,16 +245,37 @@ if st.session_state.chat_history:
             # Results
             if chat['success']:
                 if len(chat['data']) > 0:
-                    st.markdown(f"**📊 Results:** {len(chat['data'])} records found")
+                    result = chat.get('result')
+                    total_records = result.total_rows if result is not None else len(chat['data'])
+                    st.markdown(f"**📊 Results:** {total_records} records found")
+                    if chat.get('local'):
+                        st.caption("⚡ Answered from the previous results, without calling the model")
                     
                     # Create tabs for table view and SQL query
                     tab1, tab2 = st.tabs(["📋 Results Table", "🔍 SQL Query"])
                     
                     with tab1:
+                        # Large answers are served one page at a time
+                        page_df = chat['data']
+                        if result is not None and result.page_count > 1:
+                            page_number = st.number_input(
+                                f"Page (of {result.page_count})",
+                                min_value=1,
+                                max_value=result.page_count,
+                                value=1,
+                                key=f"page_history_{i}"
+                            )
+                            page_df = pd.DataFrame(result.page(page_number), columns=result.columns)
+                        
+                        # ₹ and % are applied by the table itself, so columns stay numeric and sort correctly
                         st.dataframe(
-                            chat['data'], 
+                            page_df, 
                             use_container_width=True, 
                             hide_index=True,
+                            column_config={
+                                col: st.column_config.NumberColumn(format=fmt)
+                                for col, fmt in display_formats(page_df).items()
+                            },
                             key=f"df_history_{i}"
                         )
                         
@@ -568,22 +283,17 @@ if st.session_state.chat_history:
                         if len(chat['data']) > 0:
                             col1, col2, col3 = st.columns(3)
                             with col1:
-                                st.metric("📈 Records", len(chat['data']))
+                                st.metric("📈 Records", total_records)
+                            summary = chat.get('summary', {})
                             with col2:
-                                if any('profit' in col.lower() or 'return' in col.lower() for col in chat['data'].columns):
-                                    profit_cols = [col for col in chat['data'].columns if 'profit' in col.lower() or 'return' in col.lower()]
-                                    if profit_cols:
-                                        numeric_col = chat['data'][profit_cols[0]].astype(str).str.replace('₹', '').str.replace(',', '')
-                                        try:
-                                            avg_return = pd.to_numeric(numeric_col, errors='coerce').mean()
-                                            st.metric("💰 Avg Return", f"₹{avg_return:,.0f}" if not pd.isna(avg_return) else "N/A")
-                                        except:
-                                            st.metric("💰 Avg Return", "N/A")
+                                if 'avg_return' in summary:
+                                    avg_return = summary['avg_return']
+                                    st.metric("💰 Avg Return", f"₹{avg_return:,.0f}" if avg_return is not None and not pd.isna(avg_return) else "N/A")
                             with col3:
-                                if 'Category' in chat['data'].columns:
-                                    st.metric("🏢 Sectors", chat['data']['Category'].nunique())
-                                elif 'StockName' in chat['data'].columns:
-                                    st.metric("📊 Stocks", chat['data']['StockName'].nunique())
+                                if 'sectors' in summary:
+                                    st.metric("🏢 Sectors", summary['sectors'])
+                                elif 'stocks' in summary:
+                                    st.metric("📊 Stocks", summary['stocks'])
                     
                     with tab2:
                         st.code(chat['sql'], language="sql")
@@ -631,6 +341,8 @@ with col1:
     with col_btn2:
         clear_history = st.button("🗑️ Clear")
         if clear_history:
+            get_result_store().release_session(st.session_state.history_session)
+            forget_results(st.session_state.history_session)
             st.session_state.chat_history = []
             st.session_state.query_counter += 1
             st.rerun()
@@ -682,14 +394,23 @@ with col2:
 
 # Results section - Process new query
 if submit and question:
+    import pandas as pd
+
     with st.spinner("🔄 Analyzing your query..."):
         try:
             # Add query processing indicator
             progress_bar = st.progress(0)
-            progress_bar.progress(25, "🤖 Generating SQL query...")
-            
-            # Pass chat history for context
-            response = get_gemini_response(question, prompt, st.session_state.chat_history)
+            session_id = st.session_state.history_session
+
+            # Plain sort/filter/group follow-ups are answered from the previous result, without the model
+            local_sql = local_follow_up_sql(question, st.session_state.chat_history, session_id)
+            if local_sql:
+                progress_bar.progress(25, "⚡ Using the previous results...")
+                response = local_sql
+            else:
+                progress_bar.progress(25, "🤖 Generating SQL query...")
+                # Pass chat history for context
+                response = generate_sql(question, st.session_state.chat_history, session_id)
             sql = response.strip()
             
             progress_bar.progress(50, "🔍 Validating query...")
@@ -700,38 +421,38 @@ if submit and question:
             
             progress_bar.progress(75, "📊 Executing query...")
             
-            # Execute the query
-            result, columns = read_sql_query(sql, "badjate.db")
+            # Execute the query (a fast-model query that fails is written again by the pro model)
+            sql, result = run_with_escalation(question, sql, st.session_state.chat_history, session_id)
             
             progress_bar.progress(100, "✅ Complete!")
             progress_bar.empty()
             
-            if result and columns:
-                # Convert to DataFrame for better display
-                df = pd.DataFrame(result, columns=columns)
-                
-                # Format numeric columns for better display
-                for col in df.columns:
-                    if df[col].dtype in ['int64', 'float64'] and col.lower() not in ['orderid']:
-                        if 'price' in col.lower() or 'target' in col.lower() or 'stoploss' in col.lower():
-                            df[col] = df[col].apply(lambda x: f"₹{x:,}" if pd.notnull(x) else "")
-                        elif 'percent' in col.lower() or 'rate' in col.lower():
-                            df[col] = df[col].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "")
-                        elif 'profit' in col.lower() or 'return' in col.lower() or 'pnl' in col.lower():
-                            df[col] = df[col].apply(lambda x: f"₹{x:,}" if pd.notnull(x) else "")
+            # The query ran, so it can answer similar standalone questions later
+            remember_success(question, sql, st.session_state.chat_history)
+            # ...and its rows can answer the follow-ups on it
+            remember_result(session_id, question, result)
+
+            if result.rows and result.columns:
+                # Convert to DataFrame for better display (only the bounded in-memory rows)
+                df = pd.DataFrame(result.rows, columns=result.columns)
                 
-                # Add to chat history
+                # The history keeps a preview; the full rows go to the result store (spilled to disk under pressure)
+                stored = StoredResult(st.session_state.history_session, result)
                 chat_entry = {
                     'question': question,
                     'sql': sql,
-                    'data': df,
+                    'data': pd.DataFrame(stored.preview, columns=stored.columns),
+                    'row_count': stored.row_count,
+                    'summary': summarize_answer(df),
+                    'result': stored,
+                    'local': bool(local_sql),
                     'success': True,
                     'timestamp': pd.Timestamp.now().strftime("%H:%M:%S")
                 }
                 st.session_state.chat_history.append(chat_entry)
                 
                 # Show success message
-                st.success(f"✅ Query processed successfully! Found {len(df)} records.")
+                st.success(f"✅ Query processed successfully! Found {len(df)}{'+' if result.truncated else ''} records.")
                 
             else:
                 # Add failed query to chat history
@@ -748,6 +469,9 @@ if submit and question:
         except Exception as e:
             if 'progress_bar' in locals():
                 progress_bar.empty()
+
+            # Never serve a cached query that just failed
+            sql_cache.discard(DATASET_NAME, db_path, question)
                 
             # Add error to chat history
             chat_entry = {
@@ -760,6 +484,9 @@ if submit and question:
             st.session_state.chat_history.append(chat_entry)
             st.error(f"❌ Error processing your query: {str(e)}")
         
+        # Only the latest answers are kept; older ones free their stored rows
+        trim_history(st.session_state.chat_history)
+
         # Update query counter and rerun to show updated history
         st.session_state.query_counter += 1
         
@@ -0,0 +1,237 @@
+from dotenv import load_dotenv
+load_dotenv()  ## the pipelines read their settings from the environment when imported
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import statistics
+import time
+
+from dataset_registry import DATASETS, load_pipeline
+from llm_backend import is_rate_limit_error
+from query_budget import QueryBudgetExceeded
+
+# Headless batch mode: answers a JSONL file of questions and streams one result per line
+#
+#   python batch_runner.py questions.jsonl --out answers.jsonl --concurrency 8 --rate 5
+#
+# Each input line is {"question": "...", "dataset": "finance", "id": "optional"}; the dataset
+# defaults to --dataset. Results are written as they complete, so the output order follows
+# completion, not input order (use the id to match them up).
+
+# --- Configuration ---
+DEFAULT_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# Model requests per second across all workers (0 = no limit); cache hits do not count
+DEFAULT_RATE = float(os.getenv("BATCH_RATE_PER_SECOND", "0"))
+MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "4"))
+RETRY_BASE_SECONDS = float(os.getenv("BATCH_RETRY_BASE_SECONDS", "2"))
+DEFAULT_RESULT_ROWS = 100
+
+CSV_FIELDS = [
+    "id", "dataset", "question", "status", "sql", "rows_fetched", "truncated", "error",
+    "cached", "attempts", "generate_ms", "execute_ms", "total_ms",
+]
+
+
+# --- Token bucket shared by all workers, paused for everyone when the API says slow down ---
+class RateLimiter:
+    def __init__(self, rate_per_second, burst=None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(1.0, rate_per_second)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if not self.rate:
+                    return
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# --- Streams finished items to JSONL or CSV (picked from the file extension) ---
+class ResultWriter:
+    def __init__(self, path):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record, default=str) + "\n")
+        # Flushed per item, so a long run can be followed (and survives being stopped)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+## Function To get the SQL for one question, retrying with backoff when the model is rate limited
+async def _generate(module, question, limiter):
+    sql = module.cached_sql(question)
+    if sql:
+        return sql, True, 0
+    attempt = 0
+    while True:
+        attempt += 1
+        await limiter.acquire()
+        try:
+            return await module.ask_model_async(question), False, attempt
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt > MAX_RETRIES:
+                raise
+            # Exponential backoff with jitter, applied to every worker through the limiter
+            delay = RETRY_BASE_SECONDS * 2 ** (attempt - 1) * (1 + random.random())
+            print(f"Rate limited, retrying in {delay:.1f}s: {str(e)}")
+            limiter.pause(delay)
+
+
+## Function To answer one item of the batch; failures are recorded, never raised
+async def process_item(item, limiter, result_rows=DEFAULT_RESULT_ROWS):
+    record = {
+        "id": item.get("id"),
+        "dataset": item.get("dataset"),
+        "question": item.get("question"),
+        "status": "error",
+        "sql": None,
+        "rows_fetched": None,
+        "truncated": None,
+        "error": None,
+        "cached": False,
+        "attempts": 0,
+        "generate_ms": None,
+        "execute_ms": None,
+        "total_ms": None,
+    }
+    started = time.perf_counter()
+    try:
+        if item.get("error"):
+            raise ValueError(item["error"])
+        module = load_pipeline(record["dataset"])
+        if not isinstance(record["question"], str) or not record["question"].strip():
+            raise ValueError("question is required")
+        sql, record["cached"], record["attempts"] = await _generate(module, record["question"], limiter)
+        record["sql"] = sql
+        generated = time.perf_counter()
+        record["generate_ms"] = round(1000 * (generated - started), 2)
+
+        if getattr(module, "is_refusal", lambda sql: False)(sql):
+            record["status"] = "refused"
+        else:
+            result = await module.run_query_async(sql)
+            record["execute_ms"] = round(1000 * (time.perf_counter() - generated), 2)
+            record.update(
+                status="ok",
+                columns=result.columns,
+                rows=result.rows[:result_rows],
+                # Only the bounded prefix is read; truncated says whether the answer has more rows
+                rows_fetched=len(result.rows),
+                truncated=result.truncated,
+            )
+            await asyncio.to_thread(module.remember_success, record["question"], sql)
+    except QueryBudgetExceeded as e:
+        record["error"] = str(e)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {str(e)}"
+        if record["sql"] is not None:
+            # Never serve a cached query that just failed
+            module.sql_cache.discard(module.DATASET_NAME, module.db_path, record["question"])
+    record["total_ms"] = round(1000 * (time.perf_counter() - started), 2)
+    return record
+
+
+def read_items(path, default_dataset):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = {"question": None, "error": f"Line {line_number} is not JSON"}
+            if isinstance(item, str):
+                item = {"question": item}
+            elif not isinstance(item, dict):
+                item = {"question": None, "error": f"Line {line_number} is not a question or an object"}
+            item.setdefault("id", line_number)
+            item.setdefault("dataset", default_dataset)
+            yield item
+
+
+## Function To run a whole batch with a fixed number of workers, streaming results as they finish
+async def run_batch(input_path, output_path, dataset="finance", concurrency=DEFAULT_CONCURRENCY,
+                    rate=DEFAULT_RATE, result_rows=DEFAULT_RESULT_ROWS):
+    limiter = RateLimiter(rate)
+    writer = ResultWriter(output_path)
+    # A short queue keeps memory flat however long the input file is
+    queue = asyncio.Queue(maxsize=2 * concurrency)
+    totals = []
+    statuses = {}
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            record = await process_item(item, limiter, result_rows)
+            writer.write(record)
+            totals.append(record["total_ms"])
+            statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+
+    started = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for item in read_items(input_path, dataset):
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "items": len(totals),
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "items_per_second": round(len(totals) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(totals), 2) if totals else None,
+        "p95_ms": round(statistics.quantiles(totals, n=20)[-1], 2) if len(totals) > 1 else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions in parallel")
+    parser.add_argument("input", help="JSONL file, one {\"question\": ..., \"dataset\": ...} per line")
+    parser.add_argument("--out", required=True, help="Output file (.jsonl or .csv)")
+    parser.add_argument("--dataset", default="finance", choices=sorted(DATASETS), help="Dataset for lines that do not name one")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Model requests per second (0 = no limit)")
+    parser.add_argument("--rows", type=int, default=DEFAULT_RESULT_ROWS, help="Rows kept per answer in JSONL output")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_batch(args.input, args.out, args.dataset, args.concurrency, args.rate, args.rows))
+    print(json.dumps(summary, indent=2))
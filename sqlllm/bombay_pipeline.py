@@ -0,0 +1,36 @@
+from dataset_registry import load_pipeline
+
+# The bombay text-to-SQL pipeline (question → SQL → rows), used by bombay.py and the benchmarks.
+# Its prompt, database and branding are the "bombay" entry of dataset_registry.py; the pipeline
+# itself is the shared chat pipeline, so this module only keeps the names callers import.
+
+_pipeline = load_pipeline("bombay")
+
+DATASET_NAME = _pipeline.DATASET_NAME
+DB_NAME = _pipeline.DB_NAME
+TABLE_NAME = _pipeline.TABLE_NAME
+MODEL_NAME = _pipeline.MODEL_NAME
+REFUSAL_MARKER = _pipeline.REFUSAL_MARKER
+db_path = _pipeline.db_path
+llm = _pipeline.llm
+sql_cache = _pipeline.sql_cache
+router = _pipeline.router
+
+build_prompt = _pipeline.build_prompt
+model_contents = _pipeline.model_contents
+model_options = _pipeline.model_options
+clean_response = _pipeline.clean_response
+is_refusal = _pipeline.is_refusal
+off_topic_reply = _pipeline.off_topic_reply
+display_formats = _pipeline.display_formats
+cached_sql = _pipeline.cached_sql
+validate_sql = _pipeline.validate_sql
+checked_sql = _pipeline.checked_sql
+generate_sql = _pipeline.generate_sql
+request_sql_async = _pipeline.request_sql_async
+ask_model_async = _pipeline.ask_model_async
+generate_sql_async = _pipeline.generate_sql_async
+run_query = _pipeline.run_query
+run_with_escalation = _pipeline.run_with_escalation
+run_query_async = _pipeline.run_query_async
+remember_success = _pipeline.remember_success
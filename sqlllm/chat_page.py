@@ -0,0 +1,109 @@
+import sqlite3
+
+import streamlit as st
+
+from dataset_registry import get_dataset, load_pipeline
+from history_store import HISTORY_MAX_ENTRIES, StoredResult, new_session_id, trim_history
+from query_budget import QueryBudgetExceeded
+
+# The chat page of the single-table datasets (finance, bombay, student): question in, table out.
+# Wording, colours and number formats come from the dataset's registry entry.
+
+
+# --- Function to execute SQL query; SQL that fails is repaired or asked again on pro, so the SQL run is returned too ---
+def run_sql_query(pipeline, question: str, sql: str):
+    try:
+        sql, result = pipeline.run_with_escalation(question, sql)
+        return sql, result, None
+    except FileNotFoundError:
+        return sql, None, "⚠️ Database not found."
+    except QueryBudgetExceeded as e:
+        return sql, None, f"⏱️ {str(e)}"
+    except sqlite3.OperationalError as e:
+        return sql, None, f"⚠️ SQL Error: {str(e)}"
+    except Exception as e:
+        return sql, None, f"⚠️ Unexpected Error: {str(e)}"
+
+
+# --- Function to answer one question into the chat history ---
+def answer(pipeline, history, session_id, user_input: str):
+    sql_query = pipeline.generate_sql(user_input)
+    history.append(("user", user_input))
+
+    # Handle irrelevant questions
+    if pipeline.is_refusal(sql_query):
+        history.append(("bot", pipeline.off_topic_reply()))
+        return
+    sql_query, result, error = run_sql_query(pipeline, user_input, sql_query)
+    if error:
+        # Never serve a cached query that just failed
+        pipeline.sql_cache.discard(pipeline.DATASET_NAME, pipeline.db_path, user_input)
+        history.append(("bot", error))
+    elif result:
+        pipeline.remember_success(user_input, sql_query)
+        if result.rows:
+            history.append(("bot_table", StoredResult(session_id, result)))
+        else:
+            history.append(("bot", "No matching records found."))
+    else:
+        history.append(("bot", "An unknown error occurred."))
+
+    # Only the latest exchanges (a question and its answer each) are kept
+    trim_history(history, 2 * HISTORY_MAX_ENTRIES)
+
+
+# --- Function to draw the chat page of one dataset ---
+def render_chat(name: str):
+    branding = get_dataset(name)["branding"]
+    pipeline = load_pipeline(name)
+
+    # --- Streamlit UI Settings ---
+    st.set_page_config(page_title=branding["page_title"], layout="centered")
+    st.markdown(branding["header"], unsafe_allow_html=True)
+
+    # --- Chat History, one per dataset ---
+    history_key = f"{name}_history"
+    if history_key not in st.session_state:
+        st.session_state[history_key] = []
+    # Full answers are kept by the shared result store under this id; the history keeps previews
+    if "history_session" not in st.session_state:
+        st.session_state.history_session = new_session_id()
+    history = st.session_state[history_key]
+
+    # --- Input Field ---
+    user_input = st.text_input(branding["input_label"], key=f"{name}_input")
+    if st.button("Submit", key=f"{name}_submit") and user_input:
+        answer(pipeline, history, st.session_state.history_session, user_input)
+
+    # --- Display Chat History ---
+    bot_style = branding["bot_style"]
+    for index, (sender, msg) in enumerate(history):
+        if sender == "user":
+            st.markdown(
+                f"<div style='{branding['user_style']}'>{branding['user_label']} {msg}</div>",
+                unsafe_allow_html=True
+            )
+        elif sender == "bot":
+            st.markdown(f"<div style='{bot_style}'>{branding['bot_label']}<br>{msg}</div>", unsafe_allow_html=True)
+        elif sender == "bot_table":
+            # Display table nicely, one page at a time for large answers (pandas is loaded with the first table)
+            import pandas as pd
+
+            result = msg
+            rows = result.page(1)
+            st.markdown(f"<div style='{bot_style}'>{branding['bot_label']}</div>", unsafe_allow_html=True)
+            if result.page_count > 1:
+                page_number = st.number_input(
+                    f"Page (of {result.page_count})", min_value=1, max_value=result.page_count, value=1,
+                    key=f"{name}_page_{index}"
+                )
+                rows = result.page(page_number)
+            df = pd.DataFrame(data=[list(row) for row in rows], columns=result.columns)
+            st.dataframe(
+                df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    col: st.column_config.NumberColumn(format=fmt) for col, fmt in pipeline.display_formats(df).items()
+                },
+            )
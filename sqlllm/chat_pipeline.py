@@ -0,0 +1,264 @@
+import asyncio
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dataset_registry import db_path_of, get_dataset
+from db_pool import POOL_SIZE
+from index_advisor import record_query
+from llm_backend import get_backend
+from model_router import FAST, PRO, RETRY, get_model_router
+from query_budget import QueryBudgetExceeded, budget_for
+from query_cache import get_query_cache
+from result_pager import run_paged_query
+from schema_catalog import schema_prompt
+from sql_repair import feedback_prompt, repair_sql
+from sql_stream import generate_statement, generate_statement_async
+from sql_validator import compile_error, extract_sql
+
+# The text-to-SQL pipeline (question → SQL → rows) of the single-table chat datasets, built from
+# their registry entry (dataset_registry.py). Every instance shares the process's LLM backend,
+# connection pools, query cache and SQLite thread pool.
+
+# The model answers off-topic questions with a sentence starting like this instead of SQL
+REFUSAL_MARKER = "I'm here to help"
+
+# SQLite calls are blocking, so async clients run them on a thread pool the size of the connection pool
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="sqlite")
+
+
+# --- Pipeline of one chat dataset ---
+class ChatPipeline:
+    # Same names as the pipeline modules (DATASET_NAME, db_path, sql_cache, ...), so callers take either
+    REFUSAL_MARKER = REFUSAL_MARKER
+
+    def __init__(self, name):
+        self.dataset = get_dataset(name)
+        self.DATASET_NAME = name
+        self.DB_NAME = self.dataset["db_file"]
+        self.TABLE_NAME = self.dataset["table"]
+        self.MODEL_NAME = self.dataset["model_name"]
+        self.db_path = db_path_of(name)
+        self.llm = get_backend()
+        self.sql_cache = get_query_cache()
+        # Model tiers: simple questions go to the fast tier, MODEL_NAME is the pro tier
+        self.router = get_model_router(name, self.MODEL_NAME, tables=[self.TABLE_NAME])
+        self.semantic_index = None
+        if self.dataset["semantic_cache"]:
+            # faiss and the index are only loaded for datasets that use them
+            from semantic_cache import get_semantic_index
+            self.semantic_index = get_semantic_index(name)
+
+    # --- Gemini Prompt Template ---
+    def build_prompt(self) -> str:
+        prompt = self.dataset["prompt"]
+        names = {"db_file": self.DB_NAME, "table": self.TABLE_NAME}
+        examples = ""
+        if prompt["examples"]:
+            lines = [
+                f'{number}. "{question}" → {sql.format(**names)}'
+                for number, (question, sql) in enumerate(prompt["examples"], 1)
+            ]
+            examples = "Examples:\n" + "\n".join(lines) + "\n\n"
+        return f"""
+{prompt["intro"].format(**names)}
+
+{schema_prompt(self.db_path, prompt.get("column_notes"))}
+
+{prompt["task"]}
+
+{examples}{prompt["output_rule"]}
+
+{prompt["off_topic_rule"]}
+"{prompt["off_topic_reply"]}"
+"""
+
+    def model_contents(self, question: str, chat_history=None):
+        return [self.build_prompt(), question]
+
+    def model_options(self):
+        return {"model_name": self.MODEL_NAME}
+
+    ## Function To pick display formats from the dataset's rules (column name fragment → format); values stay numeric
+    def display_formats(self, df):
+        # Only called with results at hand, so pandas is loaded by then (it is not imported at startup)
+        import pandas as pd
+
+        formats = {}
+        for col, dtype in df.dtypes.items():
+            if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+                continue
+            for fragment, fmt in self.dataset["formats"].items():
+                if fragment in col.lower():
+                    formats[col] = fmt
+                    break
+        return formats
+
+    def off_topic_reply(self) -> str:
+        return self.dataset["prompt"]["off_topic_reply"]
+
+    def clean_response(self, response_text: str) -> str:
+        text = response_text.strip()
+        # The off-topic reply is passed on as is; anything else must contain a SELECT statement
+        if self.is_refusal(text):
+            return text
+        return extract_sql(text)
+
+    def is_refusal(self, sql: str) -> bool:
+        return not sql or REFUSAL_MARKER in sql
+
+    # --- Function to answer from the exact cache or a near-duplicate question ---
+    def cached_sql(self, question: str, chat_history=None):
+        sql = self.sql_cache.get(self.DATASET_NAME, self.db_path, question)
+        if sql:
+            print("\n=== SQL Cache Hit ===")
+            print("User Question:", question)
+            return sql
+        if self.semantic_index is None:
+            return None
+
+        # Reuse the SQL of a near-duplicate question that already ran successfully
+        similar_sql = self.semantic_index.lookup(question, self.db_path)
+        if similar_sql:
+            print("\n=== Semantic Match ===")
+            print("User Question:", question)
+            self.sql_cache.put(self.DATASET_NAME, self.db_path, question, similar_sql)
+            return similar_sql
+        return None
+
+    def _tier_options(self, tier: str):
+        return {**self.model_options(), "model_name": self.router.model_name(tier)}
+
+    # --- Function to check a fast-tier answer: the off-topic reply is fine, SQL must compile ---
+    def validate_sql(self, sql: str):
+        if self.is_refusal(sql):
+            return None
+        return compile_error(self.db_path, sql)
+
+    # --- Function to repair SQL that does not compile locally (table and column names, stray prose) ---
+    def checked_sql(self, response_text: str) -> str:
+        sql = self.clean_response(response_text)
+        error = self.validate_sql(sql)
+        if error is None:
+            return sql
+        return repair_sql(self.db_path, sql, error) or sql
+
+    def _contents(self, question: str, feedback=None):
+        contents = self.model_contents(question)
+        return contents + [feedback_prompt(*feedback)] if feedback else contents
+
+    def _ask(self, question: str):
+        # Streamed: stops at the end of the statement, at the off-topic reply, or when the answer is not a SELECT
+        def ask(tier, feedback=None):
+            return self.checked_sql(generate_statement(
+                self.router.backend(tier), self._contents(question, feedback), (REFUSAL_MARKER,), question=question,
+                dataset=self.DATASET_NAME, **self._tier_options(tier)
+            ))
+        return ask
+
+    def _ask_async(self, question: str):
+        async def ask(tier, feedback=None):
+            return self.checked_sql(await generate_statement_async(
+                self.router.backend(tier), self._contents(question, feedback), (REFUSAL_MARKER,), question=question,
+                dataset=self.DATASET_NAME, **self._tier_options(tier)
+            ))
+        return ask
+
+    def _finish(self, question: str, response_text: str) -> str:
+        sql_query = self.clean_response(response_text)
+        self.sql_cache.put(self.DATASET_NAME, self.db_path, question, sql_query)
+        return sql_query
+
+    # --- Function to get Gemini SQL response ---
+    def generate_sql(self, question: str, chat_history=None):
+        sql = self.cached_sql(question)
+        if sql:
+            return sql
+        try:
+            print("\n=== Gemini Prompt Sent ===")
+            print("Dataset:", self.DATASET_NAME)
+            print("User Question:", question)
+
+            # The fast tier answers simple questions; answers that do not compile even after
+            # a local repair are asked once more on pro, with the error
+            response_text = self.router.generate(question, chat_history, self._ask(question), validate=self.validate_sql)
+            return self._finish(question, response_text)
+        except Exception as e:
+            print("\n=== Gemini API Error ===")
+            print(type(e).__name__, ":", e)
+            return None
+
+    # --- Function to ask the model without blocking the event loop (errors are raised to the caller) ---
+    async def request_sql_async(self, question: str, chat_history=None):
+        sql = self.cached_sql(question)
+        if sql:
+            return sql
+        return await self.ask_model_async(question, chat_history)
+
+    # --- Function to ask the model directly, skipping the caches ---
+    async def ask_model_async(self, question: str, chat_history=None):
+        response_text = await self.router.generate_async(
+            question, chat_history, self._ask_async(question), validate=self.validate_sql
+        )
+        return self._finish(question, response_text)
+
+    async def generate_sql_async(self, question: str, chat_history=None):
+        try:
+            return await self.request_sql_async(question, chat_history)
+        except Exception as e:
+            print("\n=== Gemini API Error ===")
+            print(type(e).__name__, ":", e)
+            return None
+
+    # --- Function to execute SQL query (errors are raised to the caller) ---
+    def run_query(self, sql: str):
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError("Database not found.")
+        # Nothing runs before it compiles as a read-only statement (verdicts are cached)
+        error = compile_error(self.db_path, sql)
+        if error is not None:
+            raise sqlite3.OperationalError(error)
+        # Pooled connection, bounded fetch: further pages are read on demand when displayed
+        started = time.perf_counter()
+        result = run_paged_query(self.db_path, sql, budget=budget_for(self.DATASET_NAME))
+        # Executed SQL and its timing feed the index advisor
+        record_query(self.DATASET_NAME, self.db_path, sql, time.perf_counter() - started)
+        return result
+
+    # --- Function to run SQL, repaired locally or asked again on pro when it fails (errors are raised to the caller) ---
+    def run_with_escalation(self, question: str, sql: str, chat_history=None):
+        try:
+            return sql, self.run_query(sql)
+        except QueryBudgetExceeded:
+            # Too slow is not a wrong answer
+            raise
+        except sqlite3.Error as e:
+            error = str(e)
+            source = self.router.source_of(sql)
+            repaired = repair_sql(self.db_path, sql, error)
+            if repaired and repaired != sql:
+                try:
+                    result = self.run_query(repaired)
+                    self.sql_cache.put(self.DATASET_NAME, self.db_path, question, repaired)
+                    return repaired, result
+                except QueryBudgetExceeded:
+                    raise
+                except sqlite3.Error as repaired_error:
+                    sql, error = repaired, str(repaired_error)
+            if source == RETRY:
+                # The model already had its one retry for this question
+                raise
+            print(f"SQL failed to run, asking {self.router.model_name(PRO)} again: {error}")
+            self.router.record_retry(FAST if source == FAST else PRO, "execution")
+            self.sql_cache.discard(self.DATASET_NAME, self.db_path, question)
+            sql = self._finish(question, self.router.ask_tier(PRO, self._ask(question), (sql, error)))
+            return sql, self.run_query(sql)
+
+    async def run_query_async(self, sql: str):
+        return await asyncio.get_running_loop().run_in_executor(_executor, self.run_query, sql)
+
+    # --- Function to remember SQL that ran successfully, so similar questions can reuse it ---
+    def remember_success(self, question: str, sql: str, chat_history=None):
+        if self.semantic_index is not None:
+            self.semantic_index.add(question, sql, self.db_path)
@@ -0,0 +1,184 @@
+import importlib
+import os
+import threading
+
+# Every dataset the app serves: its database, prompt fragments, result formatting and branding.
+# One process (multi_app.py) serves all of them with the same LLM backend, connection pools and
+# caches; adding a dataset is one more entry here, not one more copy of an app.
+#
+#   pipeline: module with its own question → SQL → rows pipeline, or None for the shared chat pipeline
+#   page:     script with its own Streamlit page, or None for the shared chat page
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Column name fragment → display format of the results table (the values themselves stay numeric)
+RUPEES = "₹%,.2f"
+
+DATASETS = {
+    "badjate": {
+        "title": "Badjate Stock Analysis",
+        "icon": "📈",
+        "db_file": "badjate.db",
+        "table": "Recommendations",
+        "pipeline": "pipeline",
+        "page": "badjate.py",
+    },
+    "finance": {
+        "title": "Student Finance",
+        "icon": "📊",
+        "db_file": "finance.db",
+        "table": "FINANCE",
+        "pipeline": None,
+        "page": None,
+        "model_name": "gemini-2.5-pro",
+        "semantic_cache": True,
+        "prompt": {
+            "intro": (
+                "You are an expert SQL assistant working on an SQLite3 database named {db_file}.\n"
+                "The table is named {table}. The schema, as table(column type, ...):"
+            ),
+            "task": "You will be given a question in English and should return only the appropriate SQLite query.",
+            "examples": [
+                ("Who has received the highest scholarship?", "SELECT Name FROM {table} ORDER BY ScholarshipAmount DESC LIMIT 1;"),
+                ("List students who haven’t paid full fees", "SELECT Name FROM {table} WHERE FeesPaid < TotalFees;"),
+            ],
+            "output_rule": "Only respond with the SQL query — no explanation, no ```sql blocks, no extra words.",
+            "off_topic_rule": "If the user asks about unrelated topics (e.g., weather, movies), reply:",
+            "off_topic_reply": (
+                "I'm here to help with student finance-related questions like fees, scholarships, or expenses. "
+                "Please ask accordingly."
+            ),
+        },
+        "formats": {"fees": RUPEES, "scholarship": RUPEES, "expenses": RUPEES},
+        "branding": {
+            "page_title": "📊 NBT Finance Chatbot",
+            "header": (
+                "<h2 style='text-align: center; color: #4b0081;'>Next Bigg Tech: Finance SQL Chatbot</h2>"
+                "<p style='text-align: center; color: #555;'>Ask natural questions about student finance data!</p>"
+            ),
+            "input_label": "💬 Ask a question about student finance data:",
+            "user_style": "background-color:#fdb727;padding:8px;border-radius:10px;margin-bottom:5px;text-align:right;color:#000",
+            "user_label": "<b>You:</b>",
+            "bot_style": "background-color:#eee;padding:10px;border-radius:10px;margin-bottom:5px;color:#333",
+            "bot_label": "<b>Bot:</b>",
+        },
+    },
+    "bombay": {
+        "title": "Bombay Wala",
+        "icon": "🍬",
+        "db_file": "bombay_wala.db",
+        "table": "SALES",
+        "pipeline": None,
+        "page": None,
+        "model_name": "gemini-2.5-pro",
+        "semantic_cache": False,
+        "prompt": {
+            "intro": (
+                "You are a friendly chatbot for a sweet and namkeen store called Bombay Wala.\n"
+                "You work on an SQLite3 database named {db_file}. The main table is {table}. "
+                "The schema, as table(column type, ...):"
+            ),
+            # What the columns mean; names and types are read from the database
+            "column_notes": {
+                "Category": "Sweet or Namkeen",
+                "SaleDate": "format YYYY-MM-DD",
+                "QuantityInKg": "quantity sold in kilograms",
+                "TotalPrice": "amount paid for the order in rupees",
+            },
+            "task": "Translate the user's natural language question into a valid SQLite query using only these columns.",
+            "examples": [],
+            "output_rule": "Only return the SQL query — no explanation, no code formatting, and no comments.",
+            "off_topic_rule": "If the user asks about anything unrelated, reply:",
+            "off_topic_reply": (
+                "I'm here to help with Bombay Wala's sweets & namkeen data. "
+                "Please ask about orders, payments, items, or customers."
+            ),
+        },
+        "formats": {"price": RUPEES, "quantityinkg": "%.2f kg"},
+        "branding": {
+            "page_title": "🍬 Bombay Wala Chatbot",
+            "header": (
+                "<div style='text-align:center;'>"
+                "<h2 style='color:#b3541e;'>🍥 Bombay Wala: Sweet & Namkeen Chatbot 🍥</h2>"
+                "<p style='color:#555;'>Ask me anything about your sweet and namkeen orders, inventory, or sales!</p>"
+                "<hr style='border-top: 1px dashed #e07b39; width: 60%;'>"
+                "</div>"
+            ),
+            "input_label": "🧁 Type your question below (e.g. total sales of laddoos):",
+            "user_style": (
+                "background-color:#ffe6cc;padding:10px 15px;border-radius:10px;margin-bottom:6px;text-align:right;"
+                "color:#7b3f00;font-weight:bold;box-shadow:1px 1px 3px rgba(0,0,0,0.1);"
+            ),
+            "user_label": "🧑‍🍳 You:",
+            "bot_style": (
+                "background-color:#fff5e6;padding:10px 15px;border-radius:10px;margin-bottom:6px;color:#5e2900;"
+                "box-shadow:1px 1px 3px rgba(0,0,0,0.1);"
+            ),
+            "bot_label": "<b>🍬 Bombay Wala Bot:</b>",
+        },
+    },
+    "student": {
+        "title": "Student Records",
+        "icon": "🎓",
+        "db_file": "student.db",
+        "table": "STUDENT",
+        "pipeline": None,
+        "page": None,
+        "model_name": "gemini-2.5-pro",
+        "semantic_cache": False,
+        "prompt": {
+            "intro": (
+                "You are an expert in converting English questions to SQL query using sqlite3!\n"
+                "The SQL database {db_file} has the following tables and columns, as table(column type, ...):"
+            ),
+            "task": "You will be given a question in English and should return only the appropriate SQLite query.",
+            "examples": [
+                ("How many entries of records are present?", "SELECT COUNT(*) FROM {table};"),
+                ("Tell me all the students studying in Data Science class?", "SELECT * FROM {table} WHERE CLASS = 'Data Science';"),
+            ],
+            "output_rule": "The SQL code should not have ``` in beginning or end and no sql word in the output.",
+            "off_topic_rule": "If the user asks about anything unrelated, reply:",
+            "off_topic_reply": "I'm here to help with the student records. Please ask about names, classes, sections or marks.",
+        },
+        "formats": {},
+        "branding": {
+            "page_title": "I can Retrieve Any SQL query",
+            "header": "<h2>Gemini App To Retrieve SQL Data</h2>",
+            "input_label": "Input: ",
+            "user_style": "background-color:#e8f0fe;padding:8px;border-radius:10px;margin-bottom:5px;text-align:right;color:#000",
+            "user_label": "<b>You:</b>",
+            "bot_style": "background-color:#eee;padding:10px;border-radius:10px;margin-bottom:5px;color:#333",
+            "bot_label": "<b>Bot:</b>",
+        },
+    },
+}
+
+
+## Function To get a dataset's registry entry (ValueError for an unknown name)
+def get_dataset(name):
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset '{name}', expected one of: {', '.join(DATASETS)}")
+    return DATASETS[name]
+
+
+def db_path_of(name):
+    return os.path.join(DATA_DIR, get_dataset(name)["db_file"])
+
+
+# Pipelines are built on first use, so a dataset nobody asks about costs nothing
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+## Function To get the question → SQL → rows pipeline of a dataset (a module, or the shared chat pipeline)
+# Both kinds have the same names: DATASET_NAME, db_path, generate_sql, run_query, ask_model_async, ...
+def load_pipeline(name):
+    dataset = get_dataset(name)
+    with _pipelines_lock:
+        if name not in _pipelines:
+            if dataset["pipeline"]:
+                _pipelines[name] = importlib.import_module(dataset["pipeline"])
+            else:
+                from chat_pipeline import ChatPipeline
+                _pipelines[name] = ChatPipeline(name)
+        return _pipelines[name]
@@ -0,0 +1,134 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# --- Configuration ---
+POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+POOL_TIMEOUT_SECONDS = float(os.getenv("SQLITE_POOL_TIMEOUT", "30"))
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+# journal_mode is stored in the database file, so the pool only switches it when asked to
+ENABLE_WAL = os.getenv("SQLITE_ENABLE_WAL", "0") == "1"
+
+
+# Every connection stayed busy for the whole pool timeout
+class PoolExhausted(sqlite3.OperationalError):
+    pass
+
+
+# --- Read-only connection pool for one database ---
+class ConnectionPool:
+    def __init__(
+        self,
+        db_path,
+        size=POOL_SIZE,
+        mmap_size=MMAP_SIZE,
+        cache_size_kb=CACHE_SIZE_KB,
+        temp_store=TEMP_STORE,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        enable_wal=ENABLE_WAL,
+        timeout=POOL_TIMEOUT_SECONDS,
+    ):
+        self.db_path = os.path.abspath(db_path)
+        self.inode = os.stat(self.db_path).st_ino
+        self.size = size
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.temp_store = temp_store
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        # LIFO hands out the most recently used connection, whose page cache is warmest
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        if enable_wal:
+            self._enable_wal()
+        self._idle.put(self._connect())
+        self._created = 1
+
+    def _enable_wal(self):
+        # Rewrites the file header, so it needs one writable connection; errors go to the caller
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            # Streamlit runs sessions on different threads; the pool makes sure
+            # only one thread uses a connection at a time
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_grow = self._created < self.size
+            if can_grow:
+                self._created += 1
+        if not can_grow:
+            try:
+                return self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                # A database error, so callers that handle sqlite3.Error need nothing new
+                raise PoolExhausted(f"connection pool exhausted: {self.size} connections busy for {self.timeout}s")
+        try:
+            return self._connect()
+        except sqlite3.Error:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    ## Function To borrow a connection for the duration of a with-block
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# One pool per database file, shared by every session in the process
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    db_path = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        # The file was replaced (e.g. a seed script recreated it), so the old connections are stale
+        if pool is not None and pool.inode != os.stat(db_path).st_ino:
+            pool.close()
+            pool = None
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path)
+        return pool
@@ -0,0 +1,315 @@
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from result_pager import run_paged_query
+
+# Follow-up questions ("filter these by profit > 100", "group these by sector") are about the
+# rows the user just saw, so the last few answers of a session are materialized as tables.
+# Plain sorts, filters, groups and aggregates on their columns become SQL right here, without the
+# model; anything else goes to the model, which is told it can query those tables directly.
+
+# --- Configuration ---
+FOLLOW_UP_RESULTS = int(os.getenv("FOLLOW_UP_RESULTS", "3"))
+FOLLOW_UP_MAX_SESSIONS = int(os.getenv("FOLLOW_UP_MAX_SESSIONS", "200"))
+
+# The latest answer is always LATEST_TABLE, the one before it LATEST_TABLE_2, and so on
+LATEST_TABLE = "prev_result"
+WORKSPACE_TABLE_PATTERN = re.compile(rf"\b{LATEST_TABLE}(_\d+)?\b", re.IGNORECASE)
+
+AGGREGATES = {
+    "average": "AVG", "avg": "AVG", "mean": "AVG",
+    "total": "SUM", "sum": "SUM",
+    "maximum": "MAX", "max": "MAX", "highest": "MAX",
+    "minimum": "MIN", "min": "MIN", "lowest": "MIN",
+}
+AGGREGATE_LABELS = {"AVG": "Average", "SUM": "Total", "MAX": "Max", "MIN": "Min"}
+
+COMPARISONS = {
+    ">=": ">=", "<=": "<=", "!=": "!=", "=": "=", ">": ">", "<": "<",
+    "at least": ">=", "at most": "<=", "not equal to": "!=", "equal to": "=", "equals": "=",
+    "more than": ">", "greater than": ">", "above": ">", "over": ">",
+    "less than": "<", "below": "<", "under": "<",
+}
+_COMPARISON_PATTERN = "|".join(re.escape(op) for op in sorted(COMPARISONS, key=len, reverse=True))
+
+# Words around a column name that do not name anything
+FILLER_WORDS = {
+    "these", "those", "them", "this", "that", "the", "a", "an", "of", "in", "from", "for", "by", "to",
+    "is", "are", "has", "have", "me", "show", "only", "just", "with", "where", "whose", "and",
+    "result", "results", "data", "rows", "ones", "please", "all", "their", "its", "each", "per",
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _normalize(text):
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def references_workspace(sql):
+    return bool(WORKSPACE_TABLE_PATTERN.search(sql or ""))
+
+
+# --- Turns the words of a follow-up into columns of the previous result ---
+class ColumnResolver:
+    def __init__(self, columns, synonyms=None, derived=None, metric=None):
+        self.columns = columns
+        # Word for the measure summed and averaged when grouping ("profit")
+        self.metric = metric
+        self._by_name = {_normalize(column): column for column in columns}
+        self.synonyms = synonyms or {}
+        self.derived = derived or {}
+
+    def _derived_available(self, expression):
+        names = {_normalize(name) for name in re.findall(r"[A-Za-z_]\w*", expression)}
+        return all(name in self._by_name or name in ("julianday", "date") for name in names)
+
+    ## Function To map a phrase to (SQL expression, label), or None when it names no column
+    def resolve(self, phrase):
+        words = [word for word in re.findall(r"[a-z0-9&/]+", phrase.lower()) if word not in FILLER_WORDS]
+        if not words:
+            return None
+        candidates = [" ".join(words)] + words[::-1]
+        for candidate in candidates:
+            key = _normalize(candidate)
+            for form in (key, key[:-1] if key.endswith("s") else key):
+                if form in self._by_name:
+                    return self._column(self._by_name[form])
+                target = self.synonyms.get(form)
+                if target and _normalize(target) in self._by_name:
+                    return self._column(self._by_name[_normalize(target)])
+                # "profit" finds a "TotalProfit" column before falling back to a computed one
+                partial = [column for normalized, column in self._by_name.items() if len(form) > 2 and form in normalized]
+                if len(partial) == 1:
+                    return self._column(partial[0])
+                if form in self.derived and self._derived_available(self.derived[form][1]):
+                    label, expression = self.derived[form]
+                    return f"({expression})", label
+        return None
+
+    def _column(self, column):
+        return _quote(column), column
+
+
+## Function To write SQL over the previous result for plain sort / filter / group / aggregate follow-ups
+# Returns None whenever the question is anything more than that, so the model handles it
+def plan_local_sql(question, resolver, text_values=None, table=LATEST_TABLE):
+    text = re.sub(r"[?!]", " ", question.lower())
+    text = " ".join(re.sub(r"\s*(>=|<=|!=|>|<|=)\s*", r" \1 ", text).split())
+    source = _quote(table)
+
+    # "how many of these", "count these"
+    if re.fullmatch(r"(how many|count)( \w+)?( are there)?( (in|of|from) )?(these|them|those)( \w+)?( are there)?", text):
+        return f"SELECT COUNT(*) AS Count FROM {source}"
+
+    # "top 3 of these by profit", "show the bottom 5 by return"
+    match = re.search(r"\b(top|bottom|best|worst) (\d+)\b.*\bby (.+)$", text)
+    if match:
+        resolved = resolver.resolve(match.group(3))
+        if resolved:
+            expression, label = resolved
+            direction = "DESC" if match.group(1) in ("top", "best") else "ASC"
+            return f"SELECT *{_extra_column(expression, label)} FROM {source} ORDER BY {expression} {direction} LIMIT {int(match.group(2))}"
+        return None
+
+    # "sort these by performance", "order them by buy date ascending"
+    match = re.search(r"\b(sort|order|rank|arrange)\b.*?\bby (.+?)( (asc|ascending|desc|descending|low to high|high to low|lowest first|highest first))?$", text)
+    if match:
+        resolved = resolver.resolve(match.group(2))
+        if not resolved:
+            return None
+        expression, label = resolved
+        wording = match.group(4) or ""
+        if wording in ("asc", "ascending", "low to high", "lowest first"):
+            direction = "ASC"
+        elif wording:
+            direction = "DESC"
+        else:
+            # Numbers read best highest first, names alphabetically
+            direction = "ASC" if _is_text(expression, text_values) else "DESC"
+        return f"SELECT *{_extra_column(expression, label)} FROM {source} ORDER BY {expression} {direction}"
+
+    # "group these by sector", "sector-wise breakdown of these"
+    match = re.search(r"\bgroup\b.*?\bby (.+)$", text) or re.search(r"\b(\w+)[- ]wise\b", text)
+    if match:
+        resolved = resolver.resolve(match.group(1))
+        if not resolved:
+            return None
+        expression, label = resolved
+        measures = ["COUNT(*) AS Count"]
+        metric = resolver.resolve(resolver.metric) if resolver.metric else None
+        if metric and metric[0] != expression:
+            measures.append(f"SUM({metric[0]}) AS {_quote('Total' + metric[1])}")
+            measures.append(f"ROUND(AVG({metric[0]}), 2) AS {_quote('Average' + metric[1])}")
+        return (
+            f"SELECT {expression} AS {_quote(label)}, {', '.join(measures)} FROM {source} "
+            f"GROUP BY {expression} ORDER BY Count DESC"
+        )
+
+    # "filter these by profit > 100", "show these with buy price above 1000"
+    match = re.search(rf"\b(?:filter|where|with|having|keep|show)\b(.+?) ({_COMPARISON_PATTERN}) (-?[\d,]*\.?\d+)$", text)
+    if match:
+        resolved = resolver.resolve(match.group(1))
+        if not resolved or _is_text(resolved[0], text_values):
+            return None
+        value = match.group(3).replace(",", "")
+        return f"SELECT * FROM {source} WHERE {resolved[0]} {COMPARISONS[match.group(2)]} {value}"
+
+    # "only IT from these", "show just the banking ones"
+    match = re.search(r"\b(only|just)(?: the)? (.+?)(?: ones| stocks| rows| items)?(?: (?:from|in|of) (?:these|them|those|this result))?$", text)
+    if match and text_values:
+        wanted = match.group(2).strip()
+        for column, values in text_values.items():
+            for value in values:
+                if isinstance(value, str) and value.lower() == wanted:
+                    # The value comes from the data itself, inlined so the SQL can be shown and re-run
+                    return f"SELECT * FROM {source} WHERE {_quote(column)} = {_literal(value)}"
+        return None
+
+    # "what's the average return for these?", "total profit of these"
+    match = re.search(r"\b(average|avg|mean|total|sum|maximum|max|highest|minimum|min|lowest) (.+?)(?: (?:for|of|in|from|across) (?:these|them|those|this result)(?: \w+)?)$", text)
+    if match:
+        resolved = resolver.resolve(match.group(2))
+        if not resolved or _is_text(resolved[0], text_values):
+            return None
+        expression, label = resolved
+        function = AGGREGATES[match.group(1)]
+        return f"SELECT ROUND({function}({expression}), 2) AS {_quote(AGGREGATE_LABELS[function] + label)}, COUNT(*) AS Count FROM {source}"
+    return None
+
+
+def _extra_column(expression, label):
+    # Sorting by a computed value shows that value too
+    return f", {expression} AS {_quote(label)}" if expression.startswith("(") else ""
+
+
+def _is_text(expression, text_values):
+    return bool(text_values) and any(expression == _quote(column) for column in text_values)
+
+
+# --- The materialized answers of one session ---
+class SessionResults:
+    def __init__(self, db_path, max_results=FOLLOW_UP_RESULTS, synonyms=None, derived=None, metric=None):
+        self.db_path = db_path
+        self.max_results = max_results
+        self.synonyms = synonyms
+        self.derived = derived
+        self.metric = metric
+        # Model-written follow-ups may join back to the dataset, attached read-only as "source"
+        self._conn = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+        self._conn.execute("ATTACH DATABASE ? AS source", (f"file:{os.path.abspath(db_path)}?mode=ro",))
+        self._lock = threading.RLock()
+        # Newest first: (table, question, columns, truncated)
+        self.results = []
+        self._next_id = 1
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            yield self._conn
+
+    def __len__(self):
+        return len(self.results)
+
+    ## Function To store an answer's rows as the new LATEST_TABLE, dropping the oldest beyond max_results
+    def materialize(self, question, result):
+        if not result.columns:
+            return
+        # SQL can return duplicate or empty column names; tables cannot have them
+        columns, seen = [], {}
+        for index, column in enumerate(result.columns):
+            name = column or f"column_{index + 1}"
+            seen[name] = seen.get(name, 0) + 1
+            columns.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+        table = f"result_{self._next_id}"
+        self._next_id += 1
+        with self._lock:
+            self._conn.execute(f"CREATE TABLE {table} ({', '.join(_quote(column) for column in columns)})")
+            self._conn.executemany(
+                f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", result.rows
+            )
+            self.results.insert(0, (table, question, columns, result.truncated))
+            for old_table, *_ in self.results[self.max_results:]:
+                self._conn.execute(f"DROP TABLE {old_table}")
+            del self.results[self.max_results:]
+            # The views always point the fixed names at the latest answers
+            for position, (table, *_) in enumerate(self.results):
+                view = LATEST_TABLE if position == 0 else f"{LATEST_TABLE}_{position + 1}"
+                self._conn.execute(f"DROP VIEW IF EXISTS {view}")
+                self._conn.execute(f"CREATE VIEW {view} AS SELECT * FROM {table}")
+            self._conn.commit()
+
+    def _text_values(self, table, columns):
+        values = {}
+        for column in columns:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT {_quote(column)} FROM {table} WHERE typeof({_quote(column)}) = 'text' LIMIT 50"
+            ).fetchall()
+            if rows:
+                values[column] = [row[0] for row in rows]
+        return values
+
+    ## Function To get SQL answering the question from the latest result alone, or None
+    # Truncated answers are not all here, so anything about them goes to the model
+    def local_sql(self, question):
+        with self._lock:
+            if not self.results:
+                return None
+            table, _, columns, truncated = self.results[0]
+            if truncated:
+                return None
+            resolver = ColumnResolver(columns, self.synonyms, self.derived, self.metric)
+            return plan_local_sql(question, resolver, self._text_values(table, columns))
+
+    ## Function To describe the materialized tables for a model prompt
+    def describe(self):
+        lines = []
+        with self._lock:
+            for position, (_, question, columns, truncated) in enumerate(self.results):
+                view = LATEST_TABLE if position == 0 else f"{LATEST_TABLE}_{position + 1}"
+                count = self._conn.execute(f"SELECT COUNT(*) FROM {view}").fetchone()[0]
+                note = " (only the first rows of a longer answer)" if truncated else ""
+                lines.append(f'- {view}({", ".join(columns)}): {count} rows{note}, the answer to "{question}"')
+        return "\n".join(lines)
+
+    def run(self, sql, budget=None):
+        return run_paged_query(self.db_path, sql, budget=budget, pool=self)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# --- One SessionResults per (dataset, session), least recently used dropped first ---
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def get_session_results(dataset, session_id, db_path, synonyms=None, derived=None, metric=None):
+    key = (dataset, session_id)
+    with _sessions_lock:
+        results = _sessions.get(key)
+        if results is None:
+            results = _sessions[key] = SessionResults(db_path, synonyms=synonyms, derived=derived, metric=metric)
+            while len(_sessions) > FOLLOW_UP_MAX_SESSIONS:
+                _, oldest = _sessions.popitem(last=False)
+                oldest.close()
+        _sessions.move_to_end(key)
+        return results
+
+
+def release_session_results(dataset, session_id):
+    with _sessions_lock:
+        results = _sessions.pop((dataset, session_id), None)
+    if results is not None:
+        results.close()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from synthetic_data import generate_chunk
+
+# Cost of preparing a large badjate result for display: the old per-cell string formatting
+# against numeric columns formatted by the table (pipeline.display_formats + column_config).
+#
+#   python format_benchmark.py --sizes 10000 100000 1000000
+
+COLUMNS = ["OrderID", "StockName", "BuyDate", "BuyPrice", "SellDate", "SellPrice", "Target", "StopLoss", "Category"]
+
+
+## The formatting badjate.py used to apply to every result: one Python call per cell, strings out
+def format_cells(df):
+    for col in df.columns:
+        if df[col].dtype in ['int64', 'float64'] and col.lower() not in ['orderid']:
+            if 'price' in col.lower() or 'target' in col.lower() or 'stoploss' in col.lower():
+                df[col] = df[col].apply(lambda x: f"₹{x:,}" if pd.notnull(x) else "")
+            elif 'percent' in col.lower() or 'rate' in col.lower():
+                df[col] = df[col].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "")
+            elif 'profit' in col.lower() or 'return' in col.lower() or 'pnl' in col.lower():
+                df[col] = df[col].apply(lambda x: f"₹{x:,}" if pd.notnull(x) else "")
+    return df
+
+
+def result_frame(rows):
+    df = pd.DataFrame(generate_chunk(("badjate", 1, rows, 42)), columns=COLUMNS)
+    df["Profit"] = df["SellPrice"] - df["BuyPrice"]
+    df["ReturnRate"] = 100.0 * df["Profit"] / df["BuyPrice"]
+    return df
+
+
+def _seconds(func, *args):
+    started = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - started
+
+
+## Function To time formatting, Arrow conversion and a sort of the money column for one approach
+def measure(df, approach):
+    import pipeline
+    import pyarrow as pa
+
+    expected_order = df.sort_values("Profit", kind="stable")["OrderID"].tolist()
+    df = df.copy()
+    if approach == "cells":
+        df, format_seconds = _seconds(format_cells, df)
+    else:
+        _, format_seconds = _seconds(pipeline.display_formats, df)
+    _, arrow_seconds = _seconds(pa.Table.from_pandas, df)
+    sorted_df, sort_seconds = _seconds(lambda: df.sort_values("Profit", kind="stable"))
+    return {
+        "approach": approach,
+        "rows": len(df),
+        "format_ms": round(1000 * format_seconds, 2),
+        "arrow_ms": round(1000 * arrow_seconds, 2),
+        "sort_ms": round(1000 * sort_seconds, 2),
+        "memory_mb": round(df.memory_usage(deep=True).sum() / 1e6, 2),
+        # Text sorts "₹-1,000" before "₹-5" and "₹10" before "₹9"
+        "sorts_by_value": sorted_df["OrderID"].tolist() == expected_order,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-cell string formatting against render-time formats")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 100000, 1000000])
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.sizes:
+        df = result_frame(rows)
+        for approach in ["cells", "render-time"]:
+            results.append(measure(df, approach))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'rows':>9} {'approach':<12} {'format ms':>10} {'arrow ms':>10} {'sort ms':>9} {'memory MB':>10}  sorted by value")
+        for row in results:
+            print(
+                f"{row['rows']:>9} {row['approach']:<12} {row['format_ms']:>10.1f} {row['arrow_ms']:>10.1f} "
+                f"{row['sort_ms']:>9.1f} {row['memory_mb']:>10.1f}  {row['sorts_by_value']}"
+            )
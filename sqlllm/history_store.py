@@ -0,0 +1,262 @@
+import atexit
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+
+from result_pager import RESULT_PAGE_SIZE, PagedResult
+
+# Chat history keeps a small preview of every answer in session_state; the full rows live here.
+# Rows stay in memory while they fit the per-session and process-wide budgets and are spilled,
+# least recently used first, to a scratch SQLite file that is read back only when a page needs them.
+# Sessions that just end never say so, so the scratch file has its own budget: past it, the
+# oldest spilled results are dropped and their pages are queried from the database again.
+
+# --- Configuration ---
+HISTORY_PREVIEW_ROWS = int(os.getenv("HISTORY_PREVIEW_ROWS", str(RESULT_PAGE_SIZE)))
+HISTORY_MAX_ENTRIES = int(os.getenv("HISTORY_MAX_ENTRIES", "50"))
+HISTORY_SESSION_BUDGET_MB = float(os.getenv("HISTORY_SESSION_BUDGET_MB", "16"))
+HISTORY_GLOBAL_BUDGET_MB = float(os.getenv("HISTORY_GLOBAL_BUDGET_MB", "256"))
+HISTORY_SPILL_BUDGET_MB = float(os.getenv("HISTORY_SPILL_BUDGET_MB", "512"))
+# Directory of the scratch file (default: the system temp directory)
+HISTORY_SPILL_DIR = os.getenv("HISTORY_SPILL_DIR") or None
+
+
+def _rows_size(rows):
+    # Rough but cheap: the tuples plus their values, which is what the rows cost in memory
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# --- Full answer rows, bounded in memory, spilled to disk beyond the budgets ---
+class ResultStore:
+    def __init__(self, session_budget_mb=HISTORY_SESSION_BUDGET_MB, global_budget_mb=HISTORY_GLOBAL_BUDGET_MB,
+                 spill_dir=HISTORY_SPILL_DIR, spill_budget_mb=HISTORY_SPILL_BUDGET_MB):
+        self.session_budget = int(session_budget_mb * 1024 * 1024)
+        self.global_budget = int(global_budget_mb * 1024 * 1024)
+        self.spill_budget = int(spill_budget_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+        # key -> (session_id, rows, size), least recently used first
+        self._memory = OrderedDict()
+        self._session_bytes = {}
+        self._memory_bytes = 0
+        # key -> session_id of results in the scratch file, oldest spill first
+        self._spilled = OrderedDict()
+        self._conn = None
+        self._path = None
+        self._lock = threading.Lock()
+        self.spills = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _scratch(self):
+        if self._conn is None:
+            fd, self._path = tempfile.mkstemp(prefix="chat_history_", suffix=".db", dir=self.spill_dir)
+            os.close(fd)
+            # Scratch data that dies with the process, so no journal and no fsync
+            self._conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode = OFF")
+            self._conn.execute("PRAGMA synchronous = OFF")
+            atexit.register(self.close)
+        return self._conn
+
+    def _forget_memory(self, key):
+        session_id, rows, size = self._memory.pop(key)
+        self._memory_bytes -= size
+        self._session_bytes[session_id] -= size
+        return session_id, rows
+
+    ## Function To move one in-memory result to the scratch file
+    def _spill(self, key):
+        session_id, rows = self._forget_memory(key)
+        if rows:
+            conn = self._scratch()
+            table = _quote(f"r_{key}")
+            width = len(rows[0])
+            # Untyped columns keep every value exactly as SQLite returned it
+            conn.execute(f"CREATE TABLE {table} ({', '.join(f'c{i}' for i in range(width))})")
+            conn.execute("BEGIN")
+            conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * width)})", rows)
+            conn.execute("COMMIT")
+        self._spilled[key] = session_id
+        self.spills += 1
+        if rows:
+            self._enforce_spill_budget()
+
+    def _scratch_bytes(self):
+        # Dropped tables leave free pages behind, which later spills reuse
+        conn = self._scratch()
+        used_pages = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return used_pages * conn.execute("PRAGMA page_size").fetchone()[0]
+
+    ## Function To drop the oldest spilled results, whatever session they belong to, past the scratch budget
+    def _enforce_spill_budget(self):
+        while self._spilled and self._scratch_bytes() > self.spill_budget:
+            key, _ = self._spilled.popitem(last=False)
+            self._conn.execute(f"DROP TABLE IF EXISTS {_quote(f'r_{key}')}")
+            self.evictions += 1
+
+    def _enforce_budgets(self, session_id, keep):
+        for key in [key for key, entry in self._memory.items() if entry[0] == session_id]:
+            if self._session_bytes[session_id] <= self.session_budget:
+                break
+            if key != keep:
+                self._spill(key)
+        for key in list(self._memory):
+            if self._memory_bytes <= self.global_budget:
+                break
+            if key != keep:
+                self._spill(key)
+
+    def _admit(self, key, session_id, rows):
+        size = _rows_size(rows)
+        self._memory[key] = (session_id, rows, size)
+        self._memory_bytes += size
+        self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + size
+        self._enforce_budgets(session_id, key)
+
+    def put(self, session_id, rows):
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._admit(key, session_id, list(rows))
+        return key
+
+    ## Function To get the full rows of a result, reading them back from disk if they were spilled
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry[1]
+            session_id = self._spilled.pop(key, None)
+            if session_id is None:
+                return None
+            table = _quote(f"r_{key}")
+            try:
+                rows = self._scratch().execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+                self._conn.execute(f"DROP TABLE {table}")
+            except sqlite3.OperationalError:
+                # Empty results are never written
+                rows = []
+            self.loads += 1
+            self._admit(key, session_id, rows)
+            return rows
+
+    def release(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._forget_memory(key)
+            elif self._spilled.pop(key, None) is not None:
+                try:
+                    self._scratch().execute(f"DROP TABLE IF EXISTS {_quote(f'r_{key}')}")
+                except sqlite3.Error as e:
+                    print(f"Error releasing history result: {str(e)}")
+
+    def release_session(self, session_id):
+        with self._lock:
+            keys = [key for key, entry in self._memory.items() if entry[0] == session_id]
+            keys += [key for key, owner in self._spilled.items() if owner == session_id]
+        for key in keys:
+            self.release(key)
+        with self._lock:
+            self._session_bytes.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_memory": len(self._memory),
+                "memory_mb": round(self._memory_bytes / 1024 / 1024, 2),
+                "on_disk": len(self._spilled),
+                "spills": self.spills,
+                "loads": self.loads,
+                "evicted": self.evictions,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                try:
+                    os.remove(self._path)
+                except OSError:
+                    pass
+
+
+# Shared by every session of the process, so the global budget holds across sessions
+_result_store = ResultStore()
+
+
+def get_result_store():
+    return _result_store
+
+
+# --- What a chat history entry keeps of an answer ---
+class StoredResult:
+    def __init__(self, session_id, result, preview_rows=HISTORY_PREVIEW_ROWS, store=None):
+        self.store = store or _result_store
+        self.columns = result.columns
+        self.truncated = result.truncated
+        self.row_count = len(result.rows)
+        self.page_size = result.page_size
+        self.preview = result.rows[:preview_rows]
+        self.key = self.store.put(session_id, result.rows)
+        # Rows past the ones read, or rows the store has dropped, come from the database again
+        self._source = PagedResult(
+            result.db_path, result.sql, result.columns, [], True, result.page_size, result.budget, result.pool
+        )
+
+    @property
+    def rows(self):
+        rows = self.store.get(self.key)
+        return self.preview if rows is None else rows
+
+    @property
+    def total_rows(self):
+        return self._source.total_rows if self.truncated else self.row_count
+
+    @property
+    def page_count(self):
+        return max(1, math.ceil(self.total_rows / self.page_size))
+
+    ## Function To get the rows of one page (1-based); pages inside the preview never touch the store
+    def page(self, number, page_size=None):
+        page_size = page_size or self.page_size
+        start = (number - 1) * page_size
+        end = start + page_size
+        if end <= len(self.preview) or (len(self.preview) == self.row_count and not self.truncated):
+            return self.preview[start:end]
+        if end <= self.row_count or not self.truncated:
+            rows = self.store.get(self.key)
+            if rows is not None:
+                return rows[start:end]
+        if start >= self.row_count and not self.truncated:
+            return []
+        return self._source.page(number, page_size)
+
+    def release(self):
+        self.store.release(self.key)
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+## Function To drop the oldest chat history entries beyond max_entries, freeing their stored rows
+def trim_history(history, max_entries=HISTORY_MAX_ENTRIES):
+    while len(history) > max_entries:
+        entry = history.pop(0)
+        values = entry.values() if isinstance(entry, dict) else entry
+        for value in values:
+            if isinstance(value, StoredResult):
+                value.release()
@@ -0,0 +1,531 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from query_budget import QueryBudget, enforce_budget
+from sql_tokenizer import identifier_name, is_keyword, tokenize
+
+# --- Configuration ---
+ADVISOR_DIR = os.getenv("INDEX_ADVISOR_DIR", os.path.join(os.path.dirname(__file__), ".index_advisor"))
+MAX_LOGGED_QUERIES = int(os.getenv("INDEX_ADVISOR_MAX_QUERIES", "5000"))
+FLUSH_SECONDS = float(os.getenv("INDEX_ADVISOR_FLUSH_SECONDS", "30"))
+MAX_COVERING_COLUMNS = 6
+TIMING_RUNS = 3
+
+CLAUSE_KEYWORDS = {"SELECT", "FROM", "WHERE", "GROUP", "ORDER", "HAVING", "LIMIT", "WINDOW"}
+COMPARISONS = {"=", "==", "<", ">", "<=", ">=", "!=", "<>", "LIKE", "GLOB", "BETWEEN", "IN", "IS"}
+AGGREGATES = {"COUNT", "SUM", "AVG", "MIN", "MAX", "TOTAL", "GROUP_CONCAT"}
+JOIN_WORDS = {"AS", "ON", "USING", "LEFT", "RIGHT", "FULL", "INNER", "CROSS", "NATURAL", "OUTER"}
+
+
+# --- Workload log ---
+# Executed queries are counted in memory, per statement, and written out every
+# INDEX_ADVISOR_FLUSH_SECONDS and at exit. The log keeps one line per distinct statement
+# (count, mean time, last run), at most INDEX_ADVISOR_MAX_QUERIES of them per dataset.
+class WorkloadLog:
+    def __init__(self, directory=ADVISOR_DIR, max_queries=MAX_LOGGED_QUERIES, flush_seconds=FLUSH_SECONDS):
+        self.directory = directory
+        self.max_queries = max_queries
+        self.flush_seconds = flush_seconds
+        # dataset -> {(db_path, sql): [count, total ms, last run]}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._flusher = None
+        self.dropped = 0
+
+    def path(self, dataset):
+        return os.path.join(self.directory, f"{dataset}.jsonl")
+
+    def record(self, dataset, db_path, sql, seconds):
+        key = (os.path.abspath(db_path), sql.strip())
+        with self._lock:
+            shapes = self._pending.setdefault(dataset, {})
+            stats = shapes.get(key)
+            if stats is None:
+                if len(shapes) >= self.max_queries:
+                    self.dropped += 1
+                    return
+                stats = shapes[key] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += seconds * 1000
+            stats[2] = time.time()
+            if self._flusher is None and self.flush_seconds > 0:
+                self._flusher = threading.Thread(target=self._flush_periodically, name="index-advisor-log", daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    ## Function To merge the counted queries into the datasets' logs on disk
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        with self._file_lock:
+            for dataset, shapes in pending.items():
+                merged = {}
+                for entry in self.load(dataset):
+                    key = (entry["db_path"], entry["sql"].strip())
+                    count = entry.get("count", 1)
+                    known = merged.setdefault(key, [0, 0.0, 0.0])
+                    known[0] += count
+                    known[1] += entry["ms"] * count
+                    known[2] = max(known[2], entry["at"])
+                for key, (count, total_ms, at) in shapes.items():
+                    known = merged.setdefault(key, [0, 0.0, 0.0])
+                    known[0] += count
+                    known[1] += total_ms
+                    known[2] = max(known[2], at)
+                # Over the cap, the statements that ran longest ago go first
+                kept = sorted(merged.items(), key=lambda item: item[1][2])[-self.max_queries:]
+                os.makedirs(self.directory, exist_ok=True)
+                path = self.path(dataset)
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    for (db_path, sql), (count, total_ms, at) in kept:
+                        entry = {"db_path": db_path, "sql": sql, "count": count, "ms": round(total_ms / count, 3), "at": at}
+                        f.write(json.dumps(entry) + "\n")
+                os.replace(path + ".tmp", path)
+
+    def load(self, dataset):
+        path = self.path(dataset)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+_workload_log = WorkloadLog()
+atexit.register(_workload_log.flush)
+
+
+def get_workload_log():
+    return _workload_log
+
+
+## Function To count one executed query with its timing (no disk I/O on the query path)
+def record_query(dataset, db_path, sql, seconds):
+    _workload_log.record(dataset, db_path, sql, seconds)
+
+
+def load_workload(dataset):
+    return _workload_log.load(dataset)
+
+
+# --- SQL analysis ---
+def _split_select_blocks(tokens):
+    # Every (SELECT ...) becomes its own block, replaced in its parent by a placeholder
+    blocks = []
+    stack = [[[], 0]]
+    for index, token in enumerate(tokens):
+        current = stack[-1]
+        if token.value == "(" and index + 1 < len(tokens) and is_keyword(tokens[index + 1], "SELECT", "WITH"):
+            stack.append([[], 0])
+            continue
+        if token.value == "(":
+            current[1] += 1
+        elif token.value == ")":
+            if current[1] == 0 and len(stack) > 1:
+                blocks.append(stack.pop()[0])
+                stack[-1][0].append(token._replace(kind="op", value="(subquery)"))
+                continue
+            current[1] -= 1
+        current[0].append(token)
+    blocks.append(stack[0][0])
+    return blocks
+
+
+def _clauses(block):
+    clauses = {}
+    current = None
+    depth = 0
+    index = 0
+    while index < len(block):
+        token = block[index]
+        if token.value == "(":
+            depth += 1
+        elif token.value == ")":
+            depth -= 1
+        if depth == 0 and token.kind == "word" and token.value.upper() in CLAUSE_KEYWORDS:
+            current = token.value.upper()
+            clauses[current] = []
+            if current in ("GROUP", "ORDER") and index + 1 < len(block) and is_keyword(block[index + 1], "BY"):
+                index += 1
+        elif current:
+            clauses[current].append(token)
+        index += 1
+    return clauses
+
+
+def _split_top_level(tokens, separator):
+    parts = [[]]
+    depth = 0
+    in_between = False
+    for token in tokens:
+        if token.value == "(":
+            depth += 1
+        elif token.value == ")":
+            depth -= 1
+        if depth == 0 and is_keyword(token, "BETWEEN"):
+            in_between = True
+        if depth == 0 and (token.value == separator or is_keyword(token, separator)):
+            # The AND of "BETWEEN x AND y" does not separate conditions
+            if separator == "AND" and in_between:
+                in_between = False
+            else:
+                parts.append([])
+                continue
+        parts[-1].append(token)
+    return [part for part in parts if part]
+
+
+def _wrapped(tokens):
+    # True for "( ... )" where the first parenthesis closes at the very end
+    if tokens[0].value != "(" or tokens[-1].value != ")":
+        return False
+    depth = 0
+    for token in tokens[:-1]:
+        depth += token.value == "("
+        depth -= token.value == ")"
+        if depth == 0:
+            return False
+    return True
+
+
+class _Scope:
+    def __init__(self, from_tokens, schema):
+        self.schema = schema
+        self.aliases = {}
+        expect_table = True
+        depth = 0
+        previous = None
+        for token in from_tokens:
+            if token.value == "(":
+                depth += 1
+            elif token.value == ")":
+                depth -= 1
+            if depth:
+                continue
+            if token.value == "," or is_keyword(token, "JOIN"):
+                expect_table = True
+            elif token.kind in ("word", "quoted") and expect_table and not is_keyword(token, *JOIN_WORDS):
+                name = identifier_name(token)
+                if name in schema:
+                    self.aliases[name] = name
+                    previous = name
+                expect_table = False
+            elif token.kind in ("word", "quoted") and previous and not is_keyword(token, *JOIN_WORDS):
+                self.aliases[identifier_name(token)] = previous
+                previous = None
+            elif is_keyword(token, "ON", "USING"):
+                previous = None
+
+    def tables(self):
+        return set(self.aliases.values())
+
+    def column(self, tokens):
+        # Resolves [alias.]column tokens to (table, column), or None
+        names = [identifier_name(t) for t in tokens if t.value != "."]
+        if len(tokens) == 3 and tokens[1].value == "." and names[0] in self.aliases:
+            table = self.aliases[names[0]]
+            return (table, names[1]) if names[1] in self.schema[table] else None
+        if len(tokens) == 1 and tokens[0].kind in ("word", "quoted"):
+            owners = [table for table in self.tables() if names[0] in self.schema[table]]
+            return (owners[0], names[0]) if len(owners) == 1 else None
+        return None
+
+    def expression(self, tokens):
+        # Resolves an expression over the columns of one table to (table, index expression text)
+        while len(tokens) > 2 and _wrapped(tokens):
+            tokens = tokens[1:-1]
+        if any(t.value == "(subquery)" or is_keyword(t, *AGGREGATES) for t in tokens):
+            return None
+        parts = []
+        tables = set()
+        index = 0
+        while index < len(tokens):
+            window = tokens[index:index + 3]
+            column = self.column(window) if len(window) == 3 and window[1].value == "." else None
+            if column:
+                index += 3
+            else:
+                column = self.column(tokens[index:index + 1]) if tokens[index].kind in ("word", "quoted") else None
+                index += 1
+            if column:
+                tables.add(column[0])
+                parts.append(column[1])
+            else:
+                parts.append(tokens[index - 1].value)
+        if len(tables) != 1 or len(tokens) < 3:
+            return None
+        text = " ".join(parts).replace("( ", "(").replace(" )", ")").replace(" ,", ",")
+        return tables.pop(), text
+
+
+def _strip_direction(tokens):
+    while tokens and is_keyword(tokens[-1], "ASC", "DESC", "FIRST", "LAST", "NULLS"):
+        tokens = tokens[:-1]
+    return tokens
+
+
+def _select_aliases(select_items):
+    aliases = {}
+    for item in select_items:
+        if len(item) >= 3 and is_keyword(item[-2], "AS"):
+            aliases[identifier_name(item[-1]).lower()] = item[:-2]
+    return aliases
+
+
+## Function To find the index-worthy terms of one query (per table)
+def analyze_sql(sql, schema):
+    terms = {}
+
+    def terms_for(table):
+        return terms.setdefault(table, {"eq": [], "range": [], "like": [], "expr": [], "group": [], "order": [], "used": set()})
+
+    for block in _split_select_blocks(tokenize(sql)):
+        clauses = _clauses(block)
+        if "FROM" not in clauses:
+            continue
+        scope = _Scope(clauses["FROM"], schema)
+        if not scope.tables():
+            continue
+        select_items = _split_top_level(clauses.get("SELECT", []), ",")
+        aliases = _select_aliases(select_items)
+
+        for clause in ("SELECT", "WHERE", "GROUP", "ORDER", "HAVING"):
+            for index, token in enumerate(clauses.get(clause, [])):
+                column = scope.column([token])
+                if column:
+                    terms_for(column[0])["used"].add(column[1])
+                elif token.value == "." and index + 1 < len(clauses[clause]):
+                    column = scope.column(clauses[clause][index - 1:index + 2])
+                    if column:
+                        terms_for(column[0])["used"].add(column[1])
+
+        for condition in _split_top_level(clauses.get("WHERE", []), "AND"):
+            depth = 0
+            for position, token in enumerate(condition):
+                if token.value == "(":
+                    depth += 1
+                elif token.value == ")":
+                    depth -= 1
+                if depth == 0 and (token.value in COMPARISONS or is_keyword(token, *COMPARISONS)):
+                    operator = token.value.upper()
+                    left, right = condition[:position], condition[position + 1:]
+                    if left and is_keyword(left[-1], "NOT"):
+                        left = left[:-1]
+                    column = scope.column(left) or scope.column(right)
+                    if column:
+                        if operator in ("=", "==", "IN", "IS"):
+                            terms_for(column[0])["eq"].append(column[1])
+                        elif operator in ("LIKE", "GLOB"):
+                            pattern = right[0].value if right and right[0].kind == "string" else "'%"
+                            if not pattern.startswith("'%"):
+                                terms_for(column[0])["like"].append((column[1], operator))
+                        else:
+                            terms_for(column[0])["range"].append(column[1])
+                    else:
+                        expression = scope.expression(left) or scope.expression(right)
+                        if expression:
+                            terms_for(expression[0])["expr"].append(expression[1])
+                    break
+
+        for clause, kind in (("GROUP", "group"), ("ORDER", "order")):
+            for item in _split_top_level(clauses.get(clause, []), ","):
+                item = _strip_direction(item)
+                if len(item) == 1 and item[0].value.lower() in aliases:
+                    item = aliases[item[0].value.lower()]
+                column = scope.column(item)
+                if column:
+                    terms_for(column[0])[kind].append(column[1])
+                    continue
+                expression = scope.expression(item)
+                if expression:
+                    terms_for(expression[0])[kind].append(expression[1])
+    return terms
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _index_part(term):
+    # Plain columns are quoted, expressions are used as written
+    if isinstance(term, tuple):
+        return f"{_quote(term[0])} COLLATE NOCASE" if term[1] == "LIKE" else _quote(term[0])
+    if term.isidentifier():
+        return _quote(term)
+    return f"({term})" if not term.startswith("(") else term
+
+
+## Function To turn the terms of a query into candidate index definitions
+def candidate_indexes(terms):
+    candidates = []
+    for table, found in terms.items():
+        eq = list(dict.fromkeys(found["eq"]))
+        leads = [[]] if eq else []
+        leads += [[term] for kind in ("range", "like", "expr", "group", "order") for term in dict.fromkeys(found[kind])]
+        for lead in leads:
+            parts = list(dict.fromkeys(_index_part(term) for term in eq + lead))
+            candidates.append((table, tuple(parts)))
+            # Covering variant: every other column the query touches, so the table itself is never read
+            keyed = {term[0] if isinstance(term, tuple) else term for term in eq + lead}
+            extra = [_quote(column) for column in sorted(found["used"]) if column not in keyed]
+            if extra and len(parts) + len(extra) <= MAX_COVERING_COLUMNS:
+                candidates.append((table, tuple(parts + extra)))
+    return list(dict.fromkeys(candidates))
+
+
+def _index_name(table, parts):
+    digest = hashlib.sha1(f"{table}:{parts}".encode("utf-8")).hexdigest()[:8]
+    return f"idx_advisor_{table.lower()}_{digest}"
+
+
+def index_sql(table, parts):
+    return f"CREATE INDEX IF NOT EXISTS {_index_name(table, parts)} ON {_quote(table)} ({', '.join(parts)})"
+
+
+def load_schema(conn):
+    schema = {}
+    for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+        schema[table] = {row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+    return schema
+
+
+def query_plan(conn, sql):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+
+def _time_query(conn, sql):
+    timings = []
+    for _ in range(TIMING_RUNS):
+        started = time.perf_counter()
+        with enforce_budget(conn, QueryBudget(max_seconds=60)):
+            conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+# --- Advisor ---
+## Function To propose indexes for an observed workload and measure them on a scratch copy
+def advise(db_path, workload, apply=False):
+    frequency = Counter()
+    for entry in workload:
+        # Older logs have one line per run, without a count
+        frequency[entry["sql"].strip()] += entry.get("count", 1)
+    source = sqlite3.connect(db_path)
+    schema = load_schema(source)
+
+    candidates = []
+    for sql in frequency:
+        try:
+            source.execute("EXPLAIN QUERY PLAN " + sql)
+        except sqlite3.Error:
+            continue
+        candidates += candidate_indexes(analyze_sql(sql, schema))
+    candidates = list(dict.fromkeys(candidates))
+
+    report = {"db_path": db_path, "queries": [], "indexes": [], "applied": False}
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        scratch = sqlite3.connect(os.path.join(scratch_dir, "scratch.db"))
+        source.backup(scratch)
+
+        runnable = {}
+        for sql, count in frequency.items():
+            try:
+                runnable[sql] = {"count": count, "plan_before": query_plan(scratch, sql), "ms_before": _time_query(scratch, sql)}
+            except sqlite3.Error as e:
+                print(f"Skipping query that no longer runs ({str(e)}): {sql}")
+
+        sql_of = {id(stats): sql for sql, stats in runnable.items()}
+
+        created = {}
+        for table, parts in candidates:
+            try:
+                scratch.execute(index_sql(table, parts))
+                created[_index_name(table, parts)] = (table, parts)
+            except sqlite3.Error as e:
+                print(f"Skipping candidate index on {table} ({', '.join(parts)}): {str(e)}")
+        scratch.execute("ANALYZE")
+
+        # Keep only the indexes the planner actually picks for the workload
+        used = set()
+        for sql, stats in runnable.items():
+            stats["plan_after"] = query_plan(scratch, sql)
+            used |= {name for name in created if any(name in step for step in stats["plan_after"])}
+        for name in set(created) - used:
+            scratch.execute(f"DROP INDEX {name}")
+        for sql, stats in runnable.items():
+            stats["plan_after"] = query_plan(scratch, sql)
+            stats["ms_after"] = _time_query(scratch, sql)
+
+        # A selective-looking index can still lose to a plain scan; drop the ones that made their queries slower
+        for name in sorted(used):
+            users = [stats for stats in runnable.values() if any(name in step for step in stats["plan_after"])]
+            if sum(s["ms_after"] * s["count"] for s in users) >= sum(s["ms_before"] * s["count"] for s in users):
+                scratch.execute(f"DROP INDEX {name}")
+                used.discard(name)
+                for stats in users:
+                    stats["plan_after"] = query_plan(scratch, sql_of[id(stats)])
+                    stats["ms_after"] = _time_query(scratch, sql_of[id(stats)])
+
+        report["queries"] = [{"sql": sql, **stats} for sql, stats in runnable.items()]
+        scratch.close()
+
+    report["indexes"] = [index_sql(*created[name]) for name in sorted(used)]
+    report["workload_ms_before"] = sum(q["ms_before"] * q["count"] for q in report["queries"])
+    report["workload_ms_after"] = sum(q["ms_after"] * q["count"] for q in report["queries"])
+
+    if apply and report["indexes"]:
+        for statement in report["indexes"]:
+            source.execute(statement)
+        source.execute("ANALYZE")
+        source.commit()
+        report["applied"] = True
+    source.close()
+    return report
+
+
+def print_report(report):
+    print(f"\n=== Index advisor: {report['db_path']} ===")
+    for query in sorted(report["queries"], key=lambda q: q["ms_before"] * q["count"], reverse=True):
+        speedup = query["ms_before"] / query["ms_after"] if query["ms_after"] else float("inf")
+        print(f"\n{query['count']}x  {query['ms_before']:.2f} ms → {query['ms_after']:.2f} ms  ({speedup:.1f}x)")
+        print(f"   {query['sql']}")
+        print(f"   plan before: {'; '.join(query['plan_before'])}")
+        print(f"   plan after:  {'; '.join(query['plan_after'])}")
+    print("\nProposed indexes:" if report["indexes"] else "\nNo index improves this workload.")
+    for statement in report["indexes"]:
+        print(f"   {statement};")
+    print(f"\nObserved workload: {report['workload_ms_before']:.1f} ms → {report['workload_ms_after']:.1f} ms")
+    if report["applied"]:
+        print("Indexes created on the live database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Propose indexes from the history of generated SQL.")
+    parser.add_argument("dataset", help="dataset name used when recording queries, e.g. badjate")
+    parser.add_argument("--db", help="database path (defaults to the one recorded with the queries)")
+    parser.add_argument("--apply", action="store_true", help="create the proposed indexes on the database")
+    parser.add_argument("--json", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    workload = load_workload(args.dataset)
+    if not workload:
+        raise SystemExit(f"No recorded queries for '{args.dataset}' in {ADVISOR_DIR}")
+    # The log is ordered by last run, so the last line has the database in use
+    report = advise(args.db or workload[-1]["db_path"], workload, apply=args.apply)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,186 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from dataset_registry import DATASETS, load_pipeline
+from llm_backend import DEFAULT_STUB_FIXTURE, StubBackend
+from query_budget import QueryBudgetExceeded, budget_for
+from result_pager import RESULT_PAGE_SIZE, run_paged_query
+from sql_stream import NotSQLError, generate_statement
+from synthetic_data import build_database
+
+# End-to-end latency of the text-to-SQL pipelines, broken down per stage, on synthetic
+# databases of growing size. The LLM is the deterministic stub (no latency unless
+# LLM_STUB_LATENCY_MS is set), so runs are comparable.
+#
+#   python latency_benchmark.py --sizes 1000 100000 1000000 --out bench.json
+#   python latency_benchmark.py --out new.json --compare bench.json
+
+BENCHMARK_DIR = os.getenv("BENCHMARK_DIR", os.path.join(os.path.dirname(__file__), ".benchmark"))
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+STAGES = ["prompt", "llm", "cleanup", "execute", "dataframe", "format", "render"]
+
+
+## Function To build (or reuse) a synthetic database of the dataset's schema with the given number of rows
+def synthetic_db(dataset, rows, workers=1, seed=42):
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    path = os.path.join(BENCHMARK_DIR, f"{dataset}_{rows}_{seed}.db")
+    if not os.path.exists(path):
+        stats = build_database(dataset, path, rows, workers=workers, seed=seed)
+        print(f"{dataset}: loaded {rows} rows at {stats['rows_per_second']} rows/sec", file=sys.stderr)
+    return path
+
+
+def _questions(dataset, fixture_path=DEFAULT_STUB_FIXTURE):
+    with open(fixture_path, encoding="utf-8") as f:
+        return list(json.load(f)[dataset]["questions"])
+
+
+def _timed(samples, stage, func, *args):
+    started = time.perf_counter()
+    value = func(*args)
+    samples.setdefault(stage, []).append(1000 * (time.perf_counter() - started))
+    return value
+
+
+def _render_frame(result, module):
+    # What the results table does before st.dataframe: the first page as a frame, then Arrow
+    page_df = pd.DataFrame(result.page(1), columns=result.columns)
+    if hasattr(module, "display_formats"):
+        module.display_formats(page_df)
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return page_df
+    return pa.Table.from_pandas(page_df)
+
+
+## Function To run every fixture question of a dataset through each stage, runs times
+def benchmark_dataset(dataset, db_path, llm, runs=5):
+    module = load_pipeline(dataset)
+    samples = {}
+    aborted = []
+    for question in _questions(dataset):
+        for _ in range(runs):
+            contents = _timed(samples, "prompt", module.model_contents, question)
+            # The same streamed generation the pipelines use (LLM_STREAMING=0 for the full response)
+            refusal_markers = (getattr(module, "REFUSAL_MARKER", None),)
+            try:
+                response_text = _timed(samples, "llm", lambda: generate_statement(
+                    llm, contents, refusal_markers, question=question, dataset=dataset, **module.model_options()
+                ))
+            except NotSQLError:
+                break
+            try:
+                sql = _timed(samples, "cleanup", module.clean_response, response_text)
+            except ValueError:
+                break
+            if getattr(module, "is_refusal", lambda sql: False)(sql):
+                break
+            try:
+                result = _timed(
+                    samples, "execute", lambda: run_paged_query(db_path, sql, RESULT_PAGE_SIZE * 10, budget=budget_for(dataset))
+                )
+            except QueryBudgetExceeded:
+                # Too slow at this size; one abort is enough to know
+                aborted.append(question)
+                break
+            df = _timed(samples, "dataframe", lambda: pd.DataFrame(result.rows, columns=result.columns))
+            if hasattr(module, "display_formats"):
+                _timed(samples, "format", module.display_formats, df)
+            _timed(samples, "render", _render_frame, result, module)
+    return samples, aborted
+
+
+# Nearest rank; round() would round halves to even and move p95 of 100 samples to the 96th
+def _percentile(values, percent):
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(dataset, rows, samples, aborted):
+    summary = []
+    for stage in STAGES:
+        values = samples.get(stage)
+        if not values:
+            continue
+        summary.append({
+            "dataset": dataset,
+            "rows": rows,
+            "stage": stage,
+            "samples": len(values),
+            "mean_ms": round(statistics.mean(values), 4),
+            "p50_ms": round(_percentile(values, 50), 4),
+            "p95_ms": round(_percentile(values, 95), 4),
+            "p99_ms": round(_percentile(values, 99), 4),
+        })
+    if aborted:
+        summary.append({"dataset": dataset, "rows": rows, "stage": "aborted", "questions": aborted})
+    return summary
+
+
+def print_results(results, baseline=None):
+    previous = {}
+    for row in (baseline or {}).get("results", []):
+        if "p50_ms" in row:
+            previous[(row["dataset"], row["rows"], row["stage"])] = row
+    print(f"{'dataset':<9} {'rows':>9} {'stage':<10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}  {'p95 vs baseline':>15}")
+    for row in results:
+        if "p50_ms" not in row:
+            print(f"{row['dataset']:<9} {row['rows']:>9} aborted    {', '.join(row['questions'])}")
+            continue
+        change = ""
+        before = previous.get((row["dataset"], row["rows"], row["stage"]))
+        if before and before["p95_ms"]:
+            change = f"{(row['p95_ms'] - before['p95_ms']) / before['p95_ms']:+.0%}"
+        print(
+            f"{row['dataset']:<9} {row['rows']:>9} {row['stage']:<10} {row['p50_ms']:>10.3f} "
+            f"{row['p95_ms']:>10.3f} {row['p99_ms']:>10.3f}  {change:>15}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-stage latency of the text-to-SQL pipelines")
+    parser.add_argument("--datasets", nargs="+", default=list(DATASETS), choices=list(DATASETS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per question")
+    parser.add_argument("--out", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results file to compare p95 against")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes generating synthetic rows")
+    args = parser.parse_args()
+
+    llm = StubBackend()
+    results = []
+    for dataset in args.datasets:
+        for rows in args.sizes:
+            db_path = synthetic_db(dataset, rows, args.workers)
+            samples, aborted = benchmark_dataset(dataset, db_path, llm, args.runs)
+            results.extend(summarize(dataset, rows, samples, aborted))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "sqlite": sqlite3.sqlite_version,
+                    "runs": args.runs,
+                    "sizes": args.sizes,
+                },
+                "results": results,
+            }, f, indent=2)
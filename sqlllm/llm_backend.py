@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from query_cache import normalize_question
+
+# --- Configuration ---
+# Settings are read when the backend is built, after the apps have loaded .env
+# LLM_BACKEND=stub answers from a fixture file, so the apps run with no network
+DEFAULT_BACKEND = "gemini"
+DEFAULT_MODEL = "gemini-2.5-pro"
+DEFAULT_STUB_FIXTURE = os.path.join(os.path.dirname(__file__), "stub_fixtures.json")
+# Rough characters per token of Gemini's tokenizer on English prompts, used by the stub
+STUB_CHARS_PER_TOKEN = 4
+# Characters per streamed chunk of the stub (a few tokens, like Gemini's chunks)
+STUB_STREAM_CHUNK_CHARS = 16
+
+
+def _chunk_text(chunk):
+    # Chunks without text parts (e.g. only a finish reason) raise on .text
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+# --- Gemini backend ---
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, api_key=None, transport=None):
+        self.api_key = api_key
+        self.transport = transport
+        self._genai = None
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _client(self):
+        # google.generativeai takes about a second to import, so it is loaded with the first model, not at startup
+        if self._genai is None:
+            import google.generativeai as genai
+
+            # grpc keeps one HTTP/2 channel open and reuses it for every request
+            genai.configure(
+                api_key=self.api_key or os.getenv("GOOGLE_API_KEY"),
+                transport=self.transport or os.getenv("LLM_TRANSPORT", "grpc"),
+            )
+            self._genai = genai
+        return self._genai
+
+    ## Function To get a model object, built once per model name and configuration
+    def get_model(self, model_name=DEFAULT_MODEL, generation_config=None, safety_settings=None, system_instruction=None):
+        key = (
+            model_name,
+            json.dumps(generation_config, sort_keys=True),
+            json.dumps(safety_settings, sort_keys=True),
+            system_instruction,
+        )
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = self._client().GenerativeModel(
+                    model_name,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                    system_instruction=system_instruction,
+                )
+            return self._models[key]
+
+    ## Function To generate the full text, or with stream=True an iterator of text chunks as they arrive
+    def generate(self, contents, model_name=DEFAULT_MODEL, question=None, dataset=None, stream=False, **model_options):
+        model = self.get_model(model_name, **model_options)
+        if stream:
+            return self._stream(model.generate_content(contents, stream=True))
+        return model.generate_content(contents).text
+
+    def _stream(self, response):
+        # Leaving the loop early drops the response, which cancels the rest of the stream
+        for chunk in response:
+            yield _chunk_text(chunk)
+
+    ## Function To generate on the event loop (the gRPC aio channel, no thread per request)
+    async def generate_async(self, contents, model_name=DEFAULT_MODEL, question=None, dataset=None, stream=False,
+                             **model_options):
+        model = self.get_model(model_name, **model_options)
+        response = await model.generate_content_async(contents, stream=stream)
+        if stream:
+            return self._stream_async(response)
+        return response.text
+
+    async def _stream_async(self, response):
+        async for chunk in response:
+            yield _chunk_text(chunk)
+
+    def count_tokens(self, contents, model_name=DEFAULT_MODEL, **model_options):
+        model = self.get_model(model_name, **model_options)
+        return model.count_tokens(contents).total_tokens
+
+
+# --- Deterministic local stub ---
+class StubBackend:
+    name = "stub"
+
+    def __init__(self, fixture_path=None, latency_ms=None):
+        fixture_path = fixture_path or os.getenv("LLM_STUB_FIXTURE", DEFAULT_STUB_FIXTURE)
+        with open(fixture_path, encoding="utf-8") as f:
+            fixtures = json.load(f)
+        # Simulated model latency for load tests against the stub, plus an optional
+        # per-input-token cost so prompt size shows up in the measured latency
+        self.latency_ms = latency_ms if latency_ms is not None else float(os.getenv("LLM_STUB_LATENCY_MS", "0"))
+        self.ms_per_1k_tokens = float(os.getenv("LLM_STUB_MS_PER_1K_TOKENS", "0"))
+        # Decoding time per output token, so stopping a stream early shows up too
+        self.ms_per_output_token = float(os.getenv("LLM_STUB_MS_PER_OUTPUT_TOKEN", "0"))
+        self.defaults = {}
+        self.answers = {}
+        for dataset, fixture in fixtures.items():
+            self.defaults[dataset] = fixture.get("default", "SELECT 1;")
+            self.answers[dataset] = {
+                normalize_question(question): sql for question, sql in fixture.get("questions", {}).items()
+            }
+
+    def _latency_ms(self, contents):
+        return self.latency_ms + self.ms_per_1k_tokens * self.count_tokens(contents) / 1000
+
+    def _answer(self, question, dataset):
+        answers = self.answers.get(dataset, {})
+        return answers.get(normalize_question(question or ""), self.defaults.get(dataset, "SELECT 1;"))
+
+    def _output_ms(self, text):
+        return self.ms_per_output_token * len(text) / STUB_CHARS_PER_TOKEN
+
+    def _chunks(self, answer):
+        return [answer[i:i + STUB_STREAM_CHUNK_CHARS] for i in range(0, len(answer), STUB_STREAM_CHUNK_CHARS)]
+
+    def generate(self, contents, model_name=DEFAULT_MODEL, question=None, dataset=None, stream=False, **model_options):
+        answer = self._answer(question, dataset)
+        if stream:
+            return self._stream(self._latency_ms(contents), answer)
+        latency_ms = self._latency_ms(contents) + self._output_ms(answer)
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return answer
+
+    def _stream(self, latency_ms, answer):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        for chunk in self._chunks(answer):
+            if self.ms_per_output_token:
+                time.sleep(self._output_ms(chunk) / 1000)
+            yield chunk
+
+    async def generate_async(self, contents, model_name=DEFAULT_MODEL, question=None, dataset=None, stream=False,
+                             **model_options):
+        answer = self._answer(question, dataset)
+        if stream:
+            return self._stream_async(self._latency_ms(contents), answer)
+        latency_ms = self._latency_ms(contents) + self._output_ms(answer)
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return answer
+
+    async def _stream_async(self, latency_ms, answer):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        for chunk in self._chunks(answer):
+            if self.ms_per_output_token:
+                await asyncio.sleep(self._output_ms(chunk) / 1000)
+            yield chunk
+
+    def count_tokens(self, contents, model_name=DEFAULT_MODEL, **model_options):
+        if isinstance(contents, str):
+            contents = [contents]
+        return sum(len(part) for part in contents) // STUB_CHARS_PER_TOKEN
+
+
+## Function To tell quota / rate-limit failures (worth retrying later) from other errors
+def is_rate_limit_error(error):
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    return "429" in str(error) or "quota" in str(error).lower()
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "stub": StubBackend,
+}
+
+
+def create_backend(name=None, tier=None):
+    name = name or os.getenv("LLM_BACKEND", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    if name == "stub" and tier:
+        # A stub per model tier: its own fixture and latency (LLM_STUB_FIXTURE_FAST, LLM_STUB_LATENCY_MS_PRO, ...)
+        latency_ms = os.getenv(f"LLM_STUB_LATENCY_MS_{tier.upper()}")
+        return StubBackend(
+            fixture_path=os.getenv(f"LLM_STUB_FIXTURE_{tier.upper()}"),
+            latency_ms=float(latency_ms) if latency_ms else None,
+        )
+    return BACKENDS[name]()
+
+
+# Built once per process and shared by every session, so model objects and the channel are reused
+_backend = None
+_tier_backends = {}
+_backend_lock = threading.Lock()
+
+
+## Function To get the shared backend, or the one of a model tier when LLM_BACKEND_<TIER> is set
+def get_backend(tier=None):
+    global _backend
+    name = os.getenv(f"LLM_BACKEND_{tier.upper()}") if tier else None
+    with _backend_lock:
+        if name:
+            if tier not in _tier_backends:
+                _tier_backends[tier] = create_backend(name, tier)
+            return _tier_backends[tier]
+        if _backend is None:
+            _backend = create_backend()
+        return _backend
@@ -0,0 +1,209 @@
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from llm_backend import get_backend
+from query_cache import normalize_question
+
+# Simple questions ("How many records are there?") go to a fast model tier; questions with
+# grouping, comparisons against aggregates, date math, joins or follow-up references go to
+# the pro tier. A fast answer that does not compile or fails to run is asked again on pro;
+# a pro answer that fails is asked again once, with the error. Failed model calls are not retried here.
+
+# --- Configuration ---
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "1") != "0"
+FAST_MODEL_NAME = os.getenv("LLM_FAST_MODEL", "gemini-2.5-flash")
+# Questions scoring at most this go to the fast tier
+ROUTER_FAST_MAX_SCORE = int(os.getenv("ROUTER_FAST_MAX_SCORE", "2"))
+# Latency samples kept per tier for the percentiles
+ROUTER_LATENCY_SAMPLES = int(os.getenv("ROUTER_LATENCY_SAMPLES", "500"))
+
+FAST = "fast"
+PRO = "pro"
+# Source of an answer that was already the one retry
+RETRY = "retry"
+
+AGGREGATE_WORDS = {"average", "avg", "mean", "median", "sum", "total", "ratio", "percentage", "percent", "rate"}
+GROUPING_WORDS = {"each", "per", "wise", "group", "grouped", "breakdown", "distribution"}
+COMPARISON_WORDS = {"compared", "compare", "versus", "vs", "than", "above", "below", "relative", "exceed", "exceeds"}
+DATE_WORDS = {
+    "day", "days", "daily", "week", "weeks", "weekly", "month", "months", "monthly", "quarter", "quarterly",
+    "year", "years", "yearly", "date", "dates", "since", "between", "ago", "duration", "holding", "period",
+}
+JOIN_WORDS = {"join", "joined", "combine", "combined", "along"}
+FOLLOW_UP_WORDS = {"these", "those", "them", "previous", "above", "earlier", "same"}
+
+
+## Function To score how hard a question is to turn into SQL, with the features that counted
+def complexity_score(question, chat_history=None, tables=()):
+    words = normalize_question(question).split()
+    terms = set(words)
+    features = {}
+    if terms & AGGREGATE_WORDS:
+        features["aggregation"] = 1
+    if terms & GROUPING_WORDS:
+        features["grouping"] = 2
+    if terms & COMPARISON_WORDS:
+        # "above sector average" needs a subquery; "more than 100" is a plain filter
+        features["comparison"] = 2 if terms & AGGREGATE_WORDS else 1
+    if terms & DATE_WORDS:
+        features["date_math"] = 2
+    mentioned = {table for table in tables if table.lower() in terms}
+    if terms & JOIN_WORDS or len(mentioned) > 1:
+        features["join"] = 2
+    if chat_history and terms & FOLLOW_UP_WORDS:
+        features["follow_up"] = 3
+    if len(words) > 14:
+        features["long"] = 1
+    return sum(features.values()), features
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+# --- Routing and escalation for one dataset ---
+class ModelRouter:
+    def __init__(self, dataset, pro_model, fast_model=FAST_MODEL_NAME, fast_max_score=ROUTER_FAST_MAX_SCORE,
+                 tables=(), enabled=MODEL_ROUTING):
+        self.dataset = dataset
+        self.models = {FAST: fast_model, PRO: pro_model}
+        self.fast_max_score = fast_max_score
+        self.tables = tables
+        self.enabled = enabled
+        self._latencies = {FAST: deque(maxlen=ROUTER_LATENCY_SAMPLES), PRO: deque(maxlen=ROUTER_LATENCY_SAMPLES)}
+        self._requests = {FAST: 0, PRO: 0}
+        self._escalations = {"invalid": 0, "execution": 0}
+        self._retries = {"invalid": 0, "execution": 0}
+        # Where recent SQL came from (fast, pro or retry), so a failure to run it is handled once
+        self._answers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def route(self, question, chat_history=None):
+        if not self.enabled:
+            return PRO
+        score, _ = complexity_score(question, chat_history, self.tables)
+        return FAST if score <= self.fast_max_score else PRO
+
+    def backend(self, tier):
+        return get_backend(tier)
+
+    def model_name(self, tier):
+        return self.models[tier]
+
+    def _record(self, tier, started):
+        with self._lock:
+            self._requests[tier] += 1
+            self._latencies[tier].append(1000 * (time.perf_counter() - started))
+
+    ## Function To ask one tier, timing the call; ask(tier, feedback) returns the SQL
+    # feedback is (failed SQL, error) when a previous answer to the question failed
+    def ask_tier(self, tier, ask, feedback=None):
+        started = time.perf_counter()
+        try:
+            return ask(tier, feedback)
+        finally:
+            self._record(tier, started)
+
+    async def ask_tier_async(self, tier, ask, feedback=None):
+        started = time.perf_counter()
+        try:
+            return await ask(tier, feedback)
+        finally:
+            self._record(tier, started)
+
+    def _remember(self, sql, source):
+        with self._lock:
+            self._answers[sql] = source
+            self._answers.move_to_end(sql)
+            while len(self._answers) > 256:
+                self._answers.popitem(last=False)
+        return sql
+
+    def _accepted(self, question, tier, sql, error):
+        if error is None:
+            self._remember(sql, tier)
+            return True
+        print(f"{self.models[tier]} answer rejected, asking {self.models[PRO]} again: {error}")
+        self.record_retry(tier, "invalid")
+        return False
+
+    ## Function To get SQL from the routed tier; ask(tier, feedback) generates, validate(sql) returns an error or None
+    # An answer that fails validation gets one more try, on pro and told the error
+    def generate(self, question, chat_history, ask, validate=None):
+        tier = self.route(question, chat_history)
+        sql = None
+        try:
+            sql = self.ask_tier(tier, ask)
+            error = validate(sql) if validate else None
+        except ValueError as e:
+            # An answer that is not SQL is retried; a failed model call (network, rate limit) is the
+            # caller's to handle, as asking pro would fail or be throttled the same way
+            error = str(e)
+        if self._accepted(question, tier, sql, error):
+            return sql
+        return self._remember(self.ask_tier(PRO, ask, (sql, error)), RETRY)
+
+    async def generate_async(self, question, chat_history, ask, validate=None):
+        tier = self.route(question, chat_history)
+        sql = None
+        try:
+            sql = await self.ask_tier_async(tier, ask)
+            error = validate(sql) if validate else None
+            if inspect.isawaitable(error):
+                # validate may run off the event loop and hand back a future
+                error = await error
+        except ValueError as e:
+            error = str(e)
+        if self._accepted(question, tier, sql, error):
+            return sql
+        return self._remember(await self.ask_tier_async(PRO, ask, (sql, error)), RETRY)
+
+    ## Function To tell where SQL came from: fast, pro, retry, or None (a cache or a template)
+    def source_of(self, sql):
+        with self._lock:
+            return self._answers.get(sql)
+
+    ## Function To count a second model call: an escalation when the first answer came from the fast tier
+    def record_retry(self, tier, reason):
+        with self._lock:
+            if tier == FAST:
+                self._escalations[reason] += 1
+            else:
+                self._retries[reason] += 1
+
+    def stats(self):
+        with self._lock:
+            escalations = sum(self._escalations.values())
+            return {
+                "tiers": {
+                    tier: {
+                        "model": self.models[tier],
+                        "requests": self._requests[tier],
+                        "p50_ms": round(_percentile(self._latencies[tier], 50), 1),
+                        "p95_ms": round(_percentile(self._latencies[tier], 95), 1),
+                    }
+                    for tier in (FAST, PRO)
+                },
+                "escalations": dict(self._escalations),
+                "retries": dict(self._retries),
+                # Share of fast-tier answers that had to be asked again on pro
+                "escalation_rate": escalations / self._requests[FAST] if self._requests[FAST] else 0.0,
+            }
+
+
+# One router per dataset, shared by every session of the process
+_routers = {}
+_routers_lock = threading.Lock()
+
+
+def get_model_router(dataset, pro_model, tables=()):
+    with _routers_lock:
+        if dataset not in _routers:
+            _routers[dataset] = ModelRouter(dataset, pro_model, tables=tables)
+        return _routers[dataset]
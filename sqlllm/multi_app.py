@@ -0,0 +1,53 @@
+from app_setup import load_environment
+load_environment()  ## once per process: the pipelines read their settings from the environment when imported
+
+from run_timing import RUN_TIMING, get_run_timings, timed_run  ## before the other imports, so the cold start includes them
+
+import logging
+import os
+
+import streamlit as st
+
+from dataset_registry import DATASETS, get_dataset
+
+logging.getLogger("streamlit.runtime.scriptrunner.script_runner").setLevel(logging.ERROR)
+
+# One Streamlit process for every dataset in dataset_registry.py, one page each. The pages
+# share the LLM backend, connection pools and caches; a dataset's pipeline is only built
+# when its page is first opened.
+#
+#   streamlit run multi_app.py
+#   RUN_TIMING=1 streamlit run multi_app.py   # cold start and per-rerun script time
+#
+# The per-dataset scripts (fin_app.py, bombay.py, app.py, ...) serve a single page of this app.
+
+
+## Function To get the Streamlit page of a dataset: its own script, or the shared chat page
+def dataset_page(name):
+    dataset = get_dataset(name)
+    if dataset["page"]:
+        page = os.path.join(os.path.dirname(os.path.abspath(__file__)), dataset["page"])
+        return st.Page(page, title=dataset["title"], icon=dataset["icon"], url_path=name)
+
+    def chat():
+        from chat_page import render_chat
+        render_chat(name)
+    return st.Page(chat, title=dataset["title"], icon=dataset["icon"], url_path=name)
+
+
+## Function To serve the pages of the given datasets (the navigation is hidden for a single one)
+def serve(names):
+    pages = [dataset_page(name) for name in names]
+    page = st.navigation(pages, position="sidebar" if len(pages) > 1 else "hidden")
+    with timed_run(page.url_path or names[0]):
+        page.run()
+    if RUN_TIMING:
+        timings = get_run_timings().stats()
+        st.sidebar.caption(
+            f"⏱️ Cold start {timings['cold_start_ms']:.0f} ms, reruns {timings['rerun_p50_ms'] or 0:.1f} ms p50 "
+            f"/ {timings['rerun_p95_ms'] or 0:.1f} ms p95 over {timings['runs'] - 1}"
+        )
+
+
+if __name__ == "__main__":
+    serve(list(DATASETS))
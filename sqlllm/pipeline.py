@@ -0,0 +1,704 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db_pool import POOL_SIZE, get_pool
+from follow_up import LATEST_TABLE, get_session_results, references_workspace, release_session_results
+from index_advisor import record_query
+from llm_backend import get_backend
+from model_router import FAST, PRO, RETRY, get_model_router
+from prompt_assembler import get_prompt_assembler
+from query_budget import QueryBudgetExceeded, budget_for
+from query_cache import db_version, get_query_cache
+from query_templates import template_sql
+from result_pager import run_paged_query
+from schema_catalog import schema_prompt
+from semantic_cache import get_semantic_index, semantic_index_stats
+from sql_repair import feedback_prompt, repair_sql, repair_values
+from sql_stream import generate_statement, generate_statement_async
+from sql_validator import compile_error, extract_sql
+from warm_up import start_warm_up, warm_result
+
+# The badjate text-to-SQL pipeline (question → SQL → rows), shared by the Streamlit app,
+# the HTTP query service and any other client
+
+# Database setup
+DB_NAME = "badjate.db"
+db_path = os.path.join(os.path.dirname(__file__), DB_NAME)
+
+# Question → SQL cache, shared by all sessions of this process; the index of answered
+# questions (faiss) is only loaded when the first question is looked up
+DATASET_NAME = "badjate"
+sql_cache = get_query_cache()
+
+## Shared LLM backend (configured once per process, model objects are reused)
+MODEL_NAME = "gemini-2.5-pro"
+llm = get_backend()
+# Simple questions go to the fast tier; MODEL_NAME is the pro tier they escalate to
+router = get_model_router(DATASET_NAME, MODEL_NAME, tables=["Recommendations"])
+
+# Model configuration for better performance
+generation_config = {
+    "temperature": 0.1,  # Low temperature for more deterministic SQL generation
+    "top_p": 0.8,        # Nucleus sampling for focused responses
+    "top_k": 40,         # Limit vocabulary for more precise SQL
+    "max_output_tokens": 2048,  # Sufficient for complex SQL queries
+    "response_mime_type": "text/plain",
+}
+
+# Safety settings for production use
+safety_settings = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    }
+]
+
+# Phrases that mark a question as a follow-up on the previous results
+follow_up_indicators = [
+    'in this result', 'from these', 'in the above', 'from this data',
+    'these stocks', 'those results', 'from them', 'in these',
+    'from the previous', 'from last query', 'in that result'
+]
+# ...and words that on their own point at them ("sort these by performance")
+follow_up_words = {'these', 'those', 'them'}
+
+# What the columns mean; names and types come from the database itself (see schema_catalog.py)
+COLUMN_NOTES = {
+    "OrderID": "unique identifier for each recommendation",
+    "StockName": "company names like TCS, Reliance, HDFC Bank, Infosys, Maruti Suzuki, etc.",
+    "BuyDate": "date when stock was purchased, format: YYYY-MM-DD",
+    "BuyPrice": "entry price, purchase price, cost price at which stock was bought",
+    "SellDate": "date when stock was sold, exit date, format: YYYY-MM-DD",
+    "SellPrice": "exit price, selling price at which stock was sold",
+    "Target": "target price, goal price, upside target for the stock",
+    "StopLoss": "stop loss price, downside protection, risk management price",
+    "Category": "sector, industry - IT, Banking, Energy, Auto, Telecom, FMCG, Retail",
+}
+
+# Words users say for the columns of a previous result, and values they mean that are not columns,
+# for answering plain follow-ups ("sort these by performance") on the session's previous results
+FOLLOW_UP_SYNONYMS = {
+    "sector": "Category", "industry": "Category", "stock": "StockName", "company": "StockName",
+    "name": "StockName", "bought": "BuyDate", "sold": "SellDate", "stoploss": "StopLoss",
+    "performance": "Profit", "return": "Profit", "gain": "Profit", "pnl": "Profit",
+}
+FOLLOW_UP_DERIVED = {
+    word: ("Profit", "SellPrice - BuyPrice")
+    for word in ["profit", "performance", "return", "gain", "pnl", "profitloss", "gainloss"]
+}
+FOLLOW_UP_DERIVED["holding"] = FOLLOW_UP_DERIVED["duration"] = ("HoldingDays", "julianday(SellDate) - julianday(BuyDate)")
+
+system_instruction = "You are a specialized SQL query generator for stock market data analysis. You can understand context from previous queries and maintain conversation flow. Focus on generating accurate, efficient SQLite queries based on the provided schema, examples, and conversation history."
+
+# Returned when the model fails or answers with something that is not a query
+FALLBACK_SQL = "SELECT * FROM Recommendations LIMIT 10;"
+
+# SQLite calls are blocking, so async clients run them on a thread pool the size of the connection pool
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="sqlite")
+
+
+def _in_executor(function, *args):
+    return asyncio.get_running_loop().run_in_executor(_executor, function, *args)
+
+
+def is_follow_up(question):
+    question = question.lower()
+    if any(indicator in question for indicator in follow_up_indicators):
+        return True
+    return not follow_up_words.isdisjoint(re.findall(r"[a-z]+", question))
+
+
+## Function To summarize the last few questions and their results for a follow-up prompt
+def build_history_context(chat_history):
+    context_info = ""
+    if chat_history and len(chat_history) > 0:
+        context_info = "\n\nCONVERSATION CONTEXT:\n"
+        
+        # Include last 3 interactions for context
+        recent_history = chat_history[-3:] if len(chat_history) > 3 else chat_history
+        
+        for i, chat in enumerate(recent_history):
+            context_info += f"\nPrevious Query {i+1}:\n"
+            context_info += f"User asked: {chat['question']}\n"
+            context_info += f"Generated SQL: {chat['sql']}\n"
+            
+            if chat['success'] and len(chat['data']) > 0:
+                # Include column names and sample data for context
+                context_info += f"Results had columns: {', '.join(chat['data'].columns.tolist())}\n"
+                context_info += f"Number of records: {chat.get('row_count', len(chat['data']))}\n"
+                
+                # Include key information from results
+                if 'StockName' in chat['data'].columns:
+                    stocks = chat['data']['StockName'].unique()[:5]  # First 5 stocks
+                    context_info += f"Stocks in results: {', '.join(stocks)}\n"
+                
+                if 'Category' in chat['data'].columns:
+                    categories = chat['data']['Category'].unique()
+                    context_info += f"Categories in results: {', '.join(categories)}\n"
+            else:
+                context_info += "No results found\n"
+    return context_info
+
+
+## Function To get the materialized previous results of a session (see follow_up.py)
+def session_results(session_id):
+    return get_session_results(
+        DATASET_NAME, session_id, db_path, FOLLOW_UP_SYNONYMS, FOLLOW_UP_DERIVED, metric="profit"
+    )
+
+
+def _workspace(question, chat_history, session_id):
+    if session_id is None or not (is_follow_up(question) and chat_history):
+        return None
+    workspace = session_results(session_id)
+    return workspace if len(workspace) else None
+
+
+## Function To answer a plain sort/filter/group follow-up from the previous result, with no model call
+def local_follow_up_sql(question, chat_history=None, session_id=None):
+    workspace = _workspace(question, chat_history, session_id)
+    return workspace.local_sql(question) if workspace is not None else None
+
+
+## Function To build the full prompt for a question (and the conversation so far, for follow-ups)
+def build_prompt(question, chat_history=None, mode=None, session_id=None):
+    follow_up = bool(is_follow_up(question) and chat_history)
+
+    # Only the examples and rules relevant to this question are sent, not the whole static prompt
+    instructions = get_prompt_assembler(prompt[0]).build(question, follow_up=follow_up, mode=mode)
+    instructions = instructions.replace("{schema}", schema_prompt(db_path, COLUMN_NOTES))
+
+    # Enhanced prompt for context-aware queries
+    if follow_up:
+        context_info = build_history_context(chat_history)
+        workspace = _workspace(question, chat_history, session_id)
+        if workspace is not None:
+            # The previous answers can be queried as they are instead of re-deriving them
+            context_info += f"""
+PREVIOUS RESULTS AS TABLES (query these directly; Recommendations is still available for more details):
+{workspace.describe()}
+- "these", "this result", "the above" mean {LATEST_TABLE}
+"""
+        context_prompt = f"""
+CONTEXT-AWARE QUERY GENERATION:
+The user is asking a follow-up question referring to previous results.
+
+Previous conversation context: {context_info}
+
+FOLLOW-UP QUESTION HANDLING RULES:
+- When user says "in this result" or "from these", they refer to the LAST query's results
+- When user says "these stocks", filter by StockName from the previous results
+- When user says "this data", apply new analysis to the previous result set
+- Use WHERE clauses to filter based on previous results when appropriate
+- If they want analysis "from previous results", create a subquery or use the same filters
+
+Current follow-up question: {question}
+
+Generate a SQL query that considers the context of previous results.
+"""
+        return f"{instructions}\n{context_prompt}\n\nGenerate only the SQL query:"
+    # Regular query without context
+    return f"{instructions}\n\nUser Question: {question}\n\nGenerate only the SQL query without any additional text or formatting:"
+
+
+def model_contents(question, chat_history=None):
+    return build_prompt(question, chat_history)
+
+
+## Function To turn the model's answer into a single SELECT statement
+# The statement is cut out with the SQL tokenizer, so CASE ... THEN lines and WITH queries survive
+def clean_sql(response_text):
+    return extract_sql(response_text)
+
+
+## Function To answer from a query template, the exact cache or a near-duplicate question (None on a miss)
+def cached_sql(question, chat_history=None):
+    # Follow-ups depend on the previous results, so only standalone questions are cached
+    if is_follow_up(question) and chat_history:
+        return None
+    # Known intents (the sidebar's sample queries and their variants) have ready-made SQL
+    sql = template_sql(DATASET_NAME, db_path, question)
+    if sql:
+        return sql
+    sql = sql_cache.get(DATASET_NAME, db_path, question)
+    if sql:
+        return sql
+
+    # Reuse the SQL of a near-duplicate question that already ran successfully
+    sql = get_semantic_index(DATASET_NAME).lookup(question, db_path)
+    if sql:
+        sql_cache.put(DATASET_NAME, db_path, question, sql)
+    return sql
+
+
+def model_options():
+    return {
+        "model_name": MODEL_NAME,
+        "generation_config": generation_config,
+        "safety_settings": safety_settings,
+        "system_instruction": system_instruction,
+    }
+
+
+# Same name as in the other pipelines
+clean_response = clean_sql
+
+
+## Function To cache the final SQL of a standalone question
+def _finish(question, chat_history, final_query):
+    if not (is_follow_up(question) and chat_history):
+        sql_cache.put(DATASET_NAME, db_path, question, final_query)
+    return final_query
+
+
+def _tier_options(tier):
+    return {**model_options(), "model_name": router.model_name(tier)}
+
+
+## Function To check that SQL compiles, on the session's result tables when it is about them
+def _compile_error(sql, session_id=None):
+    if session_id is not None and references_workspace(sql):
+        return compile_error(db_path, sql, pool=session_results(session_id))
+    return compile_error(db_path, sql)
+
+
+## Function To turn the model's answer into SQL, repaired locally (schema names, stray prose) when it does not compile
+def _checked_sql(response_text, session_id=None):
+    sql = clean_sql(response_text)
+    if session_id is not None and references_workspace(sql):
+        return sql
+    error = compile_error(db_path, sql)
+    if error is None:
+        return sql
+    return repair_sql(db_path, sql, error) or sql
+
+
+def _with_feedback(prompt, feedback):
+    return prompt + feedback_prompt(*feedback) if feedback else prompt
+
+
+def _ask(question, chat_history, session_id=None):
+    prompt = build_prompt(question, chat_history, session_id=session_id)
+
+    # Streamed: stops at the end of the statement, or as soon as the answer is not a SELECT
+    def ask(tier, feedback=None):
+        return _checked_sql(generate_statement(
+            router.backend(tier), _with_feedback(prompt, feedback), question=question, dataset=DATASET_NAME,
+            **_tier_options(tier)
+        ), session_id)
+    return ask
+
+
+def _ask_async(question, chat_history, prompt):
+    # Validation and repair prepare statements on the database, so they run on the executor too
+    async def ask(tier, feedback=None):
+        response_text = await generate_statement_async(
+            router.backend(tier), _with_feedback(prompt, feedback), question=question, dataset=DATASET_NAME,
+            **_tier_options(tier)
+        )
+        return await _in_executor(_checked_sql, response_text)
+    return ask
+
+
+## Function To Load Google Gemini Model and provide queries as response
+def generate_sql(question, chat_history=None, session_id=None):
+    sql = cached_sql(question, chat_history)
+    if sql:
+        return sql
+    try:
+        # The fast tier answers simple questions; answers that do not compile even after
+        # a local repair are asked once more on pro, with the error
+        response_text = router.generate(
+            question, chat_history, _ask(question, chat_history, session_id),
+            validate=lambda sql: _compile_error(sql, session_id),
+        )
+        return _finish(question, chat_history, response_text)
+    except ValueError:
+        # Still no usable SQL after the retry: report it instead of answering a different question
+        raise
+    except Exception as e:
+        print(f"Error in generate_sql: {str(e)}")
+        # Fallback to basic query if the model cannot be reached
+        return FALLBACK_SQL
+
+
+## Function To generate SQL without blocking the event loop (errors are raised to the caller)
+# The cache lookups (templates, embeddings) and prompt building read the database, so they run on the executor
+async def request_sql_async(question, chat_history=None):
+    sql = await _in_executor(cached_sql, question, chat_history)
+    if sql:
+        return sql
+    return await ask_model_async(question, chat_history)
+
+
+## Function To ask the model directly, skipping the caches
+async def ask_model_async(question, chat_history=None):
+    prompt = await _in_executor(build_prompt, question, chat_history)
+    response_text = await router.generate_async(
+        question, chat_history, _ask_async(question, chat_history, prompt),
+        validate=lambda sql: _in_executor(_compile_error, sql),
+    )
+    return await _in_executor(_finish, question, chat_history, response_text)
+
+
+async def generate_sql_async(question, chat_history=None):
+    try:
+        return await request_sql_async(question, chat_history)
+    except Exception as e:
+        print(f"Error in generate_sql_async: {str(e)}")
+        return FALLBACK_SQL
+
+
+## Function To retrieve query from the database
+# SQL about the session's previous results runs on its materialized tables instead
+def run_query(sql, session_id=None):
+    if session_id is not None and references_workspace(sql):
+        error = _compile_error(sql, session_id)
+        if error is not None:
+            raise sqlite3.OperationalError(error)
+        return session_results(session_id).run(sql, budget=budget_for(DATASET_NAME))
+    # Sample queries run once in the background after startup; their rows are ready
+    result = warm_result(DATASET_NAME, db_path, sql)
+    if result is not None:
+        return result
+    # Nothing runs before it compiles as a read-only statement (verdicts are cached)
+    error = compile_error(db_path, sql)
+    if error is not None:
+        raise sqlite3.OperationalError(error)
+    try:
+        # Runs on a pooled connection and keeps only a bounded prefix of the rows;
+        # further pages are fetched on demand when the results table asks for them.
+        # The dataset's time/step budget stops runaway queries (busy_timeout only covers lock waits)
+        started = time.perf_counter()
+        result = run_paged_query(db_path, sql, budget=budget_for(DATASET_NAME))
+        # Executed SQL and its timing feed the index advisor
+        record_query(DATASET_NAME, db_path, sql, time.perf_counter() - started)
+        return result
+        
+    except sqlite3.Error as e:
+        print(f"Database error: {str(e)}")
+        raise e
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        raise e
+
+
+## Function To warm up the sample queries in the background (once per database version)
+def warm_up():
+    return start_warm_up(DATASET_NAME, db_path, budget_for(DATASET_NAME))
+
+
+## Function To run generated SQL; when it fails it is repaired locally first, then asked once more on pro
+def run_with_escalation(question, sql, chat_history=None, session_id=None):
+    workspace = session_id is not None and references_workspace(sql)
+    try:
+        result = run_query(sql, session_id)
+    except QueryBudgetExceeded:
+        # Too slow is not a wrong answer
+        raise
+    except sqlite3.Error as e:
+        error = str(e)
+        source = router.source_of(sql)
+        repaired = None if workspace else repair_sql(db_path, sql, error)
+        if repaired and repaired != sql:
+            try:
+                return _finish(question, chat_history, repaired), run_query(repaired, session_id)
+            except QueryBudgetExceeded:
+                raise
+            except sqlite3.Error as repaired_error:
+                sql, error = repaired, str(repaired_error)
+        if source == RETRY:
+            # The model already had its one retry for this question
+            raise
+        print(f"SQL failed to run, asking {router.model_name(PRO)} again: {error}")
+        router.record_retry(FAST if source == FAST else PRO, "execution")
+        sql_cache.discard(DATASET_NAME, db_path, question)
+        sql = _finish(question, chat_history, router.ask_tier(PRO, _ask(question, chat_history, session_id), (sql, error)))
+        return sql, run_query(sql, session_id)
+
+    # A literal that is not a value of its column ("it" for "IT") matches nothing
+    if not result.rows and not workspace:
+        fixed = repair_values(db_path, sql)
+        if fixed:
+            fixed_result = run_query(fixed, session_id)
+            if fixed_result.rows:
+                return _finish(question, chat_history, fixed), fixed_result
+    return sql, result
+
+
+async def run_query_async(sql):
+    return await _in_executor(run_query, sql)
+
+
+async def fetch_page_async(result, number, page_size=None):
+    return await _in_executor(result.page, number, page_size)
+
+
+## Function To pick display formats for money and percent columns; the values themselves stay numeric
+def display_formats(df):
+    # Only called with results at hand, so pandas is loaded by then (it is not imported at startup)
+    import pandas as pd
+
+    formats = {}
+    for col, dtype in df.dtypes.items():
+        name = col.lower()
+        if name in ['orderid'] or pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+            continue
+        money = "₹%,d" if pd.api.types.is_integer_dtype(dtype) else "₹%,.2f"
+        if 'price' in name or 'target' in name or 'stoploss' in name:
+            formats[col] = money
+        elif 'percent' in name or 'rate' in name:
+            formats[col] = "%.2f%%"
+        elif 'profit' in name or 'return' in name or 'pnl' in name:
+            formats[col] = money
+    return formats
+
+
+# Sidebar stats of the latest database version, shared by every session
+_portfolio_stats = {}
+_portfolio_stats_lock = threading.Lock()
+
+
+## Function To compute all sidebar stats in a single pass over Recommendations, once per database version
+def portfolio_stats():
+    version = db_version(db_path)
+    with _portfolio_stats_lock:
+        if version in _portfolio_stats:
+            return _portfolio_stats[version]
+        with get_pool(db_path).connection() as conn:
+            rows = conn.execute("""
+                SELECT Category,
+                       COUNT(*) as count,
+                       SUM(CASE WHEN SellPrice > BuyPrice THEN 1 ELSE 0 END) as profitable,
+                       SUM(SellPrice - BuyPrice) as pnl
+                FROM Recommendations
+                GROUP BY Category
+            """).fetchall()
+
+        total_trades = sum(row[1] for row in rows)
+        profitable_trades = sum(row[2] or 0 for row in rows)
+        stats = {
+            'total_trades': total_trades,
+            'profitable_trades': profitable_trades,
+            'total_pnl': sum(row[3] or 0 for row in rows),
+            'win_rate': (profitable_trades / total_trades) * 100 if total_trades > 0 else 0,
+            # Same order as ORDER BY Category (NULL first)
+            'categories': sorted((row[0] for row in rows), key=lambda c: (c is not None, c or "")),
+            'category_counts': sorted(((row[0], row[1]) for row in rows), key=lambda r: (-r[1], r[0] is not None, r[0] or "")),
+        }
+        # Older versions are never asked for again
+        _portfolio_stats.clear()
+        _portfolio_stats[version] = stats
+        return stats
+
+
+def similar_question_stats():
+    return semantic_index_stats(DATASET_NAME)
+
+
+## Function To remember SQL that ran successfully, so similar standalone questions can reuse it
+def remember_success(question, sql, chat_history=None):
+    if not (is_follow_up(question) and chat_history) and not references_workspace(sql):
+        get_semantic_index(DATASET_NAME).add(question, sql, db_path)
+
+
+## Function To keep an answer's rows for the session's next follow-ups
+def remember_result(session_id, question, result):
+    session_results(session_id).materialize(question, result)
+
+
+def forget_results(session_id):
+    release_session_results(DATASET_NAME, session_id)
+
+
+## Define Your Prompt
+prompt=[
+    """
+    You are an expert in converting English questions to SQL query using sqlite3!
+    The SQL database has the name badjate.db and has the following tables and columns:
+    {schema}
+
+    IMPORTANT TERMINOLOGY MAPPING:
+    - "profit/loss", "gain/loss", "returns", "performance" → calculate (SellPrice - BuyPrice)
+    - "profitable", "winners", "gainers" → WHERE SellPrice > BuyPrice
+    - "loss-making", "losers", "red" → WHERE SellPrice < BuyPrice
+    - "breakeven" → WHERE SellPrice = BuyPrice
+    - "held", "holding period", "duration" → calculate difference between BuyDate and SellDate
+    - "sector", "industry", "space" → Category column
+    - "IT stocks", "tech stocks", "technology" → WHERE Category = 'IT'
+    - "bank stocks", "financial", "BFSI" → WHERE Category = 'Banking'
+    - "oil stocks", "energy sector" → WHERE Category = 'Energy'
+    - "auto stocks", "automobile" → WHERE Category = 'Auto'
+    - "telecom stocks", "telco" → WHERE Category = 'Telecom'
+    - "FMCG stocks", "consumer goods" → WHERE Category = 'FMCG'
+    - "retail stocks" → WHERE Category = 'Retail'
+    - "entry price", "cost", "purchase price" → BuyPrice
+    - "exit price", "selling price" → SellPrice
+    - "upside", "target", "goal" → Target
+    - "downside protection", "stop", "risk limit" → StopLoss
+    - "recent", "latest", "new" → ORDER BY BuyDate DESC or SellDate DESC
+    - "old", "earlier", "past" → ORDER BY BuyDate ASC or SellDate ASC
+    - "high", "expensive", "top" → ORDER BY [relevant column] DESC
+    - "low", "cheap", "bottom" → ORDER BY [relevant column] ASC
+    - "best performing", "top gainers" → ORDER BY (SellPrice - BuyPrice) DESC
+    - "worst performing", "top losers" → ORDER BY (SellPrice - BuyPrice) ASC
+    - "percentage return", "ROI", "return %" → calculate ((SellPrice - BuyPrice) * 100.0 / BuyPrice)
+    - "risk-reward ratio" → calculate (Target - BuyPrice) / (BuyPrice - StopLoss)
+    - "average", "mean" → use AVG() function
+    - "total", "sum" → use SUM() function
+    - "count", "number of", "how many" → use COUNT() function
+    - "maximum", "highest", "peak" → use MAX() function
+    - "minimum", "lowest", "bottom" → use MIN() function
+
+    EXAMPLE QUERIES:
+    1. "Which stock has the highest target?" → SELECT StockName FROM Recommendations ORDER BY Target DESC LIMIT 1;
+    2. "Show all IT stocks" → SELECT * FROM Recommendations WHERE Category = 'IT';
+    3. "Which stocks made profit?" → SELECT StockName, (SellPrice - BuyPrice) as Profit FROM Recommendations WHERE SellPrice > BuyPrice;
+    4. "What's the average return in banking sector?" → SELECT AVG(SellPrice - BuyPrice) as AvgReturn FROM Recommendations WHERE Category = 'Banking';
+    5. "Show top 3 gainers" → SELECT StockName, (SellPrice - BuyPrice) as Profit FROM Recommendations ORDER BY (SellPrice - BuyPrice) DESC LIMIT 3;
+    6. "Which stocks hit their targets?" → SELECT StockName FROM Recommendations WHERE SellPrice >= Target;
+    7. "Show loss-making energy stocks" → SELECT * FROM Recommendations WHERE Category = 'Energy' AND SellPrice < BuyPrice;
+    8. "What's the percentage return of TCS?" → SELECT ((SellPrice - BuyPrice) * 100.0 / BuyPrice) as ReturnPercent FROM Recommendations WHERE StockName = 'TCS';
+    9. "Show recent purchases" → SELECT * FROM Recommendations ORDER BY BuyDate DESC LIMIT 5;
+    10. "Which stocks have high risk-reward ratio?" → SELECT StockName, ((Target - BuyPrice) * 1.0 / (BuyPrice - StopLoss)) as RiskReward FROM Recommendations ORDER BY RiskReward DESC;
+
+    COMPLEX EXAMPLE QUERIES:
+    11. "Show sector-wise average returns with stock count" → SELECT Category, AVG(SellPrice - BuyPrice) as AvgReturn, COUNT(*) as StockCount FROM Recommendations GROUP BY Category ORDER BY AvgReturn DESC;
+    12. "Which sector has the highest total profit?" → SELECT Category, SUM(SellPrice - BuyPrice) as TotalProfit FROM Recommendations GROUP BY Category ORDER BY TotalProfit DESC LIMIT 1;
+    13. "Show stocks with returns above sector average" → SELECT r1.StockName, r1.Category, (r1.SellPrice - r1.BuyPrice) as Return FROM Recommendations r1 WHERE (r1.SellPrice - r1.BuyPrice) > (SELECT AVG(r2.SellPrice - r2.BuyPrice) FROM Recommendations r2 WHERE r2.Category = r1.Category);
+    14. "Find stocks bought in July 2025 with profit above 100" → SELECT StockName, BuyDate, (SellPrice - BuyPrice) as Profit FROM Recommendations WHERE BuyDate LIKE '2025-07%' AND (SellPrice - BuyPrice) > 100;
+    15. "Show month-wise trading performance" → SELECT substr(BuyDate, 1, 7) as Month, COUNT(*) as Trades, AVG(SellPrice - BuyPrice) as AvgReturn, SUM(SellPrice - BuyPrice) as TotalReturn FROM Recommendations GROUP BY substr(BuyDate, 1, 7) ORDER BY Month;
+    16. "Which stocks exceeded their target by more than 5%?" → SELECT StockName, Target, SellPrice, ((SellPrice - Target) * 100.0 / Target) as ExcessPercent FROM Recommendations WHERE SellPrice > Target AND ((SellPrice - Target) * 100.0 / Target) > 5;
+    17. "Show stocks with holding period longer than 15 days" → SELECT StockName, BuyDate, SellDate, (julianday(SellDate) - julianday(BuyDate)) as HoldingDays FROM Recommendations WHERE (julianday(SellDate) - julianday(BuyDate)) > 15;
+    18. "Find underperforming stocks in each sector" → SELECT Category, StockName, (SellPrice - BuyPrice) as Return FROM Recommendations r1 WHERE (SellPrice - BuyPrice) = (SELECT MIN(r2.SellPrice - r2.BuyPrice) FROM Recommendations r2 WHERE r2.Category = r1.Category) ORDER BY Category;
+    19. "Show risk analysis: stocks that hit stop loss" → SELECT StockName, Category, BuyPrice, StopLoss, SellPrice, 'Hit Stop Loss' as Status FROM Recommendations WHERE SellPrice <= StopLoss;
+    20. "Calculate portfolio performance metrics" → SELECT COUNT(*) as TotalTrades, SUM(CASE WHEN SellPrice > BuyPrice THEN 1 ELSE 0 END) as WinningTrades, (SUM(CASE WHEN SellPrice > BuyPrice THEN 1 ELSE 0 END) * 100.0 / COUNT(*)) as WinRate, AVG(SellPrice - BuyPrice) as AvgReturn, SUM(SellPrice - BuyPrice) as TotalReturn FROM Recommendations;
+    21. "Show best and worst stock in each category" → SELECT Category, MAX(SellPrice - BuyPrice) as BestReturn, MIN(SellPrice - BuyPrice) as WorstReturn FROM Recommendations GROUP BY Category;
+    22. "Find stocks with target-to-buy ratio above 1.2" → SELECT StockName, BuyPrice, Target, (Target * 1.0 / BuyPrice) as TargetRatio FROM Recommendations WHERE (Target * 1.0 / BuyPrice) > 1.2 ORDER BY TargetRatio DESC;
+    23. "Show quarterly performance breakdown" → SELECT CASE WHEN substr(BuyDate, 6, 2) IN ('01','02','03') THEN 'Q1' WHEN substr(BuyDate, 6, 2) IN ('04','05','06') THEN 'Q2' WHEN substr(BuyDate, 6, 2) IN ('07','08','09') THEN 'Q3' ELSE 'Q4' END as Quarter, COUNT(*) as Trades, AVG(SellPrice - BuyPrice) as AvgReturn FROM Recommendations GROUP BY Quarter ORDER BY Quarter;
+    24. "Find stocks with maximum downside protection" → SELECT StockName, BuyPrice, StopLoss, ((BuyPrice - StopLoss) * 100.0 / BuyPrice) as DownsideProtection FROM Recommendations ORDER BY DownsideProtection DESC;
+    25. "Show correlation between buy price and returns" → SELECT CASE WHEN BuyPrice < 1000 THEN 'Low Price' WHEN BuyPrice BETWEEN 1000 AND 3000 THEN 'Mid Price' ELSE 'High Price' END as PriceRange, AVG(SellPrice - BuyPrice) as AvgReturn, COUNT(*) as Count FROM Recommendations GROUP BY PriceRange ORDER BY AvgReturn DESC;
+
+    INSTRUCTIONS:
+    - CRITICAL: Always return ONLY valid SQLite queries without any additional text, explanations, or formatting
+    - Use exact table and column names from the schema above, never invent columns
+    - Handle case-insensitive stock names using UPPER() or LOWER() functions
+    - For date comparisons, use string comparison (dates are in YYYY-MM-DD format)
+    - When calculating percentages, multiply by 100.0 to avoid integer division
+    - Use appropriate aggregate functions (SUM, AVG, COUNT, MAX, MIN) when needed
+    - Include ORDER BY and LIMIT when asking for "top", "best", "worst", etc.
+    - NEVER include ```, 'sql', or any markdown formatting in the output
+    - Handle variations in stock market terminology gracefully
+    - Return only the SQL statement, nothing else
+
+    ADVANCED INSTRUCTIONS FOR CONTEXTUAL UNDERSTANDING:
+
+    1. QUESTION INTERPRETATION RULES:
+    - If user asks about "performance" without specifying, calculate (SellPrice - BuyPrice)
+    - If user mentions "portfolio", aggregate data across all stocks
+    - When user says "my stocks" or "our recommendations", refer to all records in the table
+    - If user asks about "recent" without timeframe, use last 30 days or ORDER BY date DESC
+    - When user asks "which is better", provide comparative analysis with ORDER BY
+    - If user mentions percentages without context, assume they want percentage returns
+    - When user asks about "risk", consider StopLoss and calculate risk metrics
+    - If user mentions "growth" or "appreciation", focus on positive returns
+
+    2. CONTEXT-AWARE FOLLOW-UP HANDLING:
+    - "in this result", "from these", "in the above" → Filter by previous query results
+    - "these stocks", "those stocks" → Use StockName from previous results  
+    - "from this data", "in that result" → Apply new analysis to previous result set
+    - "show me more details" → Expand on previous query with additional columns
+    - "what about the others" → Show complement of previous results (opposite filter)
+    - "filter this by" → Add WHERE clause to previous query
+    - "sort this by" → Add ORDER BY to previous query
+    - "group this by" → Add GROUP BY to previous query
+    - "calculate average for these" → Apply AVG() to previous result set
+
+    3. IMPLICIT QUERY HANDLING:
+    - "How are we doing?" → Portfolio performance summary with win rate, total returns
+    - "Show me the winners" → Stocks with SellPrice > BuyPrice, ordered by profit
+    - "What about the losers?" → Stocks with SellPrice < BuyPrice, ordered by loss
+    - "Any good IT picks?" → IT category stocks with positive returns
+    - "How's the market treating us?" → Overall performance across all categories
+    - "Show me some numbers" → Key portfolio metrics and statistics
+    - "What's working?" → Top performing stocks/sectors
+    - "What's not working?" → Underperforming stocks/sectors
+    - "Give me insights" → Comprehensive analysis with multiple metrics
+
+    4. CONTEXT INFERENCE RULES:
+    - If previous context mentioned a sector, continue with that sector unless specified otherwise
+    - When user asks follow-up questions, maintain the scope of previous query
+    - If user asks about "them" or "these", refer to results from previous context
+    - When user says "compare", provide side-by-side analysis with relevant metrics
+    - If user mentions timeframes (month, quarter, year), filter accordingly
+    - When referencing "previous results", use subqueries or similar filters
+
+    4. SMART DEFAULTS:
+    - When user asks for "best" without metric, use profit/return as default
+    - If user asks for "analysis" without specifics, provide multi-dimensional view
+    - When user asks about "stocks" generally, show top performers unless context suggests otherwise
+    - If no limit specified for listing queries, default to TOP 10 or meaningful subset
+    - When user asks about trends, include time-based analysis
+
+    5. ERROR HANDLING & FALLBACKS:
+    - If stock name is misspelled, use LIKE operator with wildcards
+    - If user mentions non-existent categories, suggest closest match or show all categories
+    - When calculations might result in division by zero, add safety checks
+    - If date formats are unclear, assume standard YYYY-MM-DD format
+
+    6. RESPONSE OPTIMIZATION:
+    - For summary questions, use GROUP BY to provide categorical breakdowns
+    - For comparison questions, include multiple relevant columns
+    - For trend questions, include time-based ordering
+    - For performance questions, include both absolute and percentage metrics
+    - For risk questions, include both upside (Target) and downside (StopLoss) analysis
+
+    7. BUSINESS CONTEXT AWARENESS:
+    - "Diversification" queries → Show category-wise distribution
+    - "Risk management" queries → Focus on StopLoss and risk-reward ratios
+    - "Portfolio optimization" → Show best/worst performers across categories
+    - "Market timing" → Include date-based analysis
+    - "Sector rotation" → Compare performance across different categories
+    - "Value investing" → Focus on stocks with good risk-reward ratios
+    - "Growth investing" → Focus on stocks with high returns and targets
+
+    8. NATURAL LANGUAGE PROCESSING GUIDELINES:
+    - Extract intent from conversational language
+    - Recognize financial jargon and map to appropriate database fields
+    - Handle superlatives (best, worst, highest, lowest) with appropriate sorting
+    - Process temporal references (yesterday, last week, recent, old) into date filters
+    - Understand comparative language (better than, worse than, similar to)
+    - Recognize aggregation requests (total, average, summary, overview)
+
+    9. QUERY COMPLEXITY ADAPTATION:
+    - For simple questions, provide straightforward SELECT statements
+    - For analytical questions, use subqueries and complex calculations
+    - For comparative questions, use JOINs or correlated subqueries
+    - For trend questions, incorporate date functions and time-based grouping
+    - For statistical questions, use appropriate aggregate functions
+
+    10. OUTPUT FORMATTING GUIDELINES:
+    - Include descriptive column aliases for calculated fields
+    - Order results logically (best to worst, recent to old, etc.)
+    - Limit results appropriately to avoid overwhelming output
+    - Include relevant context columns for better interpretation
+    - Use appropriate data types in calculations (use 1.0 for float division)
+    """
+]
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import re
+import textwrap
+import threading
+
+from query_cache import normalize_question
+from semantic_cache import embed_question
+
+# --- Configuration ---
+# PROMPT_MODE=full sends the whole static prompt, as before
+PROMPT_MODE = os.getenv("PROMPT_MODE", "dynamic")
+PROMPT_EXAMPLES = int(os.getenv("PROMPT_EXAMPLES", "4"))
+PROMPT_RULES = int(os.getenv("PROMPT_RULES", "10"))
+# Rules scoring below this are left out even when fewer than PROMPT_RULES match
+MIN_RULE_SCORE = float(os.getenv("PROMPT_MIN_RULE_SCORE", "0.2"))
+
+# Sections sent with every question, whatever it asks
+ALWAYS_KEEP_SECTIONS = {"INSTRUCTIONS"}
+# Sections sent in full when the question is a follow-up on previous results
+FOLLOW_UP_SECTIONS = {"CONTEXT-AWARE FOLLOW-UP HANDLING", "CONTEXT INFERENCE RULES"}
+
+_HEADER_RE = re.compile(r"^(?:\d+\.\s*)?([A-Z][A-Z0-9 &/\-]+):$")
+_EXAMPLE_RE = re.compile(r'^\d+\.\s*"(.+?)"\s*→\s*(.+)$')
+
+
+class PromptSection:
+    def __init__(self, header):
+        self.header = header
+        self.title = _HEADER_RE.match(header).group(1).strip() if header else ""
+        self.lines = []
+
+
+## Function To split a static prompt into its preamble and titled sections
+def split_sections(prompt_text):
+    preamble = PromptSection(None)
+    sections = []
+    current = preamble
+    for line in textwrap.dedent(prompt_text).strip().splitlines():
+        line = line.rstrip()
+        if _HEADER_RE.match(line.strip()):
+            current = PromptSection(line.strip())
+            sections.append(current)
+        elif line.strip():
+            current.lines.append(line.strip())
+    return preamble, sections
+
+
+## Function To get the words a rule is triggered by ("tech stocks" → ... is triggered by the left side)
+def _trigger_text(rule):
+    return rule.lstrip("- ").split("→")[0]
+
+
+def _quoted_phrases(text):
+    return [normalize_question(phrase) for phrase in re.findall(r'"([^"]+)"', text)]
+
+
+# --- Selects the examples and rules relevant to one question ---
+class PromptAssembler:
+    def __init__(self, prompt_text, examples=PROMPT_EXAMPLES, rules=PROMPT_RULES, min_rule_score=MIN_RULE_SCORE):
+        self.example_count = examples
+        self.rule_count = rules
+        self.min_rule_score = min_rule_score
+        self.full_text = prompt_text
+        self.preamble, self.sections = split_sections(prompt_text)
+
+        # (section index, question, sql) and (section index, line) in prompt order
+        self.examples = []
+        self.rules = []
+        for position, section in enumerate(self.sections):
+            if section.title in ALWAYS_KEEP_SECTIONS:
+                continue
+            for line in section.lines:
+                example = _EXAMPLE_RE.match(line)
+                if "EXAMPLE" in section.title and example:
+                    self.examples.append((position, example.group(1), example.group(2)))
+                elif line.startswith("-"):
+                    self.rules.append((position, line))
+
+        # The banks are a few dozen entries, so a dense matrix product beats building an ANN index
+        self._example_vectors = self._embed([question for _, question, _ in self.examples])
+        self._rule_vectors = self._embed([_trigger_text(rule) for _, rule in self.rules])
+        self._rule_phrases = [_quoted_phrases(_trigger_text(rule)) for _, rule in self.rules]
+
+    @staticmethod
+    def _embed(texts):
+        import numpy as np
+
+        if not texts:
+            return np.zeros((0, 1), dtype="float32")
+        return np.vstack([embed_question(text) for text in texts])
+
+    def _rule_scores(self, question):
+        import numpy as np
+
+        scores = self._rule_vectors @ embed_question(question) if self.rules else np.zeros(0)
+        # A rule whose quoted phrase appears verbatim in the question always qualifies
+        normalized = f" {normalize_question(question)} "
+        for i, phrases in enumerate(self._rule_phrases):
+            if any(phrase and f" {phrase} " in normalized for phrase in phrases):
+                scores[i] += 1.0
+        return scores
+
+    ## Function To pick the top-k examples and rules for a question (indexes into the banks)
+    def select(self, question, follow_up=False):
+        import numpy as np
+
+        example_ids = []
+        if self.examples:
+            scores = self._example_vectors @ embed_question(question)
+            example_ids = sorted(np.argsort(-scores, kind="stable")[:self.example_count].tolist())
+
+        # Follow-up rules only make sense (and are all sent) when there are previous results
+        follow_up_ids = {
+            i for i, (position, _) in enumerate(self.rules)
+            if self.sections[position].title in FOLLOW_UP_SECTIONS
+        }
+        scores = self._rule_scores(question)
+        ranked = [
+            i for i in np.argsort(-scores, kind="stable")
+            if scores[i] >= self.min_rule_score and i not in follow_up_ids
+        ]
+        rule_ids = set(ranked[:self.rule_count])
+        if follow_up:
+            rule_ids.update(follow_up_ids)
+        return example_ids, sorted(rule_ids)
+
+    ## Function To build the prompt for one question, keeping the original section order
+    def assemble(self, question, follow_up=False):
+        example_ids, rule_ids = self.select(question, follow_up)
+        chosen = {}
+        for number, i in enumerate(example_ids, start=1):
+            position, example_question, sql = self.examples[i]
+            chosen.setdefault(position, []).append(f'{number}. "{example_question}" → {sql}')
+        for i in rule_ids:
+            position, rule = self.rules[i]
+            chosen.setdefault(position, []).append(rule)
+
+        parts = ["\n".join(self.preamble.lines)]
+        for position, section in enumerate(self.sections):
+            lines = section.lines if section.title in ALWAYS_KEEP_SECTIONS else chosen.get(position)
+            if lines:
+                parts.append("\n".join([section.header] + lines))
+        return "\n\n".join(parts)
+
+    def build(self, question, follow_up=False, mode=None):
+        if (mode or PROMPT_MODE) == "full":
+            return self.full_text
+        return self.assemble(question, follow_up)
+
+
+# Built once per prompt text (embedding the banks takes a few milliseconds) and shared by every session
+_assemblers = {}
+_assemblers_lock = threading.Lock()
+
+
+def get_prompt_assembler(prompt_text):
+    with _assemblers_lock:
+        if prompt_text not in _assemblers:
+            _assemblers[prompt_text] = PromptAssembler(prompt_text)
+        return _assemblers[prompt_text]
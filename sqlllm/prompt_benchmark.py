@@ -0,0 +1,91 @@
+import argparse
+import json
+import statistics
+import time
+
+from dotenv import load_dotenv
+load_dotenv()  ## the pipeline reads its settings from the environment when imported
+
+import pipeline
+from llm_backend import create_backend
+
+# A fixed mix of simple, analytical and conversational questions, so runs are comparable
+QUESTIONS = [
+    "Show me top 5 gainers",
+    "Which stocks made a loss?",
+    "Show all IT stocks",
+    "What's the average return in banking sector?",
+    "How many tech stocks are there?",
+    "Which sector has the highest total profit?",
+    "Show month-wise trading performance",
+    "What's the average holding period by sector?",
+    "Which stocks hit their stop loss?",
+    "What's the percentage return of TCS?",
+    "Show stocks with the best risk-reward ratio",
+    "How are we doing?",
+]
+
+
+def run_benchmark(backend, questions=QUESTIONS, runs=3):
+    results = {"full": [], "dynamic": []}
+    for question in questions:
+        answers = {}
+        for mode in results:
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                full_prompt = pipeline.build_prompt(question, mode=mode)
+                sql = backend.generate(full_prompt, model_name=pipeline.MODEL_NAME, question=question, dataset=pipeline.DATASET_NAME)
+                timings.append(time.perf_counter() - started)
+            answers[mode] = sql.strip()
+            results[mode].append({
+                "question": question,
+                "input_tokens": backend.count_tokens(full_prompt, model_name=pipeline.MODEL_NAME),
+                "latency_ms": 1000 * statistics.median(timings),
+                "sql": answers[mode],
+            })
+        results["dynamic"][-1]["same_sql_as_full"] = answers["dynamic"] == answers["full"]
+    return results
+
+
+def summarize(results):
+    summary = {}
+    for mode, rows in results.items():
+        summary[mode] = {
+            "total_input_tokens": sum(row["input_tokens"] for row in rows),
+            "mean_input_tokens": statistics.mean(row["input_tokens"] for row in rows),
+            "median_latency_ms": statistics.median(row["latency_ms"] for row in rows),
+            "total_latency_ms": sum(row["latency_ms"] for row in rows),
+        }
+    summary["dynamic"]["same_sql_as_full"] = sum(row["same_sql_as_full"] for row in results["dynamic"])
+    summary["token_reduction"] = 1 - summary["dynamic"]["total_input_tokens"] / summary["full"]["total_input_tokens"]
+    return summary
+
+
+def print_report(results, summary):
+    print(f"{'Question':<48} {'full tok':>9} {'dyn tok':>8} {'full ms':>9} {'dyn ms':>8}  same SQL")
+    for full, dynamic in zip(results["full"], results["dynamic"]):
+        print(
+            f"{full['question'][:48]:<48} {full['input_tokens']:>9} {dynamic['input_tokens']:>8} "
+            f"{full['latency_ms']:>9.1f} {dynamic['latency_ms']:>8.1f}  {'yes' if dynamic['same_sql_as_full'] else 'NO'}"
+        )
+    full, dynamic = summary["full"], summary["dynamic"]
+    print()
+    print(f"Input tokens: {full['total_input_tokens']} → {dynamic['total_input_tokens']} ({summary['token_reduction']:.0%} fewer)")
+    print(f"Median latency: {full['median_latency_ms']:.1f} ms → {dynamic['median_latency_ms']:.1f} ms")
+    print(f"Same SQL as the full prompt: {dynamic['same_sql_as_full']}/{len(results['dynamic'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the full static prompt with the dynamically assembled one")
+    parser.add_argument("--backend", help="LLM backend to measure (default: LLM_BACKEND)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per question and mode; the median is reported")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(create_backend(args.backend), runs=args.runs)
+    summary = summarize(results)
+    print_report(results, summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Configuration ---
+DEFAULT_MAX_SECONDS = float(os.getenv("QUERY_MAX_SECONDS", "5"))
+DEFAULT_MAX_STEPS = int(os.getenv("QUERY_MAX_STEPS", "100000000"))
+# The progress handler runs every PROGRESS_INTERVAL virtual machine instructions
+PROGRESS_INTERVAL = 10000
+
+# Per-dataset defaults; anything not listed uses DEFAULT_MAX_SECONDS / DEFAULT_MAX_STEPS
+DATASET_BUDGETS = {
+    "badjate": {"max_seconds": 8.0, "max_steps": 200000000},
+}
+
+
+class QueryBudgetExceeded(sqlite3.OperationalError):
+    pass
+
+
+class QueryBudget:
+    def __init__(self, dataset=None, max_seconds=DEFAULT_MAX_SECONDS, max_steps=DEFAULT_MAX_STEPS):
+        self.dataset = dataset
+        self.max_seconds = max_seconds
+        self.max_steps = max_steps
+
+
+def budget_for(dataset):
+    return QueryBudget(dataset, **DATASET_BUDGETS.get(dataset, {}))
+
+
+# --- Counters of aborted queries, shared by every session in the process ---
+_aborted = {}
+_aborted_lock = threading.Lock()
+
+
+def _record_abort(budget, reason):
+    with _aborted_lock:
+        key = (budget.dataset or "default", reason)
+        _aborted[key] = _aborted.get(key, 0) + 1
+
+
+def aborted_query_counts(dataset=None):
+    with _aborted_lock:
+        counts = {"time": 0, "steps": 0}
+        for (name, reason), count in _aborted.items():
+            if dataset is None or name == dataset:
+                counts[reason] += count
+        return counts
+
+
+## Function To run a block of work on a connection under a wall-clock and VM-step budget
+# busy_timeout only bounds lock waits; this stops runaway cross joins and correlated subqueries.
+# A non-zero return from the progress handler interrupts the running statement.
+@contextmanager
+def enforce_budget(conn, budget=None):
+    budget = budget or QueryBudget()
+    deadline = time.monotonic() + budget.max_seconds
+    state = {"steps": 0, "reason": None}
+
+    def check_budget():
+        state["steps"] += PROGRESS_INTERVAL
+        if state["steps"] > budget.max_steps:
+            state["reason"] = "steps"
+            return 1
+        if time.monotonic() > deadline:
+            state["reason"] = "time"
+            return 1
+        return 0
+
+    conn.set_progress_handler(check_budget, PROGRESS_INTERVAL)
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if state["reason"] is None:
+            raise
+        _record_abort(budget, state["reason"])
+        if state["reason"] == "time":
+            limit = f"ran longer than {budget.max_seconds:g}s"
+        else:
+            limit = f"used more than {budget.max_steps:,} steps"
+        raise QueryBudgetExceeded(
+            f"Query exceeded budget: it {limit} and was stopped. Try a narrower question or add filters."
+        ) from e
+    finally:
+        conn.set_progress_handler(None, PROGRESS_INTERVAL)
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- Configuration ---
+CACHE_MAX_ENTRIES = int(os.getenv("SQL_CACHE_MAX_ENTRIES", "512"))
+CACHE_TTL_SECONDS = float(os.getenv("SQL_CACHE_TTL_SECONDS", "3600"))
+
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+    "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13",
+    "fourteen": "14", "fifteen": "15", "sixteen": "16", "seventeen": "17",
+    "eighteen": "18", "nineteen": "19", "twenty": "20", "thirty": "30",
+    "forty": "40", "fifty": "50", "hundred": "100", "dozen": "12",
+}
+
+
+## Function To normalize a question so that trivial variations share one cache key
+def normalize_question(question):
+    text = question.lower().replace("’", "'").replace("'", "")
+    # Keep comparison operators, percent signs and decimal points, drop other punctuation
+    text = re.sub(r"[^\w\s<>=%.]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    words = [NUMBER_WORDS.get(word, word) for word in text.split()]
+    return " ".join(words)
+
+
+# --- Database version tracking ---
+# PRAGMA data_version only changes for commits made by *other* connections,
+# so every database gets one long-lived watcher connection that never writes.
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def _open_watcher(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    return {"conn": conn, "inode": os.stat(db_path).st_ino, "lock": threading.Lock()}
+
+
+## Function To get a token that changes whenever the schema or the data of a database changes
+def db_version(db_path):
+    db_path = os.path.abspath(db_path)
+    inode = os.stat(db_path).st_ino
+    with _watchers_lock:
+        watcher = _watchers.get(db_path)
+        # The file was replaced (e.g. a seed script recreated it), start watching the new one
+        if watcher is None or watcher["inode"] != inode:
+            if watcher is not None:
+                watcher["conn"].close()
+            watcher = _watchers[db_path] = _open_watcher(db_path)
+    with watcher["lock"]:
+        schema_version = watcher["conn"].execute("PRAGMA schema_version").fetchone()[0]
+        data_version = watcher["conn"].execute("PRAGMA data_version").fetchone()[0]
+    return (inode, schema_version, data_version)
+
+
+## Function To hash the tables and views of a database (recomputed only when schema_version changes)
+# Indexes are left out: adding one does not change which SQL is valid. Only the latest hash is kept,
+# on the database's watcher, so old schema versions do not pile up
+def schema_hash(db_path, version=None):
+    db_path = os.path.abspath(db_path)
+    version = version or db_version(db_path)
+    with _watchers_lock:
+        watcher = _watchers[db_path]
+    with watcher["lock"]:
+        cached = watcher.get("schema")
+        if cached is None or cached[0] != version[:2]:
+            rows = watcher["conn"].execute(
+                "SELECT type, name, sql FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY type, name"
+            ).fetchall()
+            cached = watcher["schema"] = (version[:2], hashlib.sha1(repr(rows).encode("utf-8")).hexdigest()[:16])
+        return cached[1]
+
+
+# --- Question → SQL cache ---
+class QueryCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, dataset, db_path, question):
+        try:
+            version = db_version(db_path)
+        except (OSError, sqlite3.Error):
+            # Without a readable database there is nothing to key on, so the cache is bypassed
+            return None
+        # Any committed change to the database drops everything cached for that dataset
+        if self._versions.get(dataset) != version:
+            for key in [key for key in self._entries if key[0] == dataset]:
+                del self._entries[key]
+            self._versions[dataset] = version
+        return (dataset, schema_hash(db_path, version), normalize_question(question))
+
+    def get(self, dataset, db_path, question):
+        with self._lock:
+            key = self._key(dataset, db_path, question)
+            entry = self._entries.get(key) if key else None
+            if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, dataset, db_path, question, sql):
+        with self._lock:
+            key = self._key(dataset, db_path, question)
+            if key is None:
+                return
+            self._entries[key] = (sql, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, dataset, db_path, question):
+        with self._lock:
+            self._entries.pop(self._key(dataset, db_path, question), None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Imported modules survive Streamlit reruns, so this cache is shared by every session in the process
+_query_cache = QueryCache()
+
+
+def get_query_cache():
+    return _query_cache
@@ -0,0 +1,263 @@
+from dotenv import load_dotenv
+load_dotenv()  ## the pipeline reads its settings from the environment when imported
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+import pipeline
+from db_pool import PoolExhausted
+from llm_backend import is_rate_limit_error
+from query_budget import QueryBudgetExceeded
+
+# HTTP/JSON front end for the badjate pipeline, served from one asyncio process.
+# A request waits on the model without holding a thread, and SQL runs on the pooled executor.
+#
+#   python query_service.py --port 8765
+#   curl -s localhost:8765/query -d '{"question": "Show me top 5 gainers"}'
+
+# --- Configuration ---
+SERVICE_HOST = os.getenv("QUERY_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("QUERY_SERVICE_PORT", "8765"))
+# Questions answered at the same time; the rest wait their turn
+MAX_CONCURRENT_REQUESTS = int(os.getenv("QUERY_SERVICE_MAX_CONCURRENCY", "32"))
+# Beyond this many waiting or running questions, new ones are turned away with 503
+MAX_PENDING_REQUESTS = int(os.getenv("QUERY_SERVICE_MAX_PENDING", "256"))
+MAX_BODY_BYTES = 64 * 1024
+KEEP_ALIVE_SECONDS = 30
+DEFAULT_PAGE_SIZE = 100
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    # BLOB columns are sent as hex
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+## Function To turn chat history sent as JSON into the entries the pipeline's follow-up prompt reads
+def _history_entries(history):
+    if history is None:
+        return []
+    if not isinstance(history, list):
+        raise RequestError(400, "chat_history must be a list")
+    # Imported on first use, so a service that only sees standalone questions does not load pandas
+    import pandas as pd
+
+    entries = []
+    for item in history:
+        if not isinstance(item, dict) or not isinstance(item.get("question"), str):
+            raise RequestError(400, "each chat_history item needs a question")
+        columns = item.get("columns") or []
+        entries.append({
+            "question": item["question"],
+            "sql": item.get("sql", ""),
+            "success": bool(item.get("success", bool(columns))),
+            "data": pd.DataFrame(item.get("rows") or [], columns=columns or None),
+        })
+    return entries
+
+
+# --- The service: bounded concurrency over the async pipeline ---
+class QueryService:
+    def __init__(self, max_concurrency=MAX_CONCURRENT_REQUESTS, max_pending=MAX_PENDING_REQUESTS):
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.pending = 0
+        self.served = 0
+        self.rejected = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    ## Function To answer one question: SQL from the caches or the model, then one page of rows
+    async def answer(self, payload):
+        question = payload.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise RequestError(400, "question is required")
+        history = _history_entries(payload.get("chat_history"))
+        page = payload.get("page", 1)
+        page_size = payload.get("page_size", DEFAULT_PAGE_SIZE)
+        if not isinstance(page, int) or page < 1 or not isinstance(page_size, int) or not 1 <= page_size <= 1000:
+            raise RequestError(400, "page must be >= 1 and page_size between 1 and 1000")
+
+        started = time.perf_counter()
+        try:
+            sql = await pipeline.request_sql_async(question, history)
+        except ValueError as e:
+            # The model answered, but not with a usable SELECT even after the retry
+            raise RequestError(422, f"Could not turn the question into SQL: {str(e)}")
+        except Exception as e:
+            # The model could not be reached or is rate limited: the client should retry, not act on other SQL
+            print(f"Error generating SQL: {str(e)}")
+            reason = "rate limited" if is_rate_limit_error(e) else "unavailable"
+            raise RequestError(503, f"The model is {reason}, retry shortly")
+        generated = time.perf_counter()
+        try:
+            result = await pipeline.run_query_async(sql)
+        except QueryBudgetExceeded as e:
+            raise RequestError(422, str(e))
+        except PoolExhausted as e:
+            # Every connection is busy: the SQL is fine, the client should retry
+            raise RequestError(503, str(e))
+        except sqlite3.Error as e:
+            pipeline.sql_cache.discard(pipeline.DATASET_NAME, pipeline.db_path, question)
+            raise RequestError(422, f"Database error: {str(e)}")
+        # The result may be shared (a warmed-up answer), so the page size is passed, never set on it
+        if page * page_size <= len(result.rows) or not result.truncated:
+            rows = result.page(page, page_size)
+        else:
+            # Pages past the rows already read come from the database, off the event loop
+            rows = await pipeline.fetch_page_async(result, page, page_size)
+        executed = time.perf_counter()
+        await asyncio.to_thread(pipeline.remember_success, question, sql, history)
+
+        return {
+            "question": question,
+            "sql": sql,
+            "columns": result.columns,
+            "rows": rows,
+            "page": page,
+            "page_size": page_size,
+            "truncated": result.truncated,
+            "timings_ms": {
+                "generate": round(1000 * (generated - started), 2),
+                "execute": round(1000 * (executed - generated), 2),
+                "total": round(1000 * (executed - started), 2),
+            },
+        }
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "served": self.served,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "avg_ms": round(1000 * self.seconds / self.served, 2) if self.served else 0.0,
+            "exact_cache": pipeline.sql_cache.stats(),
+            "similar_questions": pipeline.similar_question_stats(),
+        }
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, self.stats()
+        if path != "/query":
+            raise RequestError(404, f"No route for {path}")
+        if method != "POST":
+            raise RequestError(405, "Use POST /query")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError(400, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "Body must be a JSON object")
+
+        # Shed load early instead of letting the queue (and every client's latency) grow without bound
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise RequestError(503, "Too many questions in flight, retry shortly")
+        self.pending += 1
+        try:
+            async with self._slots:
+                started = time.perf_counter()
+                answer = await self.answer(payload)
+                self.served += 1
+                self.seconds += time.perf_counter() - started
+                return 200, answer
+        finally:
+            self.pending -= 1
+
+    ## Function To serve one HTTP/1.1 connection, answering requests until the client closes it
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_SECONDS)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                length = headers.get("content-length", "0")
+                length = int(length) if length.isdigit() else -1
+                if length < 0:
+                    status, response = 400, {"error": "Invalid Content-Length"}
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, response = 413, {"error": "Request body is too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, response = await self.route(method.upper(), target.split("?", 1)[0], body)
+                    except RequestError as e:
+                        status, response = e.status, {"error": str(e)}
+                    except Exception as e:
+                        print(f"Error answering request: {str(e)}")
+                        self.failed += 1
+                        status, response = 500, {"error": "Internal error"}
+
+                payload = json.dumps(response, default=_json_default).encode("utf-8")
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(payload)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                        + ("Retry-After: 1\r\n" if status == 503 else "")
+                        + "\r\n"
+                    ).encode("latin-1")
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=SERVICE_HOST, port=SERVICE_PORT, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    service = QueryService(max_concurrency)
+    server = await asyncio.start_server(service.handle_connection, host, port, backlog=1024)
+    print(f"Query service for {pipeline.DATASET_NAME} listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the text-to-SQL pipeline over HTTP/JSON")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_REQUESTS)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.concurrency))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,245 @@
+import os
+import re
+import sqlite3
+import threading
+
+from db_pool import get_pool
+from query_cache import db_version, normalize_question
+from semantic_cache import NEGATIONS, embed_question, question_terms
+
+# Known intents (the sidebar's sample queries and their category variants) mapped to SQL
+# with slots, so those questions are answered without a model call. A question matches a
+# template when its wording, with the slot values taken out, embeds close enough to one of
+# the template's phrasings.
+
+# --- Configuration ---
+TEMPLATE_MATCH_THRESHOLD = float(os.getenv("TEMPLATE_MATCH_THRESHOLD", "0.9"))
+
+
+class QueryTemplate:
+    def __init__(self, name, phrasings, sql, defaults=None):
+        self.name = name
+        # "{category}" and "{n}" in a phrasing are filled from the question
+        self.phrasings = phrasings
+        self.sql = sql
+        self.defaults = defaults or {}
+
+    def slots(self):
+        return set(re.findall(r"{(\w+)}", self.sql))
+
+    ## Function To fill the slots; text values are quoted, numbers must be whole and positive
+    def render(self, values):
+        filled = {}
+        for slot in self.slots():
+            value = values.get(slot, self.defaults.get(slot))
+            if value is None:
+                return None
+            if isinstance(value, int):
+                if value < 1:
+                    return None
+                filled[slot] = str(value)
+            else:
+                filled[slot] = "'" + str(value).replace("'", "''") + "'"
+        return self.sql.format(**filled)
+
+
+# --- badjate ---
+_PROFIT = "(SellPrice - BuyPrice)"
+BADJATE_TEMPLATES = [
+    QueryTemplate(
+        "top_gainers",
+        ["Show me top {n} gainers", "top {n} profitable stocks", "best {n} performing stocks"],
+        f"SELECT StockName, BuyPrice, SellPrice, {_PROFIT} AS Profit FROM Recommendations ORDER BY Profit DESC LIMIT {{n}}",
+        {"n": 5},
+    ),
+    QueryTemplate(
+        "top_losers",
+        ["Show me top {n} losers", "worst {n} performing stocks"],
+        f"SELECT StockName, BuyPrice, SellPrice, {_PROFIT} AS Profit FROM Recommendations ORDER BY Profit ASC LIMIT {{n}}",
+        {"n": 5},
+    ),
+    QueryTemplate(
+        "portfolio_performance",
+        ["What's our portfolio performance?", "How is the portfolio performing?", "overall portfolio performance"],
+        "SELECT COUNT(*) AS TotalTrades, "
+        "SUM(CASE WHEN SellPrice > BuyPrice THEN 1 ELSE 0 END) AS ProfitableTrades, "
+        f"SUM({_PROFIT}) AS TotalProfit, ROUND(AVG({_PROFIT}), 2) AS AverageProfit, "
+        "ROUND(100.0 * SUM(CASE WHEN SellPrice > BuyPrice THEN 1 ELSE 0 END) / COUNT(*), 2) AS WinRatePercent "
+        "FROM Recommendations",
+    ),
+    QueryTemplate(
+        "sector_returns",
+        ["Show sector-wise returns", "returns by sector", "sector wise profit"],
+        f"SELECT Category, COUNT(*) AS Trades, SUM({_PROFIT}) AS TotalProfit, ROUND(AVG({_PROFIT}), 2) AS AverageProfit "
+        "FROM Recommendations GROUP BY Category ORDER BY TotalProfit DESC",
+    ),
+    QueryTemplate(
+        "hit_targets",
+        ["Which stocks hit their targets?", "stocks that reached their target price"],
+        "SELECT StockName, BuyPrice, SellPrice, Target FROM Recommendations WHERE SellPrice >= Target",
+    ),
+    QueryTemplate(
+        "recent_trades",
+        ["Show me recent trades", "latest trades"],
+        "SELECT * FROM Recommendations ORDER BY SellDate DESC LIMIT 10",
+    ),
+    QueryTemplate(
+        "average_return",
+        ["What's the average return?", "average profit per trade"],
+        f"SELECT ROUND(AVG({_PROFIT}), 2) AS AverageReturn, "
+        f"ROUND(AVG({_PROFIT} * 100.0 / BuyPrice), 2) AS AverageReturnPercent FROM Recommendations",
+    ),
+    QueryTemplate(
+        "risk_reward",
+        ["Which stocks have high risk-reward?", "best risk reward ratio stocks"],
+        "SELECT StockName, BuyPrice, Target, StopLoss, "
+        "ROUND((Target - BuyPrice) * 1.0 / (BuyPrice - StopLoss), 2) AS RiskRewardRatio "
+        "FROM Recommendations WHERE BuyPrice > StopLoss ORDER BY RiskRewardRatio DESC LIMIT 10",
+    ),
+    QueryTemplate(
+        "category_profit",
+        ["Which {category} stocks made profit?", "profitable {category} stocks", "{category} stocks in profit"],
+        f"SELECT StockName, BuyPrice, SellPrice, {_PROFIT} AS Profit FROM Recommendations "
+        "WHERE Category = {category} AND SellPrice > BuyPrice ORDER BY Profit DESC",
+    ),
+]
+
+# Per dataset: its templates and the queries that list the values of each text slot
+TEMPLATES = {
+    "badjate": {
+        "templates": BADJATE_TEMPLATES,
+        "slots": {"category": "SELECT DISTINCT Category FROM Recommendations WHERE Category IS NOT NULL"},
+    },
+}
+
+
+def _slot_token(slot):
+    return f"slot{slot}"
+
+
+# --- Templates of one dataset, with the slot values of one database version ---
+class TemplateRegistry:
+    def __init__(self, templates, slot_values=None, threshold=TEMPLATE_MATCH_THRESHOLD):
+        self.templates = templates
+        self.slot_values = slot_values or {}
+        self.threshold = threshold
+        # Phrasings are embedded on the first match, so listing the templates does not load numpy
+        self._phrasings = None
+        self._matrix = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _embedded(self):
+        import numpy as np
+
+        with self._lock:
+            if self._phrasings is None:
+                phrasings = []
+                for template in self.templates:
+                    for phrasing in template.phrasings:
+                        text = re.sub(r"{(\w+)}", lambda match: _slot_token(match.group(1)), phrasing)
+                        phrasings.append((template, text, embed_question(text)))
+                self._matrix = np.stack([vector for _, _, vector in phrasings]) if phrasings else None
+                self._phrasings = phrasings
+            return self._phrasings, self._matrix
+
+    ## Function To take slot values (a known category, a count) out of a question
+    def extract(self, question):
+        text = normalize_question(question)
+        values = {}
+        for slot, options in self.slot_values.items():
+            # Longest first, so "Oil & Gas" wins over "Oil"
+            for option in sorted(options, key=len, reverse=True):
+                pattern = rf"(?<!\w){re.escape(normalize_question(option))}(?!\w)"
+                if normalize_question(option) and re.search(pattern, text):
+                    values[slot] = option
+                    text = re.sub(pattern, _slot_token(slot), text, count=1)
+                    break
+        match = re.search(r"(?<![\w.])(\d+)(?![\w.])", text)
+        if match:
+            values["n"] = int(match.group(1))
+            text = text[:match.start()] + _slot_token("n") + text[match.end():]
+        return text, values
+
+    ## Function To get (template name, SQL) for a question, or None when no template fits it
+    def match(self, question):
+        import numpy as np
+
+        text, values = self.extract(question)
+        phrasings, matrix = self._embedded()
+        if matrix is None:
+            return None
+        terms = set(question_terms(text))
+        negations = terms & NEGATIONS
+        scores = matrix @ embed_question(text)
+        for index in np.argsort(-scores):
+            if scores[index] < self.threshold:
+                break
+            template, phrasing, _ = phrasings[index]
+            phrasing_terms = set(question_terms(phrasing))
+            # The same slots must be present, and "not" never matches its absence
+            slot_terms = {term for term in terms | phrasing_terms if term.startswith("slot")}
+            if not slot_terms <= terms or not slot_terms <= phrasing_terms:
+                continue
+            if negations != phrasing_terms & NEGATIONS:
+                continue
+            sql = template.render(values)
+            if sql:
+                self.hits += 1
+                return template.name, sql
+        self.misses += 1
+        return None
+
+    ## Function To list (label, SQL) of every template with its defaults, and once per known value of a text slot
+    def sample_queries(self):
+        queries = []
+        for template in self.templates:
+            missing = template.slots() - set(template.defaults)
+            if not missing:
+                queries.append((template.name, template.render({})))
+            elif len(missing) == 1:
+                slot = missing.pop()
+                for value in self.slot_values.get(slot, []):
+                    queries.append((f"{template.name}: {value}", template.render({slot: value})))
+        return queries
+
+
+def _load_slot_values(db_path, slot_queries):
+    values = {}
+    with get_pool(db_path).connection() as conn:
+        for slot, sql in slot_queries.items():
+            values[slot] = [row[0] for row in conn.execute(sql).fetchall() if isinstance(row[0], str)]
+    return values
+
+
+# One registry per dataset, rebuilt when its database changes (new categories)
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_template_registry(dataset, db_path):
+    config = TEMPLATES.get(dataset)
+    if config is None:
+        return None
+    version = db_version(db_path)
+    with _registries_lock:
+        cached = _registries.get(dataset)
+        if cached is None or cached[0] != version:
+            cached = _registries[dataset] = (
+                version, TemplateRegistry(config["templates"], _load_slot_values(db_path, config["slots"]))
+            )
+        return cached[1]
+
+
+## Function To answer a question from the dataset's templates (None when none fits or the database is unreadable)
+def template_sql(dataset, db_path, question):
+    try:
+        registry = get_template_registry(dataset, db_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Query templates unavailable: {str(e)}")
+        return None
+    if registry is None:
+        return None
+    matched = registry.match(question)
+    return matched[1] if matched else None
@@ -0,0 +1,110 @@
+import math
+import os
+
+from db_pool import get_pool
+from query_budget import QueryBudgetExceeded, enforce_budget
+from sql_tokenizer import UnterminatedSQL, tokenize
+
+# --- Configuration ---
+# At most MAX_RESULT_ROWS rows of an answer are held in memory, whatever SQL the model wrote
+MAX_RESULT_ROWS = int(os.getenv("MAX_RESULT_ROWS", "1000"))
+FETCH_CHUNK_ROWS = int(os.getenv("FETCH_CHUNK_ROWS", "256"))
+RESULT_PAGE_SIZE = int(os.getenv("RESULT_PAGE_SIZE", "100"))
+
+
+## Function To fetch at most max_rows rows in chunks, leaving the rest of the result unread
+def fetch_bounded(cursor, max_rows=MAX_RESULT_ROWS, chunk_size=FETCH_CHUNK_ROWS):
+    rows = []
+    while len(rows) < max_rows:
+        chunk = cursor.fetchmany(min(chunk_size, max_rows - len(rows)))
+        if not chunk:
+            return rows, False
+        rows.extend(chunk)
+    # One extra row tells us whether the answer was cut off
+    return rows, cursor.fetchone() is not None
+
+
+## Function To get SQL that can be wrapped in parentheses: without its trailing ";" and comments
+def _as_subquery(sql):
+    try:
+        tokens = tokenize(sql)
+    except UnterminatedSQL:
+        tokens = []
+    while tokens and tokens[-1].value == ";":
+        tokens.pop()
+    if tokens:
+        # Up to the end of the last token, so a trailing "-- comment" cannot swallow the ")"
+        return sql[:tokens[-1].end].strip()
+    # A newline still ends any line comment before the ")" is added
+    return sql.strip().rstrip(";").strip() + "\n"
+
+
+# --- One answer, served page by page ---
+class PagedResult:
+    def __init__(self, db_path, sql, columns, rows, truncated, page_size=RESULT_PAGE_SIZE, budget=None, pool=None):
+        self.db_path = db_path
+        # Anything with a connection() context manager; the shared pool of db_path by default
+        self.pool = pool
+        self.sql = sql
+        self.columns = columns
+        self.rows = rows
+        self.truncated = truncated
+        self.page_size = page_size
+        self.budget = budget
+        self._total_rows = None if truncated else len(rows)
+
+    def _pool(self):
+        return self.pool or get_pool(self.db_path)
+
+    # The true row count is only computed (with COUNT(*)) for truncated answers, and only when asked for
+    @property
+    def total_rows(self):
+        if self._total_rows is None:
+            try:
+                with self._pool().connection() as conn, enforce_budget(conn, self.budget):
+                    self._total_rows = conn.execute(
+                        f"SELECT COUNT(*) FROM ({_as_subquery(self.sql)})"
+                    ).fetchone()[0]
+            except QueryBudgetExceeded as e:
+                # Counting is too expensive, so only the rows already read are paged
+                print(f"Row count skipped: {str(e)}")
+                self._total_rows = len(self.rows)
+        return self._total_rows
+
+    @property
+    def page_count(self):
+        return max(1, math.ceil(self.total_rows / self.page_size))
+
+    ## Function To get the rows of one page (1-based), re-querying only past the in-memory rows
+    # page_size overrides the result's own for this call, so a shared result is never changed
+    def page(self, number, page_size=None):
+        page_size = page_size or self.page_size
+        start = (number - 1) * page_size
+        end = start + page_size
+        if end <= len(self.rows) or not self.truncated:
+            return self.rows[start:end]
+        try:
+            with self._pool().connection() as conn, enforce_budget(conn, self.budget):
+                return conn.execute(
+                    f"SELECT * FROM ({_as_subquery(self.sql)}) LIMIT ? OFFSET ?",
+                    (page_size, start),
+                ).fetchall()
+        except QueryBudgetExceeded as e:
+            print(f"Page {number} skipped: {str(e)}")
+            return []
+
+
+## Function To run a query on the shared pool and keep only a bounded prefix of its rows
+# The budget covers both executing the statement and stepping through the fetched rows
+def run_paged_query(db_path, sql, max_rows=MAX_RESULT_ROWS, page_size=RESULT_PAGE_SIZE, budget=None, pool=None):
+    with (pool or get_pool(db_path)).connection() as conn:
+        cursor = conn.cursor()
+        try:
+            with enforce_budget(conn, budget):
+                cursor.execute(sql)
+                columns = [description[0] for description in cursor.description]
+                rows, truncated = fetch_bounded(cursor, max_rows)
+        finally:
+            # Closing resets the statement, so the pooled connection does not hold a read snapshot
+            cursor.close()
+    return PagedResult(db_path, sql, columns, rows, truncated, page_size, budget, pool)
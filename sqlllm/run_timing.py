@@ -0,0 +1,132 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Cold start and rerun cost of the Streamlit app. The first run of the script in a process pays
+# for the imports and the one-time setup (cold start); every later run (typing, clicking) should
+# only pay for drawing the page.
+#
+#   RUN_TIMING=1 streamlit run multi_app.py          # one line per run on stdout, totals in the sidebar
+#   python run_timing.py badjate.py --reruns 20      # headless: cold start, then simulated typing
+
+# --- Configuration ---
+RUN_TIMING = os.getenv("RUN_TIMING", "0") != "0"
+RUN_TIMING_SAMPLES = int(os.getenv("RUN_TIMING_SAMPLES", "500"))
+
+# Imports that should only happen when they are first needed
+HEAVY_MODULES = ["pandas", "numpy", "faiss", "google.generativeai", "pyarrow"]
+
+# As early as the process gets: multi_app.py imports this module right after loading .env
+_imported = time.perf_counter()
+
+
+def heavy_modules_loaded():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+# --- Script run times of this process ---
+class RunTimings:
+    def __init__(self, samples=RUN_TIMING_SAMPLES):
+        self.cold_start_ms = None
+        self.first_run_ms = None
+        self.runs = 0
+        self._reruns = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def record(self, started, finished):
+        ms = 1000 * (finished - started)
+        with self._lock:
+            self.runs += 1
+            if self.first_run_ms is None:
+                self.first_run_ms = ms
+                self.cold_start_ms = 1000 * (finished - _imported)
+                return True, ms
+            self._reruns.append(ms)
+            return False, ms
+
+    def stats(self):
+        with self._lock:
+            reruns = list(self._reruns)
+        return {
+            "cold_start_ms": round(self.cold_start_ms, 1) if self.cold_start_ms is not None else None,
+            "first_run_ms": round(self.first_run_ms, 1) if self.first_run_ms is not None else None,
+            "runs": self.runs,
+            "rerun_p50_ms": round(_percentile(reruns, 50), 2) if reruns else None,
+            "rerun_p95_ms": round(_percentile(reruns, 95), 2) if reruns else None,
+            "heavy_modules": heavy_modules_loaded(),
+        }
+
+
+_timings = RunTimings()
+
+
+def get_run_timings():
+    return _timings
+
+
+## Function To time one run of the script (st.rerun and st.stop end a run too)
+@contextmanager
+def timed_run(page=""):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        cold, ms = _timings.record(started, time.perf_counter())
+        if RUN_TIMING:
+            kind = "cold start" if cold else "rerun"
+            print(f"Run {_timings.runs} {page}: {ms:.1f} ms ({kind}), heavy modules: {', '.join(heavy_modules_loaded()) or 'none'}")
+
+
+## Function To measure a script headlessly: the first run (imports included), then one rerun per typed character
+def measure(script, reruns=20, text="Show me top 5 gainers"):
+    from streamlit.testing.v1 import AppTest
+
+    started = time.perf_counter()
+    app = AppTest.from_file(script, default_timeout=120)
+    app.run()
+    cold_ms = 1000 * (time.perf_counter() - started)
+    if app.exception:
+        raise RuntimeError(f"{script} failed: {app.exception[0].value}")
+    heavy_after_start = heavy_modules_loaded()
+
+    samples = []
+    for index in range(reruns):
+        # Typing only changes the input box; nothing is asked or run
+        if app.text_input:
+            app.text_input[0].set_value(text[:index % len(text) + 1])
+        started = time.perf_counter()
+        app.run()
+        samples.append(1000 * (time.perf_counter() - started))
+    return {
+        "script": script,
+        "cold_start_ms": round(cold_ms, 1),
+        "heavy_modules_after_start": heavy_after_start,
+        "reruns": len(samples),
+        "rerun_p50_ms": round(_percentile(samples, 50), 2) if samples else None,
+        "rerun_p95_ms": round(_percentile(samples, 95), 2) if samples else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start and rerun time of a Streamlit script")
+    parser.add_argument("script", help="Streamlit script, e.g. multi_app.py or badjate.py")
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns to time after the first run")
+    args = parser.parse_args()
+    # A fresh process per measurement, so the first run really is cold
+    result = measure(args.script, args.reruns)
+    print(f"{result['script']}: cold start {result['cold_start_ms']:.0f} ms "
+          f"(heavy modules loaded: {', '.join(result['heavy_modules_after_start']) or 'none'})")
+    print(f"{result['reruns']} reruns: p50 {result['rerun_p50_ms']} ms, p95 {result['rerun_p95_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+
+from db_pool import get_pool
+from query_cache import db_version
+
+Column = namedtuple("Column", ["name", "type", "not_null", "primary_key"])
+ForeignKey = namedtuple("ForeignKey", ["column", "table", "to_column"])
+
+
+class TableInfo:
+    def __init__(self, name, kind, columns, foreign_keys=()):
+        self.name = name
+        self.kind = kind
+        self.columns = columns
+        self.foreign_keys = list(foreign_keys)
+
+    def column(self, name):
+        for column in self.columns:
+            if column.name.lower() == name.lower():
+                return column
+        return None
+
+
+# --- Tables and views of one database, read from the database itself ---
+class SchemaCatalog:
+    def __init__(self, db_path, version, tables):
+        self.db_path = db_path
+        self.version = version
+        self.tables = tables
+
+    def table(self, name):
+        for table in self.tables:
+            if table.name.lower() == name.lower():
+                return table
+        return None
+
+    def table_names(self):
+        return [table.name for table in self.tables]
+
+    ## Function To serialize the schema as one compact line per table, e.g. SALES(OrderID INTEGER PK, ItemName TEXT)
+    # notes maps column names (or "Table.Column") to hints for the model; notes on
+    # columns the database does not have are dropped, so they cannot mislead the model
+    def to_prompt(self, notes=None):
+        notes = notes or {}
+        lines = []
+        hints = []
+        for table in self.tables:
+            parts = []
+            for column in table.columns:
+                part = f"{column.name} {column.type}".strip()
+                if column.primary_key:
+                    part += " PK"
+                if column.not_null and not column.primary_key:
+                    part += " NOT NULL"
+                parts.append(part)
+                note = notes.get(f"{table.name}.{column.name}") or notes.get(column.name)
+                if note:
+                    hints.append(f"- {column.name}: {note}")
+            for key in table.foreign_keys:
+                parts.append(f"FK {key.column}→{key.table}.{key.to_column}")
+            prefix = "VIEW " if table.kind == "view" else ""
+            lines.append(f"{prefix}{table.name}({', '.join(parts)})")
+        if hints:
+            lines.append("Column notes:")
+            lines.extend(hints)
+        return "\n".join(lines)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+## Function To introspect every table and view with sqlite_master and PRAGMA table_info
+def load_catalog(db_path, version=None):
+    db_path = os.path.abspath(db_path)
+    version = version or db_version(db_path)
+    tables = []
+    with get_pool(db_path).connection() as conn:
+        objects = conn.execute(
+            "SELECT name, type FROM sqlite_master "
+            "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY type, name"
+        ).fetchall()
+        for name, kind in objects:
+            columns = [
+                Column(row[1], row[2], bool(row[3]), bool(row[5]))
+                for row in conn.execute(f"PRAGMA table_info({_quote(name)})").fetchall()
+            ]
+            foreign_keys = [
+                ForeignKey(row[3], row[2], row[4])
+                for row in conn.execute(f"PRAGMA foreign_key_list({_quote(name)})").fetchall()
+            ]
+            tables.append(TableInfo(name, kind, columns, foreign_keys))
+    return SchemaCatalog(db_path, version, tables)
+
+
+# One catalog per database and schema_version; data changes do not rebuild it
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_schema_catalog(db_path):
+    db_path = os.path.abspath(db_path)
+    version = db_version(db_path)
+    schema_key = (version[0], version[1])
+    with _catalogs_lock:
+        catalog = _catalogs.get(db_path)
+        if catalog is None or (catalog.version[0], catalog.version[1]) != schema_key:
+            catalog = _catalogs[db_path] = load_catalog(db_path, version)
+        return catalog
+
+
+## Function To get the compact schema block for a prompt ("" if the database cannot be read)
+def schema_prompt(db_path, notes=None):
+    try:
+        return get_schema_catalog(db_path).to_prompt(notes)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not read the schema of {db_path}: {str(e)}")
+        return ""
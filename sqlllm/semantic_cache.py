@@ -0,0 +1,280 @@
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from query_cache import normalize_question, schema_hash
+
+# --- Configuration ---
+SEMANTIC_MATCH_THRESHOLD = float(os.getenv("SEMANTIC_MATCH_THRESHOLD", "0.9"))
+SEMANTIC_CACHE_DIR = os.getenv(
+    "SEMANTIC_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".semantic_cache")
+)
+EMBEDDING_DIM = 512
+# The index is written to disk after this many new answers, or this long after the first unsaved one
+SEMANTIC_SAVE_EVERY = int(os.getenv("SEMANTIC_SAVE_EVERY", "20"))
+SEMANTIC_SAVE_SECONDS = float(os.getenv("SEMANTIC_SAVE_SECONDS", "60"))
+# Beyond this many answers the least recently used are dropped; the flat index is rebuilt to drop
+# them, so a tenth of the answers go at once rather than one per new answer
+SEMANTIC_MAX_ENTRIES = int(os.getenv("SEMANTIC_MAX_ENTRIES", "5000"))
+
+# Words that carry no meaning for matching a question to SQL
+STOPWORDS = {
+    "a", "an", "the", "show", "me", "us", "please", "list", "give", "display",
+    "tell", "find", "get", "our", "my", "we", "i", "you", "can", "do", "does",
+    "of", "all", "is", "are", "was", "were", "to", "what", "whats", "which",
+    "that", "with", "and", "in", "on", "for", "by", "wise",
+}
+
+# Different words the users type for the same thing
+SYNONYMS = {
+    "best": "top", "highest": "top", "biggest": "top", "largest": "top", "greatest": "top",
+    "worst": "bottom", "lowest": "bottom", "smallest": "bottom",
+    "winners": "gainers", "winner": "gainers", "gainer": "gainers",
+    "loser": "losers", "stocks": "stock", "shares": "stock", "share": "stock",
+    "sectors": "sector", "industry": "sector", "industries": "sector",
+    "categories": "sector", "category": "sector", "returns": "return",
+    "profits": "profit", "avg": "average", "mean": "average", "many": "count",
+    "number": "count", "total": "sum", "latest": "recent", "newest": "recent",
+}
+
+# Two questions that differ in any of these words never share SQL
+NEGATIONS = {"not", "no", "never", "without", "didnt", "dont", "doesnt", "isnt", "arent", "havent"}
+
+
+## Function To turn a question into canonical terms for embedding
+def question_terms(question):
+    terms = []
+    for word in normalize_question(question).split():
+        if word in STOPWORDS:
+            continue
+        terms.append(SYNONYMS.get(word, word))
+    return terms
+
+
+def _bucket(feature):
+    # crc32 is stable across processes, unlike hash(), which matters for the persisted index
+    value = zlib.crc32(feature.encode("utf-8"))
+    return value % EMBEDDING_DIM, 1.0 if value & 0x80000000 else -1.0
+
+
+## Function To embed a question locally (hashed words, word pairs and character trigrams)
+def embed_question(question):
+    # Imported on first use, so pages that never embed a question do not load numpy
+    import numpy as np
+
+    vector = np.zeros(EMBEDDING_DIM, dtype="float32")
+    terms = question_terms(question)
+    features = [(f"w:{term}", 1.0) for term in terms]
+    # Word pairs are unordered so "best 5 gainers" and "5 best gainers" embed the same
+    features += [("b:" + "_".join(sorted(pair)), 0.5) for pair in zip(terms, terms[1:])]
+    for term in terms:
+        padded = f"#{term}#"
+        features += [(f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2)]
+    for feature, weight in features:
+        index, sign = _bucket(feature)
+        vector[index] += sign * weight
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def _guard_tokens(question):
+    words = set(normalize_question(question).split())
+    numbers = {word for word in words if re.search(r"\d", word)}
+    return numbers, words & NEGATIONS
+
+
+## Function To check that a cached SQL is safe to reuse for a new question
+def is_compatible(question, cached_question, sql):
+    # Similar wording is not enough: "top 3" and "top 5" or "hit" and "did not hit" need different SQL
+    if _guard_tokens(question) != _guard_tokens(cached_question):
+        return False
+    # Every literal the SQL filters on (e.g. Category = 'IT') must be mentioned in the new question
+    words = set(normalize_question(question).split())
+    for literal in re.findall(r"'([^']*)'", sql):
+        literal_words = normalize_question(literal).split()
+        if literal_words and not all(word in words for word in literal_words):
+            return False
+    return True
+
+
+def _schema_key(db_path):
+    try:
+        return schema_hash(db_path)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+# --- Semantic index of answered questions ---
+class SemanticIndex:
+    def __init__(self, dataset, threshold=SEMANTIC_MATCH_THRESHOLD, cache_dir=SEMANTIC_CACHE_DIR,
+                 max_entries=SEMANTIC_MAX_ENTRIES):
+        self.dataset = dataset
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.index_path = os.path.join(cache_dir, f"{dataset}.faiss")
+        self.entries_path = os.path.join(cache_dir, f"{dataset}.json")
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.lookup_seconds = 0.0
+        self.evicted = 0
+        self._unsaved = 0
+        self._unsaved_since = None
+        self._load()
+        self._index_positions()
+
+    def _index_positions(self):
+        # (normalized question, schema) → position in entries, so an answer is found without a scan
+        self._positions = {(entry["normalized"], entry["schema"]): i for i, entry in enumerate(self.entries)}
+
+    def _load(self):
+        import faiss
+
+        if os.path.exists(self.index_path) and os.path.exists(self.entries_path):
+            try:
+                self.index = faiss.read_index(self.index_path)
+                with open(self.entries_path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+                if self.index.ntotal == len(self.entries):
+                    return
+            except Exception as e:
+                print(f"Could not load semantic index for {self.dataset}: {str(e)}")
+        self.index = faiss.IndexFlatIP(EMBEDDING_DIM)
+        self.entries = []
+
+    def _save(self):
+        import faiss
+
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        faiss.write_index(self.index, self.index_path + ".tmp")
+        with open(self.entries_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(self.index_path + ".tmp", self.index_path)
+        os.replace(self.entries_path + ".tmp", self.entries_path)
+        self._unsaved = 0
+        self._unsaved_since = None
+
+    def lookup(self, question, db_path, k=5):
+        started = time.perf_counter()
+        # SQL is only reused against the schema it was validated on
+        schema_key = _schema_key(db_path)
+        with self._lock:
+            self.lookups += 1
+            match = None
+            if schema_key and self.index.ntotal:
+                scores, ids = self.index.search(embed_question(question)[None, :], min(k, self.index.ntotal))
+                for score, entry_id in zip(scores[0], ids[0]):
+                    if entry_id < 0 or score < self.threshold:
+                        break
+                    entry = self.entries[entry_id]
+                    if entry["schema"] == schema_key and is_compatible(question, entry["question"], entry["sql"]):
+                        match = entry["sql"]
+                        entry["used"] = time.time()
+                        self.hits += 1
+                        break
+            self.lookup_seconds += time.perf_counter() - started
+            return match
+
+    def add(self, question, sql, db_path):
+        normalized = normalize_question(question)
+        schema_key = _schema_key(db_path)
+        if schema_key is None:
+            return
+        vector = embed_question(question)[None, :]
+        with self._lock:
+            position = self._positions.get((normalized, schema_key))
+            if position is not None:
+                if self.entries[position]["sql"] == sql:
+                    return
+                self.entries[position].update(sql=sql, used=time.time())
+            else:
+                self.index.add(vector)
+                self._positions[(normalized, schema_key)] = len(self.entries)
+                self.entries.append({
+                    "question": question,
+                    "normalized": normalized,
+                    "sql": sql,
+                    "schema": schema_key,
+                    "used": time.time(),
+                })
+                if len(self.entries) > self.max_entries:
+                    self._evict()
+            self._unsaved += 1
+            if self._unsaved_since is None:
+                self._unsaved_since = time.monotonic()
+            if self._unsaved >= SEMANTIC_SAVE_EVERY or time.monotonic() - self._unsaved_since >= SEMANTIC_SAVE_SECONDS:
+                self._save()
+
+    ## Function To drop the least recently used answers, rebuilding the index from the vectors it keeps
+    def _evict(self):
+        import faiss
+
+        keep = max(1, self.max_entries * 9 // 10)
+        recent = sorted(range(len(self.entries)), key=lambda i: self.entries[i].get("used", 0), reverse=True)
+        kept = sorted(recent[:keep])
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)[kept]
+        self.index = faiss.IndexFlatIP(EMBEDDING_DIM)
+        self.index.add(vectors)
+        self.evicted += len(self.entries) - len(kept)
+        self.entries = [self.entries[i] for i in kept]
+        self._index_positions()
+
+    ## Function To write unsaved answers to disk (also run at exit)
+    def flush(self):
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "evicted": self.evicted,
+                "unsaved": self._unsaved,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "avg_lookup_ms": 1000 * self.lookup_seconds / self.lookups if self.lookups else 0.0,
+            }
+
+
+# One index per dataset, shared by every session in the process
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _flush_indexes():
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        try:
+            index.flush()
+        except OSError as e:
+            print(f"Could not save semantic index for {index.dataset}: {str(e)}")
+
+
+atexit.register(_flush_indexes)
+
+
+## Function To get a dataset's index, loading faiss and the saved index on first use
+def get_semantic_index(dataset):
+    with _indexes_lock:
+        if dataset not in _indexes:
+            _indexes[dataset] = SemanticIndex(dataset)
+        return _indexes[dataset]
+
+
+## Function To get a dataset's index counters without loading it (zeros until its first use)
+def semantic_index_stats(dataset):
+    with _indexes_lock:
+        index = _indexes.get(dataset)
+    if index is None:
+        return {"entries": 0, "evicted": 0, "unsaved": 0, "lookups": 0, "hits": 0, "hit_rate": 0.0, "avg_lookup_ms": 0.0}
+    return index.stats()
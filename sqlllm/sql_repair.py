@@ -0,0 +1,270 @@
+import difflib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from db_pool import get_pool
+from query_cache import db_version
+from schema_catalog import get_schema_catalog
+from sql_tokenizer import UnterminatedSQL, identifier_name, is_keyword, string_value, tokenize
+from sql_validator import compile_error, extract_statement
+
+# Generated SQL that fails is first repaired locally: the SQLite error names the identifier
+# it could not resolve, which is matched against the schema (and text literals against the
+# column's values), then the statement is compiled again. Only when that fails is the model
+# asked once more, with the error.
+
+# --- Configuration ---
+REPAIR_MATCH_CUTOFF = float(os.getenv("REPAIR_MATCH_CUTOFF", "0.6"))
+REPAIR_MAX_STEPS = int(os.getenv("REPAIR_MAX_STEPS", "5"))
+# Text columns with at most this many distinct values are used to correct literals
+REPAIR_MAX_VALUES = int(os.getenv("REPAIR_MAX_VALUES", "200"))
+
+CLAUSE_KEYWORDS = {
+    "SELECT", "FROM", "WHERE", "GROUP", "ORDER", "BY", "HAVING", "LIMIT", "OFFSET", "JOIN", "ON", "AND", "OR",
+    "NOT", "AS", "ASC", "DESC", "UNION", "ALL", "CASE", "WHEN", "THEN", "ELSE", "END", "IN", "IS", "NULL",
+    "LIKE", "BETWEEN", "LEFT", "INNER", "OUTER", "CROSS", "DISTINCT", "WITH", "EXCEPT", "INTERSECT",
+}
+_NO_SUCH_RE = re.compile(r"no such (table|column): (\S+)")
+_SYNTAX_RE = re.compile(r'near "([^"]+)": syntax error')
+
+
+def _key(name):
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+
+## Function To find the closest name (case, spaces and underscores ignored), None when nothing is close
+def closest_name(name, candidates, cutoff=REPAIR_MATCH_CUTOFF):
+    keyed = {}
+    for candidate in candidates:
+        keyed.setdefault(_key(candidate), candidate)
+    if _key(name) in keyed:
+        return keyed[_key(name)]
+    match = difflib.get_close_matches(_key(name), list(keyed), n=1, cutoff=cutoff)
+    return keyed[match[0]] if match else None
+
+
+def _identifier(name):
+    if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _replace(sql, replacements):
+    # replacements: (start, end, text), applied back to front so positions stay valid
+    for start, end, text in sorted(replacements, reverse=True):
+        sql = sql[:start] + text + sql[end:]
+    return sql
+
+
+# --- Distinct values of the low-cardinality text columns, per database version ---
+class ValueCatalog:
+    def __init__(self, db_path, version):
+        self.db_path = db_path
+        self.version = version
+        self._values = {}
+        self._lock = threading.Lock()
+
+    ## Function To get the distinct values of a column (None for unknown or high-cardinality columns)
+    def values(self, column):
+        catalog = get_schema_catalog(self.db_path)
+        for table in catalog.tables:
+            info = table.column(column)
+            if info is None or (info.type and "CHAR" not in info.type.upper() and "TEXT" not in info.type.upper()):
+                continue
+            key = (table.name, info.name)
+            with self._lock:
+                if key not in self._values:
+                    with get_pool(self.db_path).connection() as conn:
+                        rows = conn.execute(
+                            f"SELECT DISTINCT {_identifier(info.name)} FROM {_identifier(table.name)} "
+                            f"WHERE {_identifier(info.name)} IS NOT NULL LIMIT ?",
+                            (REPAIR_MAX_VALUES + 1,),
+                        ).fetchall()
+                    values = [row[0] for row in rows if isinstance(row[0], str)]
+                    self._values[key] = values if len(rows) <= REPAIR_MAX_VALUES else None
+                if self._values[key]:
+                    return self._values[key]
+        return None
+
+
+_value_catalogs = {}
+_value_catalogs_lock = threading.Lock()
+
+
+def get_value_catalog(db_path):
+    db_path = os.path.abspath(db_path)
+    version = db_version(db_path)
+    with _value_catalogs_lock:
+        catalog = _value_catalogs.get(db_path)
+        if catalog is None or catalog.version != version:
+            catalog = _value_catalogs[db_path] = ValueCatalog(db_path, version)
+        return catalog
+
+
+# --- Counters shared by every session of the process ---
+_stats = {"attempts": 0, "repaired": 0, "values": 0, "ms": 0.0}
+_stats_lock = threading.Lock()
+
+
+def repair_stats():
+    with _stats_lock:
+        attempts = _stats["attempts"]
+        return {
+            "attempts": attempts,
+            "repaired": _stats["repaired"],
+            "values": _stats["values"],
+            "avg_ms": _stats["ms"] / attempts if attempts else 0.0,
+        }
+
+
+def _fix_table(sql, tokens, name, catalog):
+    tables = catalog.table_names()
+    # With a single table, whatever the model called it, it meant that one (STUDENT for FINANCE)
+    target = tables[0] if len(tables) == 1 else closest_name(name, tables)
+    if target is None:
+        return None
+    replacements = []
+    for index, token in enumerate(tokens):
+        if token.kind not in ("word", "quoted") or identifier_name(token).lower() != name.lower():
+            continue
+        before = tokens[index - 1] if index else None
+        after = tokens[index + 1] if index + 1 < len(tokens) else None
+        if (before is not None and is_keyword(before, "FROM", "JOIN")) or (after is not None and after.value == "."):
+            replacements.append((token.start, token.end, _identifier(target)))
+    return _replace(sql, replacements) if replacements else None
+
+
+def _fix_column(sql, tokens, name, catalog):
+    qualifier, _, column = name.rpartition(".")
+    columns = {c.name for table in catalog.tables for c in table.columns}
+    target = closest_name(column, columns)
+    if target is None:
+        return None
+    replacements = []
+    for index, token in enumerate(tokens):
+        if token.kind not in ("word", "quoted") or identifier_name(token).lower() != column.lower():
+            continue
+        before = tokens[index - 1] if index else None
+        if qualifier:
+            # Only the qualified use (alias.column) is the unresolved one
+            if not (before is not None and before.value == "." and index > 1
+                    and identifier_name(tokens[index - 2]).lower() == qualifier.lower()):
+                continue
+        elif before is not None and before.value == ".":
+            continue
+        replacements.append((token.start, token.end, _identifier(target)))
+    return _replace(sql, replacements) if replacements else None
+
+
+def _cut_prose(sql, tokens, near):
+    # "... LIMIT 5 This query returns ..." fails near "This": everything from there on is prose
+    for index, token in enumerate(tokens):
+        if token.kind == "word" and token.value == near and token.value.upper() not in CLAUSE_KEYWORDS:
+            if index + 1 < len(tokens) and tokens[index + 1].kind == "word":
+                return sql[:token.start].strip()
+    return None
+
+
+## Function To try one local fix for a compile error (None when there is nothing to fix)
+def _repair_step(sql, error, catalog):
+    try:
+        tokens = tokenize(sql)
+    except UnterminatedSQL:
+        return None
+    match = _NO_SUCH_RE.search(error)
+    if match:
+        name = match.group(2)
+        if match.group(1) == "table":
+            return _fix_table(sql, tokens, name.rpartition(".")[2], catalog)
+        return _fix_column(sql, tokens, name, catalog)
+    match = _SYNTAX_RE.search(error)
+    if match:
+        return _cut_prose(sql, tokens, match.group(1))
+    return None
+
+
+def _compared_column(tokens, index):
+    # column = 'x', column != 'x', column IN ('x', 'y')
+    position = index - 1
+    while position >= 0 and (tokens[position].kind == "string" or tokens[position].value == ","):
+        position -= 1
+    if position >= 0 and tokens[position].value == "(" and position >= 2 and is_keyword(tokens[position - 1], "IN"):
+        position -= 2
+    elif position == index - 1 and tokens[position].value in ("=", "==", "!=", "<>"):
+        position -= 1
+    else:
+        return None
+    if position >= 0 and tokens[position].kind in ("word", "quoted") and not is_keyword(tokens[position], *CLAUSE_KEYWORDS):
+        return identifier_name(tokens[position])
+    return None
+
+
+## Function To replace text literals that are not a value of their column with the closest value that is
+def repair_values(db_path, sql):
+    try:
+        tokens = tokenize(sql)
+        catalog = get_value_catalog(db_path)
+    except (UnterminatedSQL, OSError, sqlite3.Error):
+        return None
+    replacements = []
+    for index, token in enumerate(tokens):
+        if token.kind != "string":
+            continue
+        column = _compared_column(tokens, index)
+        if column is None:
+            continue
+        try:
+            known = catalog.values(column)
+        except sqlite3.Error:
+            known = None
+        value = string_value(token)
+        if not known or value in known:
+            continue
+        # A unique prefix ("bank" for "Banking") first, then the closest spelling
+        prefixed = [known_value for known_value in known if known_value.lower().startswith(value.lower())]
+        target = prefixed[0] if len(prefixed) == 1 else closest_name(value, known, cutoff=0.8)
+        if target is not None:
+            replacements.append((token.start, token.end, "'" + target.replace("'", "''") + "'"))
+    if not replacements:
+        return None
+    with _stats_lock:
+        _stats["values"] += 1
+    return _replace(sql, replacements)
+
+
+## Function To repair SQL that does not compile, using only the schema (None when it cannot be fixed locally)
+def repair_sql(db_path, sql, error=None):
+    started = time.perf_counter()
+    try:
+        catalog = get_schema_catalog(db_path)
+    except (OSError, sqlite3.Error):
+        return None
+    fixed = None
+    candidate = extract_statement(sql) or sql
+    error = compile_error(db_path, candidate) if candidate != sql or error is None else error
+    for _ in range(REPAIR_MAX_STEPS):
+        if error is None:
+            fixed = candidate
+            break
+        candidate = _repair_step(candidate, error, catalog)
+        if candidate is None:
+            break
+        error = compile_error(db_path, candidate)
+    with _stats_lock:
+        _stats["attempts"] += 1
+        _stats["repaired"] += fixed is not None
+        _stats["ms"] += 1000 * (time.perf_counter() - started)
+    return fixed
+
+
+## Function To tell the model what went wrong with its previous answer
+def feedback_prompt(sql, error):
+    return (
+        "\nYOUR PREVIOUS ANSWER FAILED:\n"
+        f"{sql}\n"
+        f"SQLite error: {error}\n"
+        "Return only a corrected SQLite query.\n"
+    )
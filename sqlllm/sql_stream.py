@@ -0,0 +1,152 @@
+import os
+
+from sql_tokenizer import UnterminatedSQL, is_keyword, tokenize
+from sql_validator import answer_tokens, find_statement
+
+# The model's answer is read as it streams. Generation stops as soon as the statement is
+# complete (its ";" or closing fence), and is abandoned as soon as the answer clearly is
+# not a SELECT, or is the dataset's off-topic reply. Trailing prose is never waited for.
+
+# --- Configuration ---
+# LLM_STREAMING=0 waits for the whole response, as before
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") != "0"
+# A preamble ("Sure! Here is the query:") is read this far for a SELECT before giving up
+LLM_STREAM_PROSE_CHARS = int(os.getenv("LLM_STREAM_PROSE_CHARS", "120"))
+
+# Statements that are never answered, whatever follows them
+OTHER_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "DROP", "CREATE", "ALTER", "REPLACE", "PRAGMA", "ATTACH", "DETACH", "VACUUM")
+
+
+class NotSQLError(ValueError):
+    pass
+
+
+# --- Incremental reader of one streamed answer ---
+class StreamingSQL:
+    # state: waiting (not decided yet), sql (inside the statement), done, refusal or not_sql
+    def __init__(self, refusal_markers=()):
+        self.refusal_markers = [marker for marker in refusal_markers if marker]
+        self.text = ""
+        self.state = "waiting"
+        self.start = None
+        self.end = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        started = self.state == "waiting"
+        if started:
+            self._classify()
+        # The statement can only end in a chunk carrying a ";" or a fence
+        if self.state == "sql" and (started or ";" in chunk or "`" in chunk):
+            self._find_end()
+        return self.state
+
+    def _classify(self):
+        for marker in self.refusal_markers:
+            if marker in self.text:
+                self.state = "refusal"
+                return
+        # The same start detection as sql_validator.extract_statement, so the two never disagree
+        tokens = answer_tokens(self.text)
+        # The last token may still be growing ("SEL", "Recommend")
+        if tokens and tokens[-1].end == len(self.text):
+            tokens = tokens[:-1]
+        if tokens and is_keyword(tokens[0], *OTHER_STATEMENTS):
+            self.state = "not_sql"
+            return
+        start, verdict = find_statement(tokens)
+        if verdict:
+            self.state = "sql"
+            self.start = tokens[start].start
+            return
+        if verdict is None:
+            # A SELECT / WITH whose next tokens are still to come
+            return
+        lead = self.text.strip()
+        if any(marker.startswith(lead) for marker in self.refusal_markers):
+            return
+        # Prose first: the statement may still follow it
+        if len(lead) < LLM_STREAM_PROSE_CHARS:
+            return
+        self.state = "not_sql"
+
+    def _find_end(self):
+        body = self.text[self.start:]
+        fence = body.find("```")
+        if fence >= 0:
+            body = body[:fence]
+        try:
+            tokens = tokenize(body)
+        except UnterminatedSQL:
+            # A string literal is still open, so a ";" seen so far may be inside it
+            tokens = None
+        if tokens is not None:
+            for token in tokens:
+                if token.kind == "op" and token.value == ";":
+                    self.end = self.start + token.end
+                    self.state = "done"
+                    return
+        if fence >= 0:
+            self.end = self.start + fence
+            self.state = "done"
+
+    ## Function To get what the cleanup should see: the statement alone, or the whole answer when undecided
+    def result(self):
+        if self.state == "done":
+            return self.text[self.start:self.end]
+        if self.state == "sql":
+            return self.text[self.start:]
+        return self.text
+
+
+def _not_sql(reader):
+    return NotSQLError(f"Generated response is not a SELECT statement: {reader.text.strip()[:80]!r}")
+
+
+## Function To stream the model's answer and stop reading at the end of the statement
+def stream_sql(llm, contents, refusal_markers=(), **options):
+    reader = StreamingSQL(refusal_markers)
+    chunks = llm.generate(contents, stream=True, **options)
+    try:
+        for chunk in chunks:
+            state = reader.feed(chunk)
+            if state == "not_sql":
+                raise _not_sql(reader)
+            if state in ("done", "refusal"):
+                break
+    finally:
+        # Closing the stream cancels the rest of the generation
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+    return reader.result()
+
+
+async def stream_sql_async(llm, contents, refusal_markers=(), **options):
+    reader = StreamingSQL(refusal_markers)
+    chunks = await llm.generate_async(contents, stream=True, **options)
+    try:
+        async for chunk in chunks:
+            state = reader.feed(chunk)
+            if state == "not_sql":
+                raise _not_sql(reader)
+            if state in ("done", "refusal"):
+                break
+    finally:
+        close = getattr(chunks, "aclose", None)
+        if close:
+            await close()
+    return reader.result()
+
+
+## Function To get the model's answer, streamed unless LLM_STREAMING is off
+def generate_statement(llm, contents, refusal_markers=(), **options):
+    if not LLM_STREAMING:
+        return llm.generate(contents, **options)
+    return stream_sql(llm, contents, refusal_markers, **options)
+
+
+async def generate_statement_async(llm, contents, refusal_markers=(), **options):
+    if not LLM_STREAMING:
+        return await llm.generate_async(contents, **options)
+    return await stream_sql_async(llm, contents, refusal_markers, **options)
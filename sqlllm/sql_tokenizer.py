@@ -0,0 +1,56 @@
+import re
+from collections import namedtuple
+
+# kind is one of: string, quoted (a quoted identifier), number, word, param, op
+Token = namedtuple("Token", ["kind", "value", "start", "end"])
+
+_TOKEN_PATTERNS = [
+    ("space", r"\s+"),
+    ("comment", r"--[^\n]*|/\*.*?(?:\*/|$)"),
+    ("string", r"'(?:[^']|'')*'"),
+    ("quoted", r'"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]'),
+    ("number", r"(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?"),
+    ("word", r"[A-Za-z_][A-Za-z0-9_$]*"),
+    ("param", r"[?:@$][A-Za-z0-9_]*"),
+    ("op", r"<>|<=|>=|!=|==|\|\||<<|>>|[-+*/%<>=(),.;~&|]"),
+]
+_TOKEN_RE = re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in _TOKEN_PATTERNS), re.S)
+
+
+class UnterminatedSQL(ValueError):
+    pass
+
+
+## Function To split SQL into tokens, skipping whitespace and comments
+def tokenize(sql, keep_comments=False):
+    tokens = []
+    position = 0
+    while position < len(sql):
+        match = _TOKEN_RE.match(sql, position)
+        if match is None:
+            # Unterminated quotes or characters SQLite would reject
+            if sql[position] in "'\"`[":
+                raise UnterminatedSQL(f"Unterminated quote at position {position}")
+            tokens.append(Token("op", sql[position], position, position + 1))
+            position += 1
+            continue
+        kind = match.lastgroup
+        if kind != "space" and (kind != "comment" or keep_comments):
+            tokens.append(Token(kind, match.group(), match.start(), match.end()))
+        position = match.end()
+    return tokens
+
+
+def is_keyword(token, *words):
+    return token.kind == "word" and token.value.upper() in words
+
+
+## Function To get the plain name of an identifier token ("Name", [Name] and Name are the same)
+def identifier_name(token):
+    if token.kind == "quoted":
+        return token.value[1:-1]
+    return token.value
+
+
+def string_value(token):
+    return token.value[1:-1].replace("''", "'")
@@ -0,0 +1,211 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from db_pool import get_pool
+from query_cache import db_version
+from sql_tokenizer import UnterminatedSQL, is_keyword, tokenize
+
+# Model output goes through two cheap stages before it may run:
+#   1. extraction - the statement is cut out of fences and prose with the SQL tokenizer, so
+#      multi-line CASE ... THEN branches and WITH ... SELECT statements survive intact
+#   2. validation - the statement is only prepared (EXPLAIN), under an authorizer that admits
+#      reads and nothing else; verdicts are cached per schema version
+
+# --- Configuration ---
+VALIDATION_CACHE_MAX_ENTRIES = int(os.getenv("VALIDATION_CACHE_MAX_ENTRIES", "2048"))
+
+_FENCE_RE = re.compile(r"```[A-Za-z]*")
+# Functions that are callable in a SELECT but reach outside the database
+DENIED_FUNCTIONS = {"load_extension", "readfile", "writefile", "fts3_tokenizer"}
+_READ_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+
+# Tokens that can follow a select-list item; "select the best" in prose is followed by another word
+_AFTER_ITEM = {",", ".", "(", ";", "+", "-", "*", "/", "%", "||", "=", "<", ">", "<=", ">=", "<>", "!="}
+
+
+# True / False, or None when the tokens run out before it is decided (a stream still arriving)
+def _starts_select_list(tokens, position):
+    if position >= len(tokens):
+        return None
+    token = tokens[position]
+    if is_keyword(token, "DISTINCT", "ALL"):
+        # "select all the rows" is prose, SELECT ALL Name FROM ... is not
+        return _starts_select_list(tokens, position + 1)
+    if token.value in ("*", "(") or token.kind in ("number", "string", "param"):
+        return True
+    if is_keyword(token, "CASE", "CAST", "NOT", "EXISTS"):
+        return True
+    if token.kind not in ("word", "quoted"):
+        return False
+    if position + 1 >= len(tokens):
+        return None
+    following = tokens[position + 1]
+    return following.value in _AFTER_ITEM or is_keyword(following, "FROM", "AS")
+
+
+def _starts_statement(tokens, index):
+    token = tokens[index]
+    if is_keyword(token, "SELECT"):
+        return _starts_select_list(tokens, index + 1)
+    if not is_keyword(token, "WITH"):
+        return False
+    # WITH [RECURSIVE] name [(columns)] AS ( - not the English "with"
+    position = index + 1
+    if position < len(tokens) and is_keyword(tokens[position], "RECURSIVE"):
+        position += 1
+    if position + 1 >= len(tokens):
+        return None
+    if tokens[position].kind not in ("word", "quoted"):
+        return False
+    following = tokens[position + 1]
+    return is_keyword(following, "AS") or following.value == "("
+
+
+def _tokens(text, offset=0):
+    try:
+        tokens = tokenize(text)
+    except UnterminatedSQL as e:
+        # An apostrophe in the prose ("Here's the query") - tokenize on both sides of it
+        position = int(re.search(r"position (\d+)", str(e)).group(1))
+        return _tokens(text[:position], offset) + _tokens(text[position + 1:], offset + position + 1)
+    return [token._replace(start=token.start + offset, end=token.end + offset) for token in tokens]
+
+
+## Function To tokenize the model's answer; fences become blank space, so positions still point into the text
+def answer_tokens(text):
+    return _tokens(_FENCE_RE.sub(lambda match: " " * len(match.group()), text))
+
+
+## Function To find the token starting the SELECT / WITH statement, checked by what follows it
+# Returns (index, True), (index, None) while the tokens after it are still to come, or (None, False)
+def find_statement(tokens):
+    for index in range(len(tokens)):
+        verdict = _starts_statement(tokens, index)
+        if verdict is not False:
+            return index, verdict
+    return None, False
+
+
+## Function To cut the first SELECT / WITH statement out of the model's answer (None when there is none)
+def extract_statement(text):
+    tokens = answer_tokens(text)
+    start, verdict = find_statement(tokens)
+    if not verdict:
+        return None
+    begin = tokens[start].start
+    # The statement ends at its ";", or else at the closing fence (prose may follow either)
+    fence = text.find("```", begin)
+    limit = fence if fence >= 0 else len(text)
+    end = next((token.end for token in tokens[start:] if token.value == ";" and token.end <= limit), limit)
+    return text[begin:end].strip()
+
+
+## Function To turn the model's answer into a single SELECT statement, or raise ValueError
+def extract_sql(response_text):
+    sql = extract_statement(response_text or "")
+    if not sql:
+        raise ValueError("Generated query is not a valid SELECT statement")
+    return sql
+
+
+def _read_only(action, arg1, arg2, database, trigger):
+    if action not in _READ_ACTIONS:
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_FUNCTION and (arg2 or "").lower() in DENIED_FUNCTIONS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+def _prepare(conn, sql):
+    conn.set_authorizer(_read_only)
+    try:
+        # EXPLAIN prepares the statement without running it; "not authorized" comes from the authorizer
+        conn.execute("EXPLAIN " + sql).fetchone()
+    finally:
+        conn.set_authorizer(None)
+
+
+## Function To get (statement to prepare, cache key): the statement keeps its own text and line breaks,
+# so a "--" comment still ends at its newline; the key ignores comments, spacing and the final ";"
+def _statement_and_key(sql):
+    try:
+        tokens = tokenize(sql)
+    except UnterminatedSQL:
+        return sql.strip(), sql.strip()
+    while tokens and tokens[-1].value == ";":
+        tokens.pop()
+    if not tokens:
+        return "", ""
+    return sql[tokens[0].start:tokens[-1].end], " ".join(token.value for token in tokens)
+
+
+# --- Compile verdicts, keyed by database, schema version and statement ---
+class ValidationCache:
+    def __init__(self, max_entries=VALIDATION_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._verdicts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compile_seconds = 0.0
+
+    def verdict(self, db_path, sql, pool=None):
+        statement, statement_key = _statement_and_key(sql)
+        key = None
+        if pool is None:
+            # Validity only depends on the schema, so data changes keep the verdicts
+            db_path = os.path.abspath(db_path)
+            version = db_version(db_path)
+            key = (db_path, version[0], version[1], statement_key)
+            with self._lock:
+                if key in self._verdicts:
+                    self._verdicts.move_to_end(key)
+                    self.hits += 1
+                    return self._verdicts[key]
+        started = time.perf_counter()
+        try:
+            with (pool or get_pool(db_path)).connection() as conn:
+                _prepare(conn, statement)
+            error = None
+        except sqlite3.Error as e:
+            error = str(e)
+        with self._lock:
+            self.misses += 1
+            self.compile_seconds += time.perf_counter() - started
+            if key is not None:
+                self._verdicts[key] = error
+                while len(self._verdicts) > self.max_entries:
+                    self._verdicts.popitem(last=False)
+        return error
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._verdicts),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "avg_compile_ms": 1000 * self.compile_seconds / self.misses if self.misses else 0.0,
+            }
+
+
+_validation_cache = ValidationCache()
+
+
+def get_validation_cache():
+    return _validation_cache
+
+
+## Function To check that SQL compiles as a read-only statement, None when it does (else the error)
+# pool: anything with a connection() context manager (e.g. a session's result tables); not cached
+def compile_error(db_path, sql, pool=None):
+    try:
+        return _validation_cache.verdict(db_path, sql, pool)
+    except (OSError, sqlite3.Error) as e:
+        return str(e)
@@ -0,0 +1,245 @@
+import argparse
+import os
+import random
+import sqlite3
+import time
+from bisect import bisect
+from datetime import date, timedelta
+from multiprocessing import Pool
+
+# Realistic data for the four schemas at any size, bulk-loaded into SQLite.
+# The seed scripts (sql.py, finance-sql.py, bombay-sql.py, badjate-sql.py) only insert a handful of rows.
+#
+#   python synthetic_data.py badjate --rows 1000000 --out badjate_1m.db --workers 4
+#
+# Rows are generated in chunks, each from its own seed, so the same --seed gives the same
+# database whatever the number of workers.
+
+# --- Configuration ---
+DEFAULT_CHUNK_ROWS = int(os.getenv("SYNTHETIC_CHUNK_ROWS", "50000"))
+# Rows written per transaction; one commit per chunk would make small chunks slow
+DEFAULT_COMMIT_ROWS = int(os.getenv("SYNTHETIC_COMMIT_ROWS", "500000"))
+
+# Only used while loading: nothing else reads the file until it is complete, so a crash
+# just means loading again. The file is switched to WAL at the end,
+# so readers never block on a later reload (db_pool does not change the journal mode itself).
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -200000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA locking_mode = EXCLUSIVE",
+]
+
+
+# --- Value pools; earlier entries are picked more often (Zipf-like), as in real sales ---
+STOCKS = {
+    "Banking": ["HDFC Bank", "ICICI Bank", "SBI", "Kotak Bank", "Axis Bank", "IndusInd Bank"],
+    "IT": ["TCS", "Infosys", "Wipro", "HCL Tech", "Tech Mahindra", "LTIMindtree"],
+    "Energy": ["Reliance", "ONGC", "NTPC", "Power Grid", "BPCL", "Coal India"],
+    "Auto": ["Maruti Suzuki", "Tata Motors", "M&M", "Bajaj Auto", "Hero MotoCorp", "Eicher Motors"],
+    "FMCG": ["HUL", "ITC", "Asian Paints", "Nestle", "Britannia", "Dabur"],
+    "Telecom": ["Bharti Airtel", "Vodafone Idea", "Indus Towers"],
+    "Retail": ["Titan", "DMart", "Trent"],
+    "Pharma": ["Sun Pharma", "Dr Reddy's", "Cipla", "Divi's Labs"],
+}
+STOCK_CATEGORIES = list(STOCKS)
+SWEETS = {
+    "Sweet": ["Kaju Katli", "Rasgulla", "Ladoo", "Barfi", "Gulab Jamun", "Jalebi", "Peda", "Soan Papdi"],
+    "Namkeen": ["Bhakarwadi", "Chivda", "Sev", "Farsan", "Mathri", "Chakli"],
+}
+# Rupees per kg
+SWEET_PRICES = {
+    "Kaju Katli": 1600, "Rasgulla": 450, "Ladoo": 800, "Barfi": 800, "Gulab Jamun": 500, "Jalebi": 400,
+    "Peda": 700, "Soan Papdi": 350, "Bhakarwadi": 300, "Chivda": 400, "Sev": 400, "Farsan": 350,
+    "Mathri": 300, "Chakli": 380,
+}
+PAYMENT_MODES = ["UPI", "Cash", "Card"]
+QUANTITIES_KG = [0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0]
+DEPARTMENTS = ["Finance", "Economics", "Marketing", "Computer Science", "Mechanical", "Commerce", "Arts"]
+CLASSES = ["Data Science", "DEVOPS", "Cloud", "Web Development", "Cyber Security"]
+SECTIONS = ["A", "B", "C"]
+FIRST_NAMES = {
+    "Female": ["Ananya", "Kavita", "Sneha", "Priya", "Meera", "Isha", "Pooja", "Neha", "Riya", "Divya"],
+    "Male": ["Rohit", "Arjun", "Aditya", "Varun", "Ansh", "Karan", "Kartik", "Rohan", "Vikram", "Aarav"],
+}
+LAST_NAMES = ["Sharma", "Mehra", "Rao", "Verma", "Patel", "Iyer", "Singh", "Gupta", "Nair", "Das", "Joshi", "Kulkarni"]
+
+START_DATE = date(2023, 1, 1)
+DATE_SPAN_DAYS = 3 * 365
+
+
+# Cumulative weights per (number of values, exponent), computed once: generation is the slow part of a load
+_cum_weights = {}
+
+
+def _skewed(rng, values, s=1.1):
+    cum_weights = _cum_weights.get((len(values), s))
+    if cum_weights is None:
+        weights = [1 / (rank + 1) ** s for rank in range(len(values))]
+        cum_weights = _cum_weights[(len(values), s)] = [sum(weights[:i + 1]) for i in range(len(weights))]
+    return values[bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+def _day(rng, span=DATE_SPAN_DAYS):
+    # More recent days are busier: business grows over the range
+    return START_DATE + timedelta(days=int(span * rng.random() ** 0.7))
+
+
+def _recommendation(rng, order_id):
+    category = _skewed(rng, STOCK_CATEGORIES)
+    buy_date = _day(rng)
+    buy_price = int(rng.lognormvariate(7.2, 0.9)) + 10
+    return (
+        order_id, _skewed(rng, STOCKS[category]), buy_date.isoformat(), buy_price,
+        (buy_date + timedelta(days=rng.randrange(1, 120))).isoformat(), int(buy_price * rng.gauss(1.02, 0.08)),
+        int(buy_price * rng.uniform(1.03, 1.25)), int(buy_price * rng.uniform(0.85, 0.98)), category,
+    )
+
+
+def _student_finance(rng, student_id):
+    gender = rng.choice(["Female", "Male"])
+    total_fees = rng.randrange(150000, 250001, 10000)
+    scholarship = rng.choice([0, 0, 0, 10000, 20000, 50000, 80000])
+    # Most students pay in full, the rest part of what they owe after the scholarship
+    owed = max(0, total_fees - scholarship)
+    fees_paid = owed if rng.random() < 0.6 else rng.randrange(0, owed + 1, 5000)
+    return (
+        student_id, f"{rng.choice(FIRST_NAMES[gender])} {rng.choice(LAST_NAMES)}", rng.randrange(18, 27), gender,
+        _skewed(rng, DEPARTMENTS, 0.8), float(total_fees), float(fees_paid), float(scholarship),
+        float(rng.randrange(5000, 20001, 500)),
+    )
+
+
+def _sale(rng, order_id):
+    category = "Sweet" if rng.random() < 0.65 else "Namkeen"
+    item = _skewed(rng, SWEETS[category])
+    quantity = _skewed(rng, QUANTITIES_KG, 0.9)
+    return (
+        order_id, item, category, _day(rng).isoformat(), quantity,
+        int(quantity * SWEET_PRICES[item]), _skewed(rng, PAYMENT_MODES, 0.7),
+    )
+
+
+def _student(rng, row_id):
+    gender = rng.choice(["Female", "Male"])
+    return (
+        rng.choice(FIRST_NAMES[gender]), _skewed(rng, CLASSES, 0.8), rng.choice(SECTIONS),
+        max(0, min(100, int(rng.gauss(68, 16)))),
+    )
+
+
+# Same tables as the seed scripts create
+SCHEMAS = {
+    "badjate": {
+        "table": "Recommendations",
+        "create": (
+            "CREATE TABLE Recommendations (OrderID INTEGER PRIMARY KEY, StockName TEXT, BuyDate TEXT, "
+            "BuyPrice INTEGER, SellDate TEXT, SellPrice INTEGER, Target INTEGER, StopLoss INTEGER, Category TEXT)"
+        ),
+        "row": _recommendation,
+    },
+    "finance": {
+        "table": "FINANCE",
+        "create": (
+            "CREATE TABLE FINANCE (StudentID INTEGER PRIMARY KEY, Name TEXT NOT NULL, Age INTEGER, Gender TEXT, "
+            "Department TEXT, TotalFees REAL, FeesPaid REAL, ScholarshipAmount REAL, MonthlyExpenses REAL)"
+        ),
+        "row": _student_finance,
+    },
+    "bombay": {
+        "table": "SALES",
+        "create": (
+            "CREATE TABLE SALES (OrderID INTEGER PRIMARY KEY, ItemName TEXT, Category TEXT, SaleDate TEXT, "
+            "QuantityInKg REAL, TotalPrice INTEGER, PaymentMode TEXT)"
+        ),
+        "row": _sale,
+    },
+    "student": {
+        "table": "STUDENT",
+        "create": "CREATE TABLE STUDENT(NAME VARCHAR(25), CLASS VARCHAR(25), SECTION VARCHAR(25), MARKS INT)",
+        "row": _student,
+    },
+}
+
+
+## Function To generate one chunk of rows; runs in worker processes, so it only takes plain values
+def generate_chunk(args):
+    dataset, first_id, count, seed = args
+    rng = random.Random(seed * 1000003 + first_id)
+    row = SCHEMAS[dataset]["row"]
+    return [row(rng, row_id) for row_id in range(first_id, first_id + count)]
+
+
+def _chunks(dataset, rows, chunk_rows, seed):
+    for first_id in range(1, rows + 1, chunk_rows):
+        yield dataset, first_id, min(chunk_rows, rows + 1 - first_id), seed
+
+
+## Function To create a database of the given size, returning load statistics
+def build_database(dataset, db_path, rows, workers=1, chunk_rows=DEFAULT_CHUNK_ROWS,
+                   commit_rows=DEFAULT_COMMIT_ROWS, seed=42):
+    if dataset not in SCHEMAS:
+        raise ValueError(f"Unknown dataset '{dataset}', expected one of: {', '.join(SCHEMAS)}")
+    schema = SCHEMAS[dataset]
+    width = len(schema["row"](random.Random(0), 1))
+    insert_sql = f"INSERT INTO {schema['table']} VALUES ({', '.join('?' * width)})"
+
+    # Written next to the target and moved into place, so readers never see a half-loaded file
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    started = time.perf_counter()
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        for pragma in LOAD_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute(schema["create"])
+        chunks = _chunks(dataset, rows, chunk_rows, seed)
+        # imap keeps chunk order (and so the primary keys) while workers generate ahead
+        generated = pool.imap(generate_chunk, chunks) if pool else map(generate_chunk, chunks)
+        loaded = 0
+        conn.execute("BEGIN")
+        for chunk in generated:
+            conn.executemany(insert_sql, chunk)
+            loaded += len(chunk)
+            if loaded % commit_rows < len(chunk):
+                conn.execute("COMMIT")
+                conn.execute("BEGIN")
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        conn.close()
+    os.replace(tmp_path, db_path)
+    elapsed = time.perf_counter() - started
+    return {
+        "dataset": dataset,
+        "rows": loaded,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(loaded / elapsed) if elapsed else 0,
+        "bytes": os.path.getsize(db_path),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and bulk-load synthetic data for one of the schemas")
+    parser.add_argument("dataset", choices=list(SCHEMAS))
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--out", required=True, help="Database file to create (replaced if it exists)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes generating rows")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--commit-rows", type=int, default=DEFAULT_COMMIT_ROWS)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    stats = build_database(
+        args.dataset, args.out, args.rows, args.workers, args.chunk_rows, args.commit_rows, args.seed
+    )
+    print(
+        f"{stats['dataset']}: {stats['rows']} rows in {stats['seconds']}s "
+        f"({stats['rows_per_second']} rows/sec, {stats['bytes'] / 1e6:.1f} MB)"
+    )
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from batch_runner import RateLimiter, process_item, read_items
+
+
+def _acquire_times(limiter, count):
+    async def run():
+        started = time.monotonic()
+        times = []
+        for _ in range(count):
+            await limiter.acquire()
+            times.append(time.monotonic() - started)
+        return times
+    return asyncio.run(run())
+
+
+def test_burst_is_served_at_once_then_the_rate_applies():
+    times = _acquire_times(RateLimiter(20, burst=3), 5)
+    assert times[2] < 0.02
+    # Two more tokens at 20 per second take about 0.1 s
+    assert 0.08 <= times[4] < 0.5
+
+
+def test_no_rate_means_no_waiting():
+    assert _acquire_times(RateLimiter(0), 50)[-1] < 0.05
+
+
+def test_pause_holds_every_acquire():
+    limiter = RateLimiter(0)
+    limiter.pause(0.1)
+    assert _acquire_times(limiter, 1)[0] >= 0.09
+
+
+def test_read_items_fills_in_ids_and_datasets(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    path.write_text(
+        json.dumps({"question": "top 5 gainers", "dataset": "badjate"}) + "\n"
+        + "\n"
+        + json.dumps("average marks") + "\n"
+        + "not json\n"
+        + "42\n"
+        + "[\"a\", \"b\"]\n",
+        encoding="utf-8",
+    )
+    items = list(read_items(str(path), "student"))
+    assert [item["id"] for item in items] == [1, 3, 4, 5, 6]
+    assert [item["dataset"] for item in items] == ["badjate", "student", "student", "student", "student"]
+    assert items[1]["question"] == "average marks"
+    assert items[2]["error"] == "Line 4 is not JSON"
+    assert items[3]["error"] == "Line 5 is not a question or an object"
+    assert items[4]["error"] == "Line 6 is not a question or an object"
+
+
+def test_record_counts_only_the_fetched_rows(monkeypatch):
+    result = SimpleNamespace(columns=["n"], rows=[(i,) for i in range(5)], truncated=True)
+
+    async def run_query_async(sql):
+        return result
+
+    module = SimpleNamespace(
+        cached_sql=lambda question: "SELECT n FROM t", run_query_async=run_query_async,
+        remember_success=lambda question, sql: None,
+    )
+    monkeypatch.setattr("batch_runner.load_pipeline", lambda dataset: module)
+    record = asyncio.run(process_item({"id": 1, "dataset": "test", "question": "all n"}, RateLimiter(0), result_rows=2))
+    assert record["status"] == "ok"
+    assert record["rows"] == [(0,), (1,)]
+    assert record["rows_fetched"] == 5
+    assert record["truncated"]
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+from chat_pipeline import ChatPipeline
+from model_router import FAST, PRO, RETRY
+
+GOOD_SQL = "SELECT Name FROM STUDENT;"
+
+
+class _Router:
+    # Stands in for the model router: the fast tier wrote the failing SQL, pro answers good_sql
+    def __init__(self, good_sql, source=FAST):
+        self.good_sql = good_sql
+        self.source = source
+        self.asked = []
+        self.retries = []
+
+    def source_of(self, sql):
+        return self.source
+
+    def model_name(self, tier):
+        return tier
+
+    def record_retry(self, tier, reason):
+        self.retries.append((tier, reason))
+
+    def ask_tier(self, tier, ask, feedback=None):
+        self.asked.append((tier, feedback))
+        return self.good_sql
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    # Executed SQL would otherwise go to the workload log under sqlllm/.index_advisor/
+    monkeypatch.setattr("chat_pipeline.record_query", lambda *args: None)
+    db_path = str(tmp_path / "student.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE STUDENT (Name TEXT, Marks INTEGER)")
+    conn.execute("INSERT INTO STUDENT VALUES ('Asha', 91)")
+    conn.commit()
+    conn.close()
+    pipeline = ChatPipeline("student")
+    pipeline.db_path = db_path
+    pipeline.TABLE_NAME = "STUDENT"
+    return pipeline
+
+
+def test_sql_that_runs_is_not_escalated(pipeline):
+    pipeline.router = _Router(GOOD_SQL)
+    sql, result = pipeline.run_with_escalation("names", GOOD_SQL)
+    assert sql == GOOD_SQL
+    assert result.rows == [("Asha",)]
+    assert pipeline.router.asked == []
+
+
+def test_fast_tier_sql_that_fails_to_run_is_asked_again_on_pro(pipeline):
+    pipeline.router = _Router(GOOD_SQL)
+    failing = "SELECT Name FROM STUDENT WHERE Marks > (SELECT Name, Marks FROM STUDENT)"
+    sql, result = pipeline.run_with_escalation("names", failing)
+    assert sql == GOOD_SQL
+    assert result.rows == [("Asha",)]
+    assert pipeline.router.asked[0][0] == PRO
+    assert pipeline.router.asked[0][1][0] == failing
+    assert pipeline.router.retries == [(FAST, "execution")]
+
+
+def test_sql_from_the_retry_is_not_asked_again(pipeline):
+    pipeline.router = _Router(GOOD_SQL, source=RETRY)
+    with pytest.raises(sqlite3.Error):
+        pipeline.run_with_escalation("names", "SELECT Name FROM STUDENT WHERE Marks > (SELECT Name, Marks FROM STUDENT)")
+    assert pipeline.router.asked == []
@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+
+from run_timing import HEAVY_MODULES
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after_import(module):
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_pipeline_import_loads_no_heavy_modules():
+    assert _loaded_after_import("pipeline") == []
+
+
+def test_embedding_modules_import_without_numpy():
+    for module in ("semantic_cache", "prompt_assembler", "query_templates"):
+        assert _loaded_after_import(module) == [], module
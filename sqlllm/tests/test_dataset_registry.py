@@ -0,0 +1,65 @@
+import asyncio
+import os
+
+import pytest
+
+import dataset_registry
+import llm_backend
+from chat_pipeline import ChatPipeline
+from dataset_registry import DATA_DIR, DATASETS, db_path_of, get_dataset, load_pipeline
+from llm_backend import StubBackend
+from synthetic_data import build_database
+
+# What callers (badjate pages, chat page, batch runner, benchmarks) use of any pipeline
+PIPELINE_NAMES = [
+    "DATASET_NAME", "db_path", "sql_cache", "cached_sql", "generate_sql", "request_sql_async", "ask_model_async",
+    "run_query", "run_query_async", "run_with_escalation", "remember_success", "clean_response", "model_options",
+]
+
+
+@pytest.fixture(autouse=True)
+def pipelines(monkeypatch):
+    monkeypatch.setattr(dataset_registry, "_pipelines", {})
+    monkeypatch.setattr(llm_backend, "_backend", StubBackend(latency_ms=0))
+    monkeypatch.delenv("LLM_BACKEND_FAST", raising=False)
+    monkeypatch.delenv("LLM_BACKEND_PRO", raising=False)
+
+
+def test_every_dataset_has_a_database_next_to_the_app():
+    for name, dataset in DATASETS.items():
+        assert db_path_of(name) == os.path.join(DATA_DIR, dataset["db_file"])
+        assert os.path.exists(db_path_of(name))
+
+
+def test_unknown_dataset_is_rejected():
+    with pytest.raises(ValueError, match="Unknown dataset 'nope'"):
+        get_dataset("nope")
+    with pytest.raises(ValueError):
+        load_pipeline("nope")
+
+
+def test_chat_datasets_share_one_pipeline_class_and_are_built_once():
+    student = load_pipeline("student")
+    assert isinstance(student, ChatPipeline)
+    assert load_pipeline("student") is student
+    assert load_pipeline("bombay") is not student
+    assert load_pipeline("bombay").TABLE_NAME == "SALES"
+
+
+@pytest.mark.parametrize("name", ["badjate", "student"])
+def test_module_and_chat_pipelines_have_the_same_names(name):
+    pytest.importorskip("dotenv")
+    pipeline = load_pipeline(name)
+    assert [attribute for attribute in PIPELINE_NAMES if not hasattr(pipeline, attribute)] == []
+    assert pipeline.DATASET_NAME == name
+
+
+def test_chat_pipeline_answers_with_the_stub(tmp_path, monkeypatch):
+    monkeypatch.setattr("chat_pipeline.record_query", lambda *args: None)
+    db_path = str(tmp_path / "student.db")
+    build_database("student", db_path, 25, seed=5)
+    pipeline = load_pipeline("student")
+    monkeypatch.setattr(pipeline, "db_path", db_path)
+    sql = asyncio.run(pipeline.request_sql_async("Tell me everything about the students"))
+    assert sql == "SELECT * FROM STUDENT;"
+    assert len(asyncio.run(pipeline.run_query_async(sql)).rows) == 25
@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from db_pool import ConnectionPool, PoolExhausted
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _header(path):
+    with open(path, "rb") as f:
+        return f.read(20)
+
+
+def test_pool_leaves_file_format_alone(db_path):
+    before = _header(db_path)
+    pool = ConnectionPool(db_path, size=2)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    pool.close()
+    assert _header(db_path) == before
+
+
+def test_pool_connections_are_read_only(db_path):
+    pool = ConnectionPool(db_path, size=1)
+    with pool.connection() as conn:
+        with pytest.raises(sqlite3.Error):
+            conn.execute("INSERT INTO t VALUES (2)")
+    pool.close()
+
+
+def test_wal_is_opt_in(db_path):
+    pool = ConnectionPool(db_path, size=1, enable_wal=True)
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    pool.close()
+
+
+def test_wal_failure_is_raised_to_caller(tmp_path):
+    not_a_db = tmp_path / "garbage.db"
+    not_a_db.write_bytes(b"not a database" * 100)
+    with pytest.raises(sqlite3.Error):
+        ConnectionPool(str(not_a_db), size=1, enable_wal=True)
+
+
+def test_exhausted_pool_raises_a_database_error(db_path):
+    pool = ConnectionPool(db_path, size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(sqlite3.OperationalError, match="connection pool exhausted") as error:
+            with pool.connection():
+                pass
+    assert isinstance(error.value, PoolExhausted)
+    # The busy connection went back to the pool
+    with pool.connection() as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+    pool.close()
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+from follow_up import ColumnResolver, SessionResults, plan_local_sql, references_workspace
+from result_pager import PagedResult
+
+COLUMNS = ["StockName", "Category", "BuyPrice", "SellPrice"]
+DERIVED = {"profit": ("Profit", "SellPrice - BuyPrice")}
+TEXT_VALUES = {"StockName": ["TCS", "Infosys"], "Category": ["IT", "Banking"]}
+
+
+@pytest.fixture
+def resolver():
+    return ColumnResolver(COLUMNS, synonyms={"sector": "Category"}, derived=DERIVED, metric="profit")
+
+
+@pytest.mark.parametrize("question, sql", [
+    ("how many of these?", 'SELECT COUNT(*) AS Count FROM "prev_result"'),
+    ("top 2 of these by profit",
+     'SELECT *, (SellPrice - BuyPrice) AS "Profit" FROM "prev_result" ORDER BY (SellPrice - BuyPrice) DESC LIMIT 2'),
+    ("sort these by buy price ascending", 'SELECT * FROM "prev_result" ORDER BY "BuyPrice" ASC'),
+    ("sort them by stock name", 'SELECT * FROM "prev_result" ORDER BY "StockName" ASC'),
+    ("filter these by buy price > 1,000", 'SELECT * FROM "prev_result" WHERE "BuyPrice" > 1000'),
+    ("only IT from these", 'SELECT * FROM "prev_result" WHERE "Category" = \'IT\''),
+    ("average sell price of these", 'SELECT ROUND(AVG("SellPrice"), 2) AS "AverageSellPrice", COUNT(*) AS Count FROM "prev_result"'),
+])
+def test_plain_follow_ups_become_local_sql(resolver, question, sql):
+    assert plan_local_sql(question, resolver, TEXT_VALUES) == sql
+
+
+def test_group_by_adds_the_metric(resolver):
+    sql = plan_local_sql("group these by sector", resolver, TEXT_VALUES)
+    assert sql.startswith('SELECT "Category" AS "Category", COUNT(*) AS Count, SUM((SellPrice - BuyPrice))')
+    assert sql.endswith('GROUP BY "Category" ORDER BY Count DESC')
+
+
+@pytest.mark.parametrize("question", [
+    "why did these go down?",
+    "sort these by market cap",
+    "filter these by category > 3",
+    "only Energy from these",
+])
+def test_anything_else_goes_to_the_model(resolver, question):
+    assert plan_local_sql(question, resolver, TEXT_VALUES) is None
+
+
+def test_references_workspace():
+    assert references_workspace("SELECT * FROM prev_result_2")
+    assert not references_workspace("SELECT * FROM Recommendations")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "follow_up.db")
+    sqlite3.connect(path).close()
+    return path
+
+
+def _result(rows, truncated=False):
+    return PagedResult("unused.db", "SELECT 1", COLUMNS, rows, truncated)
+
+
+def test_session_keeps_the_latest_answers_as_views(db_path):
+    session = SessionResults(db_path, max_results=2, derived=DERIVED)
+    session.materialize("first", _result([("TCS", "IT", 100, 120)]))
+    session.materialize("second", _result([("SBI", "Banking", 500, 450), ("TCS", "IT", 100, 120)]))
+    session.materialize("third", _result([("Infosys", "IT", 80, 95)]))
+    assert len(session) == 2
+    with session.connection() as conn:
+        assert conn.execute("SELECT StockName FROM prev_result").fetchall() == [("Infosys",)]
+        assert conn.execute("SELECT COUNT(*) FROM prev_result_2").fetchone() == (2,)
+    result = session.run(session.local_sql("top 1 of these by profit"))
+    assert result.rows[0][0] == "Infosys"
+    session.close()
+
+
+def test_truncated_answers_are_left_to_the_model(db_path):
+    session = SessionResults(db_path)
+    session.materialize("first", _result([("TCS", "IT", 100, 120)], truncated=True))
+    assert session.local_sql("how many of these") is None
+    session.close()
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+pytest.importorskip("dotenv")
+
+from format_benchmark import format_cells, measure, result_frame
+
+
+def test_result_frame_is_numeric():
+    df = result_frame(500)
+    assert len(df) == 500
+    assert df["Profit"].dtype.kind == "i"
+    assert df["ReturnRate"].dtype.kind == "f"
+
+
+def test_per_cell_formatting_turns_money_into_text():
+    df = format_cells(result_frame(50))
+    assert df["BuyPrice"].map(type).eq(str).all()
+    assert df["BuyPrice"].iloc[0].startswith("₹")
+    assert df["ReturnRate"].iloc[0].endswith("%")
+    # OrderID is left alone
+    assert df["OrderID"].dtype.kind == "i"
+
+
+def test_only_render_time_formats_sort_by_value():
+    df = result_frame(2000)
+    cells = measure(df, "cells")
+    render_time = measure(df, "render-time")
+    assert not cells["sorts_by_value"]
+    assert render_time["sorts_by_value"]
+    assert render_time["rows"] == cells["rows"] == 2000
+    assert render_time["memory_mb"] < cells["memory_mb"]
+    # The frame passed in is not changed by either approach
+    assert df["Profit"].dtype.kind == "i"
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from history_store import ResultStore, StoredResult, trim_history
+from result_pager import run_paged_query
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "history.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (n INTEGER, label TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(n, f"row {n}" * 20) for n in range(500)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _rows(count, width=200):
+    return [(n, "x" * width) for n in range(count)]
+
+
+def test_results_over_the_session_budget_are_spilled_and_read_back(tmp_path):
+    store = ResultStore(session_budget_mb=0.05, global_budget_mb=10, spill_dir=str(tmp_path))
+    first = store.put("s1", _rows(200))
+    store.put("s1", _rows(200))
+    assert store.stats()["on_disk"] == 1
+    assert store.get(first) == _rows(200)
+    assert store.stats()["loads"] == 1
+    store.close()
+
+
+def test_scratch_budget_drops_the_oldest_spills(tmp_path):
+    store = ResultStore(session_budget_mb=0.01, global_budget_mb=10, spill_dir=str(tmp_path), spill_budget_mb=0.2)
+    keys = [store.put("s1", _rows(300)) for _ in range(20)]
+    stats = store.stats()
+    assert stats["evicted"] > 0
+    assert store._scratch_bytes() <= store.spill_budget
+    assert store.get(keys[0]) is None
+    store.close()
+
+
+def test_dropped_rows_are_paged_from_the_database(tmp_path, db_path):
+    store = ResultStore(session_budget_mb=0, global_budget_mb=0, spill_dir=str(tmp_path), spill_budget_mb=0)
+    result = run_paged_query(db_path, "SELECT n FROM t ORDER BY n", max_rows=500, page_size=100)
+    stored = StoredResult("s1", result, preview_rows=100, store=store)
+    # The next answer pushes this one out of memory, and the scratch budget drops it
+    store.put("s1", _rows(10))
+    assert store.get(stored.key) is None
+    assert stored.page(1) == [(n,) for n in range(100)]
+    assert stored.page(3) == [(n,) for n in range(200, 300)]
+    assert stored.page(6) == []
+    store.close()
+
+
+def test_release_session_frees_memory_and_disk(tmp_path):
+    store = ResultStore(session_budget_mb=0.05, global_budget_mb=10, spill_dir=str(tmp_path))
+    store.put("s1", _rows(200))
+    store.put("s1", _rows(200))
+    store.put("s2", _rows(10))
+    store.release_session("s1")
+    stats = store.stats()
+    assert stats["in_memory"] == 1
+    assert stats["on_disk"] == 0
+    store.close()
+
+
+def test_trim_history_releases_stored_results(tmp_path, db_path):
+    store = ResultStore(spill_dir=str(tmp_path))
+    result = run_paged_query(db_path, "SELECT n FROM t", max_rows=10)
+    history = [{"result": StoredResult("s1", result, store=store)} for _ in range(3)]
+    trim_history(history, max_entries=1)
+    assert len(history) == 1
+    assert store.stats()["in_memory"] == 1
+    store.close()
@@ -0,0 +1,53 @@
+import json
+import sqlite3
+
+from index_advisor import WorkloadLog, analyze_sql, candidate_indexes, load_schema
+
+QUERY = "SELECT StockName FROM R WHERE Category = 'IT' ORDER BY BuyPrice DESC"
+
+
+def test_record_does_not_touch_disk_until_flush(tmp_path):
+    log = WorkloadLog(str(tmp_path), flush_seconds=0)
+    for _ in range(3):
+        log.record("badjate", "badjate.db", QUERY, 0.002)
+    assert not (tmp_path / "badjate.jsonl").exists()
+    log.flush()
+    entries = log.load("badjate")
+    assert len(entries) == 1
+    assert entries[0]["count"] == 3
+    assert entries[0]["ms"] == 2.0
+
+
+def test_flush_merges_with_the_log_on_disk(tmp_path):
+    log = WorkloadLog(str(tmp_path), flush_seconds=0)
+    log.record("badjate", "badjate.db", QUERY, 0.001)
+    log.flush()
+    log.record("badjate", "badjate.db", QUERY + " ", 0.003)
+    log.flush()
+    (entry,) = log.load("badjate")
+    assert entry["count"] == 2
+    assert entry["ms"] == 2.0
+
+
+def test_log_keeps_the_most_recent_statements(tmp_path):
+    log = WorkloadLog(str(tmp_path), max_queries=2, flush_seconds=0)
+    for number in range(4):
+        log.record("badjate", "badjate.db", f"SELECT {number}", 0.001)
+        log.flush()
+    lines = (tmp_path / "badjate.jsonl").read_text().splitlines()
+    assert [json.loads(line)["sql"] for line in lines] == ["SELECT 2", "SELECT 3"]
+
+
+def test_pending_statements_are_capped(tmp_path):
+    log = WorkloadLog(str(tmp_path), max_queries=2, flush_seconds=0)
+    for number in range(5):
+        log.record("badjate", "badjate.db", f"SELECT {number}", 0.001)
+    assert log.dropped == 3
+
+
+def test_candidate_indexes_follow_filter_then_order():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE R (StockName TEXT, Category TEXT, BuyPrice REAL, SellPrice REAL)")
+    candidates = candidate_indexes(analyze_sql(QUERY, load_schema(conn)))
+    assert ("R", ('"Category"',)) in candidates
+    assert ("R", ('"Category"', '"BuyPrice"')) in candidates
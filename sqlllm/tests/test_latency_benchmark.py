@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("dotenv")
+
+import latency_benchmark
+from latency_benchmark import STAGES, _percentile, benchmark_dataset, summarize, synthetic_db
+from llm_backend import StubBackend
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert _percentile(values, 50) == 50
+    assert _percentile(values, 95) == 95
+    assert _percentile(values, 99) == 99
+    assert _percentile([7.0], 95) == 7.0
+
+
+def test_summary_has_one_row_per_measured_stage():
+    samples = {"llm": [1.0, 2.0, 3.0], "execute": [10.0]}
+    summary = summarize("badjate", 1000, samples, ["slow question"])
+    assert [row["stage"] for row in summary] == ["llm", "execute", "aborted"]
+    assert summary[0]["samples"] == 3
+    assert summary[0]["p50_ms"] == 2.0
+    assert summary[-1]["questions"] == ["slow question"]
+
+
+def test_synthetic_database_is_built_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(latency_benchmark, "BENCHMARK_DIR", str(tmp_path))
+    path = synthetic_db("badjate", 200)
+    assert os.path.dirname(path) == str(tmp_path)
+    built = os.stat(path).st_mtime_ns
+    assert synthetic_db("badjate", 200) == path
+    assert os.stat(path).st_mtime_ns == built
+
+
+def test_every_stage_is_timed_against_the_stub(tmp_path, monkeypatch):
+    monkeypatch.setattr(latency_benchmark, "BENCHMARK_DIR", str(tmp_path))
+    samples, aborted = benchmark_dataset("badjate", synthetic_db("badjate", 500), StubBackend(latency_ms=0), runs=1)
+    assert aborted == []
+    assert set(samples) == set(STAGES)
+    assert len(samples["prompt"]) == len(latency_benchmark._questions("badjate"))
+    assert all(value >= 0 for values in samples.values() for value in values)
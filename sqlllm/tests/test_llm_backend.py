@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+from llm_backend import StubBackend, create_backend, is_rate_limit_error
+
+
+@pytest.fixture
+def stub(tmp_path):
+    path = tmp_path / "fixtures.json"
+    path.write_text(json.dumps({
+        "badjate": {
+            "default": "SELECT * FROM Recommendations LIMIT 10;",
+            "questions": {"Show me top 5 gainers": "SELECT StockName FROM Recommendations LIMIT 5;"},
+        },
+    }), encoding="utf-8")
+    return StubBackend(str(path), latency_ms=0)
+
+
+def test_stub_answers_from_the_fixture(stub):
+    assert stub.generate(["prompt"], question="show me TOP five gainers", dataset="badjate") == \
+        "SELECT StockName FROM Recommendations LIMIT 5;"
+    assert stub.generate(["prompt"], question="anything else", dataset="badjate") == \
+        "SELECT * FROM Recommendations LIMIT 10;"
+    assert stub.generate(["prompt"], question="anything", dataset="unknown") == "SELECT 1;"
+
+
+def test_stub_streams_the_same_answer(stub):
+    answer = stub.generate(["prompt"], question="Show me top 5 gainers", dataset="badjate")
+    assert "".join(stub.generate(["prompt"], question="Show me top 5 gainers", dataset="badjate", stream=True)) == answer
+
+    async def collect():
+        chunks = await stub.generate_async(["prompt"], question="Show me top 5 gainers", dataset="badjate", stream=True)
+        return "".join([chunk async for chunk in chunks])
+    assert asyncio.run(collect()) == answer
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown LLM backend"):
+        create_backend("nope")
+
+
+def test_rate_limit_errors_are_recognised():
+    assert is_rate_limit_error(RuntimeError("429 Resource has been exhausted"))
+    assert is_rate_limit_error(RuntimeError("Quota exceeded"))
+    assert not is_rate_limit_error(ValueError("bad request"))
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from model_router import FAST, PRO, RETRY, ModelRouter, complexity_score
+
+
+def _router():
+    return ModelRouter("test", "pro-model", fast_model="fast-model", fast_max_score=2, tables=["Recommendations"])
+
+
+def test_simple_questions_go_to_the_fast_tier():
+    router = _router()
+    assert router.route("How many records are there?") == FAST
+    assert router.route("Show stocks with buy price above 100") == FAST
+
+
+@pytest.mark.parametrize("question, history", [
+    ("average profit per sector", None),
+    ("stocks held longer than 30 days", None),
+    ("which of these are above the average return", [("user", "top gainers")]),
+])
+def test_hard_questions_go_to_pro(question, history):
+    assert _router().route(question, history) == PRO
+
+
+def test_follow_up_words_only_count_with_history():
+    assert "follow_up" not in complexity_score("show these")[1]
+    assert "follow_up" in complexity_score("show these", [("user", "top gainers")])[1]
+
+
+def test_invalid_fast_answer_is_asked_again_on_pro_with_the_error():
+    router = _router()
+    calls = []
+
+    def ask(tier, feedback=None):
+        calls.append((tier, feedback))
+        return "SELECT bad" if tier == FAST else "SELECT 1"
+
+    sql = router.generate("how many records", None, ask, validate=lambda sql: "no such column" if "bad" in sql else None)
+    assert sql == "SELECT 1"
+    assert calls == [(FAST, None), (PRO, ("SELECT bad", "no such column"))]
+    assert router.source_of("SELECT 1") == RETRY
+    assert router.stats()["escalation_rate"] > 0
+
+
+def test_valid_fast_answer_is_kept():
+    router = _router()
+    sql = router.generate("how many records", None, lambda tier, feedback=None: "SELECT COUNT(*) FROM t",
+                          validate=lambda sql: None)
+    assert sql == "SELECT COUNT(*) FROM t"
+    assert router.source_of(sql) == FAST
+
+
+def test_answer_that_is_not_sql_is_asked_again_on_pro():
+    router = _router()
+
+    def ask(tier, feedback=None):
+        if tier == FAST:
+            raise ValueError("Generated query is not a valid SELECT statement")
+        return "SELECT 1"
+
+    assert router.generate("how many records", None, ask) == "SELECT 1"
+    assert router.source_of("SELECT 1") == RETRY
+
+
+def test_failed_model_call_is_not_escalated():
+    router = _router()
+    calls = []
+
+    def ask(tier, feedback=None):
+        calls.append(tier)
+        raise ConnectionError("connection reset by peer")
+
+    async def ask_async(tier, feedback=None):
+        return ask(tier, feedback)
+
+    with pytest.raises(ConnectionError):
+        router.generate("how many records", None, ask)
+    with pytest.raises(ConnectionError):
+        asyncio.run(router.generate_async("how many records", None, ask_async))
+    assert calls == [FAST, FAST]
+    assert router.stats()["escalations"] == {"invalid": 0, "execution": 0}
@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+import pipeline
+from pipeline import portfolio_stats
+
+
+def _write(db_path, statement, rows=()):
+    conn = sqlite3.connect(db_path)
+    if rows:
+        conn.executemany(statement, rows)
+    else:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "badjate.db")
+    _write(path, "CREATE TABLE Recommendations (StockName TEXT, BuyPrice INTEGER, SellPrice INTEGER, Category TEXT)")
+    _write(path, "INSERT INTO Recommendations VALUES (?, ?, ?, ?)", [
+        ("TCS", 100, 130, "IT"),
+        ("INFY", 100, 90, "IT"),
+        ("HDFC", 200, 260, "Banking"),
+        ("MYSTERY", 50, 40, None),
+    ])
+    monkeypatch.setattr(pipeline, "db_path", path)
+    return path
+
+
+def test_portfolio_stats_in_one_pass(db_path):
+    stats = portfolio_stats()
+    assert stats["total_trades"] == 4
+    assert stats["profitable_trades"] == 2
+    assert stats["total_pnl"] == 30 - 10 + 60 - 10
+    assert stats["win_rate"] == 50
+    assert stats["categories"] == [None, "Banking", "IT"]
+    assert stats["category_counts"] == [("IT", 2), (None, 1), ("Banking", 1)]
+
+
+def test_portfolio_stats_are_shared_until_the_data_changes(db_path):
+    first = portfolio_stats()
+    assert portfolio_stats() is first
+    _write(db_path, "INSERT INTO Recommendations VALUES ('WIPRO', 100, 150, 'IT')")
+    second = portfolio_stats()
+    assert second is not first
+    assert second["total_trades"] == 5
+    assert second["category_counts"][0] == ("IT", 3)
+
+
+def test_display_formats_leave_values_numeric():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({
+        "OrderID": [1], "StockName": ["TCS"], "BuyPrice": [100], "Profit": [12.5], "WinRate": [50.0], "Count": [3],
+    })
+    assert pipeline.display_formats(df) == {"BuyPrice": "₹%,d", "Profit": "₹%,.2f", "WinRate": "%.2f%%"}
+    assert df["BuyPrice"].dtype.kind == "i"
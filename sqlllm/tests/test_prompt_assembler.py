@@ -0,0 +1,49 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from prompt_assembler import PromptAssembler
+
+PROMPT = '''
+You write SQLite for the Recommendations table.
+
+INSTRUCTIONS:
+- Return only SQL.
+
+EXAMPLES:
+1. "Show me top 5 gainers" → SELECT * FROM Recommendations ORDER BY SellPrice - BuyPrice DESC LIMIT 5;
+2. "Average buy price per sector" → SELECT Category, AVG(BuyPrice) FROM Recommendations GROUP BY Category;
+3. "Stocks that hit their target" → SELECT * FROM Recommendations WHERE SellPrice >= Target;
+
+CATEGORY RULES:
+- "tech stocks" → Category = 'IT'
+- "bank stocks" → Category = 'Banking'
+
+CONTEXT-AWARE FOLLOW-UP HANDLING:
+- "these" → the previous result
+'''
+
+
+@pytest.fixture
+def assembler():
+    return PromptAssembler(PROMPT, examples=1, rules=1)
+
+
+def test_only_the_closest_example_and_rule_are_sent(assembler):
+    prompt = assembler.assemble("top 3 gainers among tech stocks")
+    assert "Show me top 5 gainers" in prompt
+    assert "Average buy price" not in prompt
+    assert "Category = 'IT'" in prompt
+    assert "Category = 'Banking'" not in prompt
+    # Kept sections are sent whatever the question
+    assert "- Return only SQL." in prompt
+    assert prompt.startswith("You write SQLite")
+
+
+def test_follow_up_rules_are_sent_only_for_follow_ups(assembler):
+    assert "the previous result" not in assembler.assemble("top 5 gainers")
+    assert "the previous result" in assembler.assemble("sort these by profit", follow_up=True)
+
+
+def test_full_mode_sends_the_static_prompt(assembler):
+    assert assembler.build("anything", mode="full") == PROMPT
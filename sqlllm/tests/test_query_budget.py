@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+
+from query_budget import QueryBudget, QueryBudgetExceeded, aborted_query_counts, enforce_budget
+
+RUNAWAY = "WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+def test_step_budget_stops_a_runaway_query():
+    conn = sqlite3.connect(":memory:")
+    before = aborted_query_counts("test-steps")["steps"]
+    with pytest.raises(QueryBudgetExceeded, match="steps"):
+        with enforce_budget(conn, QueryBudget("test-steps", max_seconds=60, max_steps=100000)):
+            conn.execute(RUNAWAY).fetchone()
+    assert aborted_query_counts("test-steps")["steps"] == before + 1
+
+
+def test_time_budget_stops_a_runaway_query():
+    conn = sqlite3.connect(":memory:")
+    with pytest.raises(QueryBudgetExceeded, match="longer than"):
+        with enforce_budget(conn, QueryBudget("test-time", max_seconds=0.05, max_steps=10 ** 12)):
+            conn.execute(RUNAWAY).fetchone()
+
+
+def test_queries_within_budget_run_and_the_handler_is_removed():
+    conn = sqlite3.connect(":memory:")
+    with enforce_budget(conn, QueryBudget(max_seconds=5, max_steps=10 ** 9)):
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    # Outside the block the same query runs unbudgeted
+    assert conn.execute("WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c WHERE n < 100000) "
+                        "SELECT COUNT(*) FROM c").fetchone() == (100000,)
+
+
+def test_other_errors_are_not_budget_errors():
+    conn = sqlite3.connect(":memory:")
+    with pytest.raises(sqlite3.OperationalError) as raised:
+        with enforce_budget(conn):
+            conn.execute("SELECT * FROM missing")
+    assert not isinstance(raised.value, QueryBudgetExceeded)
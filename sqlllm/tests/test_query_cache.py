@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+import query_cache
+from query_cache import QueryCache, db_version, normalize_question, schema_hash
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (n INTEGER)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _write(db_path, statement):
+    conn = sqlite3.connect(db_path)
+    conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def test_trivial_variations_share_a_key():
+    assert normalize_question("Show me the TOP five gainers!") == normalize_question("show me the top 5 gainers")
+    assert normalize_question("returns > 2.5%") == "returns > 2.5%"
+
+
+def test_hit_after_put(db_path):
+    cache = QueryCache()
+    cache.put("badjate", db_path, "top 5 gainers", "SELECT 1")
+    assert cache.get("badjate", db_path, "Top five gainers?") == "SELECT 1"
+    assert cache.stats()["hits"] == 1
+
+
+def test_data_change_invalidates_the_dataset(db_path):
+    cache = QueryCache()
+    cache.put("badjate", db_path, "top 5 gainers", "SELECT 1")
+    before = db_version(db_path)
+    _write(db_path, "INSERT INTO t VALUES (1)")
+    assert db_version(db_path) != before
+    assert cache.get("badjate", db_path, "top 5 gainers") is None
+
+
+def test_schema_change_invalidates_the_dataset(db_path):
+    cache = QueryCache()
+    cache.put("badjate", db_path, "top 5 gainers", "SELECT 1")
+    _write(db_path, "ALTER TABLE t ADD COLUMN label TEXT")
+    assert cache.get("badjate", db_path, "top 5 gainers") is None
+
+
+def test_entries_expire_and_are_bounded(db_path):
+    cache = QueryCache(max_entries=2, ttl_seconds=-1)
+    cache.put("badjate", db_path, "a", "SELECT 1")
+    assert cache.get("badjate", db_path, "a") is None
+    cache = QueryCache(max_entries=2)
+    for question in ("a", "b", "c"):
+        cache.put("badjate", db_path, question, "SELECT 1")
+    assert cache.get("badjate", db_path, "a") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_missing_database_bypasses_the_cache(tmp_path):
+    cache = QueryCache()
+    missing = str(tmp_path / "missing.db")
+    cache.put("badjate", missing, "a", "SELECT 1")
+    assert cache.get("badjate", missing, "a") is None
+
+
+def test_schema_hash_follows_tables_not_indexes_and_keeps_one_entry(db_path):
+    first = schema_hash(db_path)
+    _write(db_path, "CREATE INDEX t_n ON t (n)")
+    assert schema_hash(db_path) == first
+    _write(db_path, "CREATE TABLE u (m INTEGER)")
+    second = schema_hash(db_path)
+    assert second != first
+    for number in range(5):
+        _write(db_path, f"CREATE TABLE v{number} (m INTEGER)")
+        schema_hash(db_path)
+    # Only the current schema's hash is held for the database
+    watcher = query_cache._watchers[db_path]
+    assert watcher["schema"][0] == db_version(db_path)[:2]
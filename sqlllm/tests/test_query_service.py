@@ -0,0 +1,138 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+import llm_backend
+import pipeline
+from llm_backend import StubBackend
+from query_service import QueryService, RequestError
+from result_pager import PagedResult
+
+ALL_STOCKS = "SELECT StockName FROM Recommendations ORDER BY OrderID;"
+
+
+class _NoSimilarQuestions:
+    def lookup(self, question, db_path):
+        return None
+
+    def add(self, question, sql, db_path):
+        pass
+
+
+class _Unreachable:
+    async def generate_async(self, contents, **options):
+        raise ConnectionError("connection reset by peer")
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "badjate.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE Recommendations (OrderID INTEGER PRIMARY KEY, StockName TEXT, BuyDate TEXT, BuyPrice INTEGER,"
+        " SellDate TEXT, SellPrice INTEGER, Target INTEGER, StopLoss INTEGER, Category TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO Recommendations VALUES (?, ?, '2024-01-01', 100, '2024-02-01', 110, 120, 90, 'IT')",
+        [(i, f"STOCK{i}") for i in range(1, 1201)],
+    )
+    conn.commit()
+    conn.close()
+
+    fixture = tmp_path / "fixtures.json"
+    fixture.write_text(json.dumps({"badjate": {
+        "default": "I can only answer questions about the portfolio.",
+        "questions": {"List every stock": ALL_STOCKS},
+    }}), encoding="utf-8")
+    monkeypatch.delenv("LLM_BACKEND_FAST", raising=False)
+    monkeypatch.delenv("LLM_BACKEND_PRO", raising=False)
+    monkeypatch.setattr(llm_backend, "_backend", StubBackend(str(fixture), latency_ms=0))
+    monkeypatch.setattr(pipeline, "db_path", db_path)
+    monkeypatch.setattr(pipeline, "get_semantic_index", lambda dataset: _NoSimilarQuestions())
+    monkeypatch.setattr(pipeline, "record_query", lambda *args: None)
+    return QueryService(max_concurrency=2, max_pending=4)
+
+
+def _post(service, payload):
+    async def run():
+        try:
+            return await service.route("POST", "/query", json.dumps(payload).encode("utf-8"))
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+    return asyncio.run(run())
+
+
+def test_question_is_answered_one_page_at_a_time(service):
+    status, answer = _post(service, {"question": "List every stock", "page": 2, "page_size": 10})
+    assert status == 200
+    assert answer["sql"] == ALL_STOCKS
+    assert answer["rows"] == [(f"STOCK{i}",) for i in range(11, 21)]
+    assert answer["truncated"]
+
+
+def test_pages_past_the_fetched_rows_come_from_the_database(service):
+    status, answer = _post(service, {"question": "List every stock", "page": 3, "page_size": 500})
+    assert status == 200
+    assert answer["rows"] == [(f"STOCK{i}",) for i in range(1001, 1201)]
+
+
+def test_shared_result_keeps_its_page_size(service, monkeypatch):
+    shared = PagedResult(pipeline.db_path, ALL_STOCKS, ["StockName"], [(f"STOCK{i}",) for i in range(1, 51)], False)
+    monkeypatch.setattr(pipeline, "warm_result", lambda dataset, db_path, sql: shared)
+    status, answer = _post(service, {"question": "List every stock", "page": 2, "page_size": 7})
+    assert status == 200
+    assert answer["rows"] == [(f"STOCK{i}",) for i in range(8, 15)]
+    assert shared.page_size == 100
+
+
+@pytest.mark.parametrize("payload, message", [
+    ({}, "question is required"),
+    ({"question": "List every stock", "page": 0}, "page must be"),
+    ({"question": "List every stock", "page_size": 5000}, "page must be"),
+    ({"question": "List every stock", "chat_history": "nope"}, "chat_history must be a list"),
+    ([1, 2], "Body must be a JSON object"),
+])
+def test_bad_requests_are_rejected(service, payload, message):
+    status, answer = _post(service, payload)
+    assert status == 400
+    assert message in answer["error"]
+
+
+def test_body_must_be_json(service):
+    with pytest.raises(RequestError) as error:
+        asyncio.run(service.route("POST", "/query", b"not json"))
+    assert error.value.status == 400
+
+
+def test_answer_that_is_not_sql_is_unprocessable(service):
+    status, answer = _post(service, {"question": "Who won the cricket match"})
+    assert status == 422
+    assert "Could not turn the question into SQL" in answer["error"]
+
+
+def test_unreachable_model_is_unavailable_not_fallback_sql(service, monkeypatch):
+    monkeypatch.setattr(llm_backend, "_backend", _Unreachable())
+    status, answer = _post(service, {"question": "List every stock"})
+    assert status == 503
+    assert "sql" not in answer
+
+
+def test_load_is_shed_beyond_max_pending(service):
+    service.pending = service.max_pending
+    status, answer = _post(service, {"question": "List every stock"})
+    assert status == 503
+    assert service.rejected == 1
+
+
+def test_health_and_unknown_routes(service):
+    assert asyncio.run(service.route("GET", "/health", b"")) == (200, {"status": "ok"})
+    with pytest.raises(RequestError) as error:
+        asyncio.run(service.route("GET", "/nowhere", b""))
+    assert error.value.status == 404
+    with pytest.raises(RequestError) as error:
+        asyncio.run(service.route("GET", "/query", b""))
+    assert error.value.status == 405
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from query_templates import BADJATE_TEMPLATES, QueryTemplate, TemplateRegistry
+
+
+@pytest.fixture
+def registry():
+    return TemplateRegistry(BADJATE_TEMPLATES, {"category": ["IT", "Banking", "Oil & Gas", "Oil"]})
+
+
+def test_sample_question_matches_its_template(registry):
+    name, sql = registry.match("Show me top 5 gainers")
+    assert name == "top_gainers"
+    assert sql.endswith("LIMIT 5")
+
+
+def test_variants_fill_the_slots(registry):
+    name, sql = registry.match("show me the top 3 gainers")
+    assert name == "top_gainers"
+    assert sql.endswith("LIMIT 3")
+    name, sql = registry.match("Which Banking stocks made profit?")
+    assert name == "category_profit"
+    assert "Category = 'Banking'" in sql
+
+
+def test_longest_slot_value_wins(registry):
+    text, values = registry.extract("profitable oil & gas stocks")
+    assert values == {"category": "Oil & Gas"}
+
+
+@pytest.mark.parametrize("question", [
+    "Which Energy stocks made profit?",
+    "Which stocks did not hit their targets?",
+    "show me top 0 gainers",
+    "how many trades were made on Fridays in March",
+])
+def test_questions_outside_the_templates_do_not_match(registry, question):
+    assert registry.match(question) is None
+
+
+def test_render_quotes_text_and_rejects_bad_numbers():
+    template = QueryTemplate("t", ["{category} top {n}"], "SELECT * FROM R WHERE Category = {category} LIMIT {n}")
+    assert template.render({"category": "Dr. Reddy's", "n": 2}) == "SELECT * FROM R WHERE Category = 'Dr. Reddy''s' LIMIT 2"
+    assert template.render({"category": "IT", "n": 0}) is None
+    assert template.render({"n": 2}) is None
+
+
+def test_sample_queries_cover_every_slot_value(registry):
+    labels = [label for label, _ in registry.sample_queries()]
+    assert "top_gainers" in labels
+    assert "category_profit: Oil & Gas" in labels
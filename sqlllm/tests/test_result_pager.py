@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from result_pager import fetch_bounded, run_paged_query
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pager.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (n INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(n,) for n in range(250)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_fetch_bounded_stops_at_max_rows():
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.execute("WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c) SELECT n FROM c")
+    rows, truncated = fetch_bounded(cursor, max_rows=10, chunk_size=3)
+    assert len(rows) == 10
+    assert truncated
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT n FROM t ORDER BY n",
+    "SELECT n FROM t ORDER BY n;",
+    "SELECT n FROM t ORDER BY n -- every row",
+    "SELECT n FROM t ORDER BY n; -- every row",
+    "SELECT n FROM t /* all */ ORDER BY n /* ordered */",
+])
+def test_truncated_answers_are_counted_and_paged(db_path, sql):
+    result = run_paged_query(db_path, sql, max_rows=100, page_size=50)
+    assert result.truncated
+    assert result.total_rows == 250
+    assert result.page_count == 5
+    assert result.page(4) == [(n,) for n in range(150, 200)]
+
+
+def test_complete_answers_are_paged_from_memory(db_path):
+    result = run_paged_query(db_path, "SELECT n FROM t WHERE n < 60", max_rows=100, page_size=50)
+    assert not result.truncated
+    assert result.total_rows == 60
+    assert result.page(2) == [(n,) for n in range(50, 60)]
@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+from schema_catalog import get_schema_catalog, schema_prompt
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Sectors (Name TEXT PRIMARY KEY)")
+    conn.execute(
+        "CREATE TABLE Recommendations (ID INTEGER PRIMARY KEY, StockName TEXT NOT NULL, "
+        "Category TEXT REFERENCES Sectors(Name), BuyPrice REAL)"
+    )
+    conn.execute("CREATE VIEW Profitable AS SELECT StockName FROM Recommendations")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_prompt_lists_tables_views_and_keys(db_path):
+    prompt = schema_prompt(db_path)
+    assert "Recommendations(ID INTEGER PK, StockName TEXT NOT NULL, Category TEXT, BuyPrice REAL, FK Category→Sectors.Name)" in prompt
+    assert "VIEW Profitable(StockName TEXT)" in prompt
+
+
+def test_notes_on_missing_columns_are_dropped(db_path):
+    prompt = schema_prompt(db_path, {"BuyPrice": "in rupees", "MarketCap": "in crores"})
+    assert "- BuyPrice: in rupees" in prompt
+    assert "MarketCap" not in prompt
+
+
+def test_catalog_is_rebuilt_only_on_schema_change(db_path):
+    catalog = get_schema_catalog(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO Sectors VALUES ('IT')")
+    conn.commit()
+    assert get_schema_catalog(db_path) is catalog
+    conn.execute("ALTER TABLE Sectors ADD COLUMN Weight REAL")
+    conn.commit()
+    conn.close()
+    assert get_schema_catalog(db_path).table("sectors").column("weight") is not None
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+
+import pytest
+
+pytest.importorskip("faiss")
+
+from semantic_cache import SemanticIndex, is_compatible
+
+SQL = "SELECT StockName FROM Recommendations ORDER BY SellPrice - BuyPrice DESC LIMIT 5"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "semantic.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Recommendations (StockName TEXT, BuyPrice REAL, SellPrice REAL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_near_duplicate_question_reuses_sql(tmp_path, db_path):
+    index = SemanticIndex("badjate", cache_dir=str(tmp_path / "cache"))
+    index.add("Show me the top 5 gainers", SQL, db_path)
+    assert index.lookup("top 5 gainers please", db_path) == SQL
+    assert index.lookup("top 3 gainers", db_path) is None
+
+
+def test_compatibility_guards_numbers_negations_and_literals():
+    assert not is_compatible("top 3 stocks", "top 5 stocks", SQL)
+    assert not is_compatible("stocks that did not hit target", "stocks that hit target", SQL)
+    assert not is_compatible("Energy stocks", "IT stocks", "SELECT * FROM R WHERE Category = 'IT'")
+    assert is_compatible("best IT stocks", "top IT stocks", "SELECT * FROM R WHERE Category = 'IT'")
+
+
+def test_answers_are_saved_in_batches(tmp_path, db_path, monkeypatch):
+    monkeypatch.setattr("semantic_cache.SEMANTIC_SAVE_EVERY", 3)
+    cache_dir = str(tmp_path / "cache")
+    index = SemanticIndex("badjate", cache_dir=cache_dir)
+    index.add("top 5 gainers", SQL, db_path)
+    index.add("worst 5 losers", SQL.replace("DESC", "ASC"), db_path)
+    assert not os.path.exists(index.entries_path)
+    index.add("average buy price", "SELECT AVG(BuyPrice) FROM Recommendations", db_path)
+    assert os.path.exists(index.entries_path)
+    assert SemanticIndex("badjate", cache_dir=cache_dir).stats()["entries"] == 3
+
+
+def test_flush_writes_unsaved_answers(tmp_path, db_path):
+    cache_dir = str(tmp_path / "cache")
+    index = SemanticIndex("badjate", cache_dir=cache_dir)
+    index.add("top 5 gainers", SQL, db_path)
+    index.add("top 5 gainers", SQL + " -- changed", db_path)
+    assert index.stats()["entries"] == 1
+    index.flush()
+    reloaded = SemanticIndex("badjate", cache_dir=cache_dir)
+    assert reloaded.lookup("top 5 gainers", db_path) == SQL + " -- changed"
+
+
+def test_least_recently_used_answers_are_evicted(tmp_path, db_path):
+    cache_dir = str(tmp_path / "cache")
+    index = SemanticIndex("badjate", cache_dir=cache_dir, max_entries=3)
+    index.add("top 5 gainers", SQL, db_path)
+    index.add("average buy price", "SELECT AVG(BuyPrice) FROM Recommendations", db_path)
+    index.add("count of trades", "SELECT COUNT(*) FROM Recommendations", db_path)
+    assert index.lookup("top 5 gainers", db_path) == SQL
+    index.add("sum of sell price", "SELECT SUM(SellPrice) FROM Recommendations", db_path)
+    assert index.stats()["entries"] == 2
+    assert index.stats()["evicted"] == 2
+    assert index.lookup("top 5 gainers", db_path) == SQL
+    assert index.lookup("sum of sell price", db_path) == "SELECT SUM(SellPrice) FROM Recommendations"
+    assert index.lookup("average buy price", db_path) is None
+    index.flush()
+    reloaded = SemanticIndex("badjate", cache_dir=cache_dir)
+    assert reloaded.index.ntotal == reloaded.stats()["entries"] == 2
+    assert reloaded.lookup("top 5 gainers", db_path) == SQL
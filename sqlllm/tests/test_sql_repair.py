@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from sql_repair import closest_name, repair_sql, repair_values
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "repair.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Recommendations (StockName TEXT, Category TEXT, BuyPrice REAL, SellPrice REAL)")
+    conn.executemany(
+        "INSERT INTO Recommendations VALUES (?, ?, ?, ?)",
+        [("TCS", "IT", 100, 120), ("SBI", "Banking", 500, 450)],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_closest_name_ignores_case_and_separators():
+    assert closest_name("stock_name", ["StockName", "Category"]) == "StockName"
+    assert closest_name("Volume", ["StockName", "Category"]) is None
+
+
+def test_misspelled_table_and_column_are_fixed(db_path):
+    fixed = repair_sql(db_path, "SELECT Stock_Name, SelPrice FROM Recomendations")
+    assert fixed == "SELECT StockName, SellPrice FROM Recommendations"
+
+
+def test_prose_around_the_statement_is_cut(db_path):
+    text = "To select the best stocks, use:\nSELECT * FROM Recommendations;"
+    assert repair_sql(db_path, text) == "SELECT * FROM Recommendations;"
+
+
+def test_sql_that_compiles_is_returned_unchanged(db_path):
+    sql = "SELECT StockName FROM Recommendations"
+    assert repair_sql(db_path, sql) == sql
+
+
+def test_unknown_names_are_left_to_the_model(db_path):
+    assert repair_sql(db_path, "SELECT MarketCap FROM Recommendations") is None
+
+
+def test_literal_that_is_not_a_value_gets_the_columns_spelling(db_path):
+    fixed = repair_values(db_path, "SELECT * FROM Recommendations WHERE Category = 'it'")
+    assert fixed == "SELECT * FROM Recommendations WHERE Category = 'IT'"
+    assert repair_values(db_path, "SELECT * FROM Recommendations WHERE Category = 'IT'") is None
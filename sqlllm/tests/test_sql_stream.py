@@ -0,0 +1,62 @@
+import pytest
+
+from sql_stream import NotSQLError, StreamingSQL, stream_sql
+from sql_validator import extract_statement
+
+
+def _read(text, step=3, refusal_markers=()):
+    reader = StreamingSQL(refusal_markers)
+    for position in range(0, len(text), step):
+        if reader.feed(text[position:position + step]) in ("done", "refusal", "not_sql"):
+            break
+    return reader
+
+
+class _ChunkedLLM:
+    def __init__(self, text, step=4):
+        self.chunks = [text[position:position + step] for position in range(0, len(text), step)]
+        self.sent = 0
+
+    def generate(self, contents, stream=False, **options):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+
+@pytest.mark.parametrize("text", [
+    "To select the best stocks, use:\nSELECT * FROM Recommendations;\nThis lists them.",
+    "There you go:\n```sql\nSELECT Stock, BuyPrice FROM Recommendations\n```\nThese are the picks.",
+    "Then:\nWITH t AS (SELECT 1 AS x) SELECT x FROM t; -- done",
+    "SELECT Stock FROM Recommendations WHERE Note = 'it''s; fine';",
+])
+def test_stream_agrees_with_extraction(text):
+    for step in (1, 3, 7):
+        reader = _read(text, step)
+        assert reader.state == "done"
+        assert reader.result().strip() == extract_statement(text).strip()
+
+
+def test_lines_starting_with_the_are_not_skipped():
+    reader = _read("These rows:\nSELECT Stock FROM Recommendations;")
+    assert reader.result() == "SELECT Stock FROM Recommendations;"
+
+
+def test_stream_stops_reading_at_the_end_of_the_statement():
+    llm = _ChunkedLLM("SELECT * FROM t;" + " trailing prose" * 50)
+    assert stream_sql(llm, "question") == "SELECT * FROM t;"
+    assert llm.sent < len(llm.chunks)
+
+
+def test_other_statements_are_abandoned():
+    with pytest.raises(NotSQLError):
+        stream_sql(_ChunkedLLM("DELETE FROM Recommendations;"), "question")
+
+
+def test_long_prose_without_a_statement_is_abandoned():
+    with pytest.raises(NotSQLError):
+        stream_sql(_ChunkedLLM("You could select the best stocks by looking at them. " * 5), "question")
+
+
+def test_refusal_marker_stops_the_stream():
+    reader = _read("Sorry, I only answer stock questions.", refusal_markers=("Sorry, I only",))
+    assert reader.state == "refusal"
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from sql_validator import ValidationCache, compile_error, extract_sql, extract_statement
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "validator.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Recommendations (Stock TEXT, BuyPrice REAL, SellPrice REAL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_prose_select_does_not_start_the_statement():
+    text = "To select the best stocks, use:\nSELECT * FROM Recommendations;"
+    assert extract_statement(text) == "SELECT * FROM Recommendations;"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("```sql\nSELECT Stock FROM Recommendations\n```", "SELECT Stock FROM Recommendations"),
+    ("Here's the query: select Stock, BuyPrice from Recommendations; Hope it helps",
+     "select Stock, BuyPrice from Recommendations;"),
+    ("Select all the rows with\nSELECT DISTINCT Stock FROM Recommendations;",
+     "SELECT DISTINCT Stock FROM Recommendations;"),
+    ("SELECT COUNT(*) FROM Recommendations;", "SELECT COUNT(*) FROM Recommendations;"),
+    ("Start with the totals:\nWITH t AS (SELECT 1 AS x) SELECT x FROM t;", "WITH t AS (SELECT 1 AS x) SELECT x FROM t;"),
+    ("SELECT Stock,\n  CASE WHEN SellPrice > BuyPrice\n  THEN 'up' ELSE 'down' END AS Move\nFROM Recommendations;",
+     "SELECT Stock,\n  CASE WHEN SellPrice > BuyPrice\n  THEN 'up' ELSE 'down' END AS Move\nFROM Recommendations;"),
+])
+def test_extract_statement(text, expected):
+    assert extract_statement(text) == expected
+
+
+@pytest.mark.parametrize("text", ["I can only answer questions about stocks.", "select the best one", ""])
+def test_extract_sql_rejects_answers_without_a_statement(text):
+    assert extract_statement(text) is None
+    with pytest.raises(ValueError):
+        extract_sql(text)
+
+
+def test_compile_error_accepts_reads(db_path):
+    assert compile_error(db_path, "SELECT Stock FROM Recommendations") is None
+
+
+def test_compile_error_reports_unknown_columns(db_path):
+    assert "no such column" in compile_error(db_path, "SELECT Nope FROM Recommendations")
+
+
+def test_compile_error_denies_writes(db_path):
+    assert "not authorized" in compile_error(db_path, "DELETE FROM Recommendations")
+
+
+def test_validation_cache_reuses_verdicts(db_path):
+    cache = ValidationCache()
+    assert cache.verdict(db_path, "SELECT Stock FROM Recommendations;") is None
+    assert cache.verdict(db_path, "SELECT  Stock  FROM Recommendations") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_statement_ends_at_the_closing_fence():
+    text = "```sql\nSELECT Stock FROM Recommendations\n```\nThen; filter it further if needed."
+    assert extract_statement(text) == "SELECT Stock FROM Recommendations"
+
+
+def test_line_comments_do_not_swallow_the_statement(db_path):
+    assert compile_error(db_path, "SELECT Stock -- name\nFROM Recommendations") is None
+    assert compile_error(db_path, "SELECT Stock, -- the stock\n  BuyPrice -- its price\nFROM Recommendations\nWHERE BuyPrice > 0;") is None
+
+
+def test_comments_and_spacing_share_a_cached_verdict(db_path):
+    cache = ValidationCache()
+    assert cache.verdict(db_path, "SELECT Stock -- name\nFROM Recommendations") is None
+    assert cache.verdict(db_path, "SELECT Stock FROM Recommendations;") is None
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+from synthetic_data import SCHEMAS, build_database
+
+
+def _rows(db_path, dataset):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT * FROM {SCHEMAS[dataset]['table']} ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("dataset", list(SCHEMAS))
+def test_same_seed_gives_the_same_database_across_workers(tmp_path, dataset):
+    single = str(tmp_path / "single.db")
+    parallel = str(tmp_path / "parallel.db")
+    stats = build_database(dataset, single, 450, workers=1, chunk_rows=100, commit_rows=200, seed=7)
+    build_database(dataset, parallel, 450, workers=3, chunk_rows=100, commit_rows=200, seed=7)
+    assert stats["rows"] == 450
+    rows = _rows(single, dataset)
+    assert len(rows) == 450
+    assert rows == _rows(parallel, dataset)
+
+
+def test_another_seed_gives_other_rows(tmp_path):
+    build_database("badjate", str(tmp_path / "a.db"), 100, seed=1)
+    build_database("badjate", str(tmp_path / "b.db"), 100, seed=2)
+    assert _rows(str(tmp_path / "a.db"), "badjate") != _rows(str(tmp_path / "b.db"), "badjate")
+
+
+def test_rebuild_replaces_the_file_and_leaves_no_temporary(tmp_path):
+    path = str(tmp_path / "badjate.db")
+    build_database("badjate", path, 300, seed=1)
+    build_database("badjate", path, 50, seed=1)
+    assert len(_rows(path, "badjate")) == 50
+    assert sorted(p.name for p in tmp_path.iterdir() if not p.name.endswith(("-wal", "-shm"))) == ["badjate.db"]
+
+
+def test_unknown_dataset_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown dataset"):
+        build_database("nope", str(tmp_path / "nope.db"), 10)
@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+import warm_up
+from query_cache import db_version
+from synthetic_data import build_database
+from warm_up import WarmResults, WarmUpJob, start_warm_up, warm_result
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "badjate.db")
+    build_database("badjate", path, 200, seed=3)
+    return path
+
+
+@pytest.fixture
+def results(monkeypatch):
+    results = WarmResults()
+    monkeypatch.setattr(warm_up, "_warm_results", results)
+    monkeypatch.setattr(warm_up, "_jobs", {})
+    return results
+
+
+def test_job_runs_every_sample_query(db_path):
+    results = WarmResults()
+    job = WarmUpJob("badjate", db_path, db_version(db_path), results=results).start().wait(30)
+    progress = job.progress()
+    assert progress["status"] == "done"
+    assert progress["total"] > 0
+    assert progress["done"] == progress["total"]
+    assert progress["failed"] == 0
+    assert len(results) == progress["total"]
+
+
+def test_warmed_result_is_shared_by_every_caller(db_path, results):
+    job = start_warm_up("badjate", db_path)
+    assert start_warm_up("badjate", db_path) is job
+    job.wait(30)
+    label = next(iter(job.timings))
+    key, result = next(iter(results._entries.items()))
+    sql = key[2]
+    # Spacing and the final ";" do not matter, and every caller gets the same object
+    assert warm_result("badjate", db_path, "  " + sql.replace(" ", "\n") + " ;") is result
+    assert warm_result("badjate", db_path, sql) is result
+    assert results.hits == 2
+    assert label in warm_up.warm_up_progress("badjate")["timings_ms"]
+
+
+def test_data_change_retires_the_warm_results(db_path, results):
+    job = start_warm_up("badjate", db_path).wait(30)
+    sql = next(iter(results._entries))[2]
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM Recommendations WHERE OrderID = 1")
+    conn.commit()
+    conn.close()
+    assert warm_result("badjate", db_path, sql) is None
+    # The new version gets its own job, and its results replace the old ones
+    new_job = start_warm_up("badjate", db_path).wait(30)
+    assert new_job is not job
+    assert all(key[1] == new_job.version for key in results._entries)
+
+
+def test_warm_up_can_be_disabled(db_path, results, monkeypatch):
+    monkeypatch.setattr(warm_up, "WARM_UP_ENABLED", False)
+    assert start_warm_up("badjate", db_path) is None
+    assert len(results) == 0
@@ -0,0 +1,172 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from query_budget import QueryBudgetExceeded
+from query_cache import db_version
+from query_templates import get_template_registry
+from result_pager import run_paged_query
+
+# After a restart (or a change to the data) the sample queries the sidebar advertises are run
+# once on a background thread, so the first click finds warm pages and a ready result instead
+# of a cold full scan. Results are kept per database version and shared by every session.
+
+# --- Configuration ---
+WARM_UP_ENABLED = os.getenv("WARM_UP_ENABLED", "1") != "0"
+WARM_RESULTS_MAX_ENTRIES = int(os.getenv("WARM_RESULTS_MAX_ENTRIES", "64"))
+
+
+def _sql_key(sql):
+    return re.sub(r"\s+", " ", sql.strip().rstrip(";").strip())
+
+
+# --- Results of known queries for one database version ---
+class WarmResults:
+    def __init__(self, max_entries=WARM_RESULTS_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def get(self, dataset, version, sql):
+        with self._lock:
+            key = (dataset, version, _sql_key(sql))
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return result
+
+    def put(self, dataset, version, sql, result):
+        with self._lock:
+            # Results of an older version of the data are never served again
+            for key in [key for key in self._entries if key[0] == dataset and key[1] != version]:
+                del self._entries[key]
+            self._entries[(dataset, version, _sql_key(sql))] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_warm_results = WarmResults()
+
+
+def get_warm_results():
+    return _warm_results
+
+
+# --- One warm-up run, for one dataset at one database version ---
+class WarmUpJob:
+    def __init__(self, dataset, db_path, version, budget=None, results=None):
+        self.dataset = dataset
+        self.db_path = db_path
+        self.version = version
+        self.budget = budget
+        # WarmResults has a length, so an empty one is falsy: compare with None
+        self.results = results if results is not None else _warm_results
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.status = "pending"
+        self.started = None
+        self.finished = None
+        # label -> milliseconds the query took
+        self.timings = {}
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name=f"warm-up-{self.dataset}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _stale(self):
+        try:
+            return db_version(self.db_path) != self.version
+        except (OSError, sqlite3.Error):
+            return True
+
+    def run(self):
+        self.started = time.perf_counter()
+        self.status = "running"
+        try:
+            registry = get_template_registry(self.dataset, self.db_path)
+            queries = registry.sample_queries() if registry else []
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warm-up of {self.dataset} skipped: {str(e)}")
+            queries = []
+        self.total = len(queries)
+        for label, sql in queries:
+            # The data changed under us; the job for the new version takes over
+            if self._stale():
+                self.status = "superseded"
+                break
+            query_started = time.perf_counter()
+            try:
+                result = run_paged_query(self.db_path, sql, budget=self.budget)
+                self.results.put(self.dataset, self.version, sql, result)
+            except (QueryBudgetExceeded, sqlite3.Error) as e:
+                print(f"Warm-up query {label} failed: {str(e)}")
+                self.failed += 1
+            self.timings[label] = round(1000 * (time.perf_counter() - query_started), 2)
+            self.done += 1
+        else:
+            self.status = "done"
+        self.finished = time.perf_counter()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self
+
+    def progress(self):
+        end = self.finished or time.perf_counter()
+        return {
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "failed": self.failed,
+            "elapsed_ms": round(1000 * (end - self.started), 2) if self.started else 0.0,
+            "timings_ms": dict(self.timings),
+        }
+
+
+# The latest job of each dataset; a new one starts whenever the database version moves on
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+## Function To start the warm-up of a dataset's sample queries once per database version (returns the job)
+def start_warm_up(dataset, db_path, budget=None):
+    if not WARM_UP_ENABLED:
+        return None
+    try:
+        version = db_version(db_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warm-up of {dataset} skipped: {str(e)}")
+        return None
+    with _jobs_lock:
+        job = _jobs.get(dataset)
+        if job is None or job.version != version:
+            job = _jobs[dataset] = WarmUpJob(dataset, db_path, version, budget).start()
+        return job
+
+
+def warm_up_progress(dataset):
+    with _jobs_lock:
+        job = _jobs.get(dataset)
+    return job.progress() if job else None
+
+
+## Function To get the warmed-up result of a query, if it was run for the current database version
+def warm_result(dataset, db_path, sql):
+    try:
+        version = db_version(db_path)
+    except (OSError, sqlite3.Error):
+        return None
+    return _warm_results.get(dataset, version, sql)